@@ -5,6 +5,9 @@ REM Требования: Python 3.10+, установленный pyinstaller (
 set PROJECT_DIR=%~dp0
 cd /d "%PROJECT_DIR%"
 
+REM Готовый кэш шрифтов matplotlib: без него первый график строится после сканирования шрифтов
+python tools\build_font_cache.py --output build\mpl_cache
+
 pyinstaller ^
   --noconfirm ^
   --clean ^
@@ -16,6 +19,8 @@ pyinstaller ^
   --add-data "static;static" ^
   --add-data "torsion_lab.db;." ^
   --add-data "torsion_animation.gif;." ^
+  --add-data "build\mpl_cache;mpl_cache" ^
+  --runtime-hook "pyinstaller_hooks\rth_mplcache.py" ^
   --hidden-import "PyQt5.sip"
 
 echo.
@@ -5,6 +5,9 @@
 set -e
 cd "$(dirname "$0")"
 
+# Готовый кэш шрифтов matplotlib: без него первый график строится после сканирования шрифтов
+python3 tools/build_font_cache.py --output build/mpl_cache
+
 pyinstaller \
   --noconfirm \
   --clean \
@@ -16,6 +19,8 @@ pyinstaller \
   --add-data "static:static" \
   --add-data "torsion_lab.db:." \
   --add-data "torsion_animation.gif:." \
+  --add-data "build/mpl_cache:mpl_cache" \
+  --runtime-hook "pyinstaller_hooks/rth_mplcache.py" \
   --hidden-import "PyQt5.sip"
 
 echo "Готово. Бинарник лежит в dist/torsion_lab_launcher"
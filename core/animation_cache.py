@@ -0,0 +1,164 @@
+"""
+Модуль дискового кэша анимаций с ограничением по размеру.
+Файл анимации называется по хэшу входных данных, поэтому одинаковые параметры
+дают один и тот же файл, а сам файл никогда не меняется.
+При превышении лимита удаляются файлы, к которым дольше всего не обращались.
+Используется веб-приложением (задачи анимации, поток превью) и десктопом
+(каталог в пользовательском кэше, см. user_animation_cache).
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from core.paths import user_cache_dir
+
+
+# Форматы анимации: расширение -> MIME-тип
+ANIMATION_FORMATS = {
+    'gif': 'image/gif',
+    'webp': 'image/webp',
+    'apng': 'image/apng',
+    'mp4': 'video/mp4',
+    'mjpeg': 'video/x-motion-jpeg',
+}
+
+# Версия отрисовки: входит в ключ animation_key. Увеличивать при любом изменении кадров
+# (оформление фигуры, сетка вала, расписание кадров, кодировщики): файлы кэша отдаются
+# с Cache-Control: immutable, и без новой версии старые кадры отдавались бы по тем же адресам
+RENDER_VERSION = 1
+
+_KEY_PATTERN = re.compile(r'^[0-9a-f]{16,64}$')
+
+
+def animation_key(material: str, D: float, L: float, T_data, phi_data, fps: int, duration: int,
+                  **options) -> str:
+    """
+    Ключ анимации — хэш всего, от чего зависят кадры: версия отрисовки (RENDER_VERSION),
+    образец (материал, D и L в метрах), хэш кривой T-φ (значения float64), частота, длительность
+    и параметры отрисовки и кодирования (options: lossless, quality, dpi). Формат в ключ не входит:
+    он задает расширение файла в кэше.
+
+    Returns:
+        32 шестнадцатеричных символа
+    """
+    curve = hashlib.sha256()
+    curve.update(np.asarray(T_data, dtype=np.float64).tobytes())
+    curve.update(np.asarray(phi_data, dtype=np.float64).tobytes())
+    encoded = json.dumps([RENDER_VERSION, material, float(D), float(L), curve.hexdigest(), int(fps), int(duration), options],
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:32]
+
+
+def user_animation_cache() -> 'AnimationCache':
+    """
+    Кэш анимаций десктоп-приложения: <пользовательский кэш>/animations, 256 МБ.
+    Каталог и лимит переопределяются TORSION_ANIMATION_CACHE_DIR и TORSION_ANIMATION_CACHE_MAX_BYTES.
+    """
+    cache_dir = os.environ.get('TORSION_ANIMATION_CACHE_DIR') or os.path.join(user_cache_dir(), 'animations')
+    return AnimationCache(cache_dir, int(os.environ.get('TORSION_ANIMATION_CACHE_MAX_BYTES', 256 * 1024 * 1024)))
+
+
+class AnimationCache:
+    """Каталог готовых анимаций <ключ>.<формат> с вытеснением по времени последнего обращения."""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Каталог кэша (создается при необходимости)
+            max_bytes: Максимальный суммарный размер файлов
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+
+    def path_for(self, key: str, fmt: str) -> str:
+        """
+        Путь к файлу анимации.
+
+        Raises:
+            ValueError: если ключ или формат недопустимы (защита от выхода за пределы каталога)
+        """
+        if not _KEY_PATTERN.match(key):
+            raise ValueError('Недопустимый ключ анимации')
+        if fmt not in ANIMATION_FORMATS:
+            raise ValueError(f'Неизвестный формат анимации: {fmt}')
+        return os.path.join(self.cache_dir, f'{key}.{fmt}')
+
+    def get(self, key: str, fmt: str) -> Optional[str]:
+        """Путь к готовой анимации (с отметкой обращения) или None."""
+        path = self.path_for(key, fmt)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def temp_path(self, fmt: str) -> str:
+        """Временный файл в каталоге кэша (для атомарного сохранения через store)."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=f'.{fmt}', prefix='.tmp-', dir=self.cache_dir)
+        os.close(fd)
+        return path
+
+    def store(self, key: str, fmt: str, source_path: str) -> str:
+        """
+        Атомарное помещение готового файла в кэш и вытеснение старых записей.
+
+        Args:
+            key: Ключ (хэш входных данных)
+            fmt: Формат
+            source_path: Готовый файл в каталоге кэша (см. temp_path)
+
+        Returns:
+            Путь к файлу в кэше
+        """
+        path = self.path_for(key, fmt)
+        os.replace(source_path, path)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Удаление давно не использованных файлов, пока размер кэша больше лимита.
+
+        Args:
+            keep: Файл, который нельзя удалять (только что сохраненный)
+
+        Returns:
+            Количество удаленных файлов
+        """
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            if name.startswith('.tmp-'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # удален другим процессом
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
@@ -3,12 +3,307 @@
 Визуализирует закручивание вала и распределение касательных напряжений.
 """
 
+import io
+import math
+import multiprocessing
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from itertools import chain
+from typing import Optional
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from matplotlib.patches import Rectangle, FancyBboxPatch, Wedge
-from matplotlib.collections import LineCollection
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import Normalize, to_rgba
+from matplotlib.cm import ScalarMappable
 import matplotlib.patches as mpatches
+from matplotlib import colormaps, rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+from PIL import Image
+from PIL.PngImagePlugin import Blend, Disposal
+
+from core.animation_cache import AnimationCache, animation_key
+
+
+# Сколько кадров анимации используется для построения общей палитры GIF
+PALETTE_SAMPLES = 6
+
+# Разрешение кадров живого превью (фигура 14×8 дюймов -> 896×512)
+PREVIEW_DPI = 64
+
+# Черновик превью: разрешение (560×320) и частота кадров (та же длительность, меньше кадров)
+DRAFT_DPI = 40
+DRAFT_FPS = 5
+
+# Порог заметного изменения кадра: доля размаха T, φ и числа точек кривой (см. frame_schedule)
+FRAME_CHANGE_THRESHOLD = 0.005
+
+# Сетка вала на левой панели (см. TorsionAnimator._shaft_mesh): сечений по длине, граней
+# по окружности, колец на торце; каждая SHAFT_STRIPE-я грань — образующая, при кручении
+# она становится винтовой линией. SHAFT_TILT — отношение полуосей эллипса торца (вид сверху).
+# Цвета ступенчатые (SHAFT_LEVELS уровней τ, SHAFT_SHADES уровней освещенности, образующие —
+# один цвет без шкалы τ), чтобы все они точно вошли в общую палитру GIF. Граней и оттенков
+# немного, а сетка рисуется без сглаживания: вал меняется в каждом кадре, и промежуточные
+# цвета на краях граней сильно увеличивают GIF
+SHAFT_SECTIONS = 12
+SHAFT_SEGMENTS = 24
+SHAFT_RINGS = 3
+SHAFT_STRIPE = 4
+SHAFT_TILT = 0.3
+SHAFT_CMAP = 'YlOrRd'
+SHAFT_LEVELS = 6
+SHAFT_SHADES = 3
+SHAFT_STRIPE_COLOR = '#3b2417'
+
+# Форматы сохранения анимации: расширение файла -> формат
+ANIMATION_EXTENSIONS = {
+    '.gif': 'gif',
+    '.webp': 'webp',
+    '.png': 'apng',
+    '.apng': 'apng',
+    '.mp4': 'mp4',
+    '.mjpeg': 'mjpeg',
+}
+
+
+class AnimationCancelled(Exception):
+    """Отрисовка анимации отменена через CancelToken."""
+
+
+class CancelToken:
+    """
+    Признак отмены отрисовки: выставляется из любого потока (cancel), проверяется
+    аниматором между кадрами (check), поэтому отрисовка останавливается не позже
+    чем через один кадр.
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def check(self):
+        """
+        Raises:
+            AnimationCancelled: если отмена запрошена
+        """
+        if self._event.is_set():
+            raise AnimationCancelled()
+
+
+def animation_format(save_path: str, fmt: Optional[str] = None) -> str:
+    """
+    Формат сохранения: явно заданный или по расширению файла.
+    
+    Raises:
+        ValueError: если формат не поддерживается
+    """
+    if fmt is None:
+        fmt = ANIMATION_EXTENSIONS.get(os.path.splitext(save_path)[1].lower())
+    if fmt not in ANIMATION_EXTENSIONS.values():
+        raise ValueError(f'Формат анимации: {", ".join(sorted(set(ANIMATION_EXTENSIONS.values())))}')
+    return fmt
+
+
+def uses_palette(fmt: str, lossless: bool = False) -> bool:
+    """Кадры формата квантуются общей палитрой: GIF всегда, APNG — если не требуется lossless."""
+    return fmt == 'gif' or (fmt == 'apng' and not lossless)
+
+
+def ffmpeg_path() -> Optional[str]:
+    """Путь к ffmpeg (настройка matplotlib animation.ffmpeg_path) или None, если он не установлен."""
+    return shutil.which(rcParams['animation.ffmpeg_path'])
+
+
+def default_workers() -> int:
+    """Число процессов для параллельного сохранения анимации по умолчанию (не больше 4)."""
+    return max(1, min(os.cpu_count() or 1, 4))
+
+
+def palette_samples(num_frames: int) -> list:
+    """Номера кадров для построения палитры: равномерно, включая первый и последний."""
+    return sorted(set(np.linspace(0, num_frames - 1, min(PALETTE_SAMPLES, num_frames)).astype(int).tolist()))
+
+
+def rgb_image(rgba: np.ndarray) -> Image.Image:
+    """RGB-изображение из буфера RGBA (буфер оборачивается без копирования, копия — только RGB)."""
+    height, width = rgba.shape[:2]
+    return Image.frombuffer('RGBA', (width, height), rgba, 'raw', 'RGBA', 0, 1).convert('RGB')
+
+
+def encode_jpeg(rgba: np.ndarray, quality: int = 80) -> bytes:
+    """Кадр из буфера RGBA в JPEG (для живого превью и потока MJPEG)."""
+    buffer = io.BytesIO()
+    rgb_image(rgba).save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def split_jpeg_frames(data: bytes) -> list:
+    """
+    Кадры потока MJPEG (файлы JPEG подряд). Заголовки кадра проходятся по длинам сегментов
+    до SOS; в данных скана байт 0xFF всегда экранирован, поэтому первый маркер EOI
+    после SOS — конец кадра.
+    """
+    frames = []
+    start = 0
+    while start < len(data):
+        pos = start + 2  # SOI
+        while data[pos + 1] != 0xDA:
+            pos += 2 + int.from_bytes(data[pos + 2:pos + 4], 'big')
+        end = data.index(b'\xff\xd9', pos) + 2
+        frames.append(data[start:end])
+        start = end
+    return frames
+
+
+def build_palette(images: list, colors: int = 256, fixed: np.ndarray = None) -> Image.Image:
+    """
+    Общая палитра по выборке кадров. Метод maximum coverage сохраняет точные частые цвета
+    (белый фон, цвета линий); median cut усредняет их, и фон получается серым.
+    
+    Args:
+        images: Кадры выборки (RGB)
+        colors: Размер палитры
+        fixed: Цвета (k, 3) uint8, которые входят в палитру точно, даже если их нет в выборке
+            (например, все цвета граней вала, см. TorsionAnimator._shaft_palette)
+    
+    Returns:
+        Изображение в режиме P, палитра которого используется в quantize_frame
+    """
+    fixed = np.empty((0, 3), dtype=np.uint8) if fixed is None else fixed
+    width, height = images[0].size
+    mosaic = Image.new('RGB', (width, height * len(images)))
+    for i, image in enumerate(images):
+        mosaic.paste(image, (0, height * i))
+    palette = mosaic.quantize(colors - len(fixed), method=Image.Quantize.MAXCOVERAGE)
+    if len(fixed):
+        palette.putpalette(palette.getpalette() + fixed.ravel().tolist())
+    return palette
+
+
+def quantize_frame(image: Image.Image, palette: Image.Image = None) -> Image.Image:
+    """Перевод кадра в заданную палитру без дизеринга (без палитры — кадр без изменений)."""
+    if palette is None:
+        return image
+    return image.quantize(palette=palette, dither=Image.Dither.NONE)
+
+
+def frame_durations(schedule: list, fps: int) -> list:
+    """
+    Длительности кадров расписания (см. TorsionAnimator.frame_schedule), мс. Границы
+    кадров округляются от начала анимации, поэтому ошибка округления не накапливается.
+    """
+    return [round((frame_num + count) * 1000 / fps) - round(frame_num * 1000 / fps)
+            for frame_num, count in schedule]
+
+
+def write_animation(save_path: str, images, fps: int, num_frames: int, progress_callback=None,
+                    fmt: str = 'gif', lossless: bool = False, quality: int = 80,
+                    schedule: list = None):
+    """
+    Запись кадров в файл анимации.
+    
+    gif  — кадры в общей палитре; Pillow записывает только прямоугольник, изменившийся
+           относительно предыдущего кадра, и объединяет одинаковые кадры; disposal=1 —
+           предыдущий кадр остается под следующим.
+    webp — с потерями (quality) или без (lossless).
+    apng — тот же вывод изменившихся прямоугольников (dispose none, blend source);
+           8-битные кадры в общей палитре или RGB при lossless.
+    mp4  — H.264 через ffmpeg (если установлен), кадры передаются в stdin без записи на диск.
+    mjpeg — кадры JPEG подряд (quality); так хранится в кэше живое превью.
+    
+    Кадр, который длится несколько кадров расписания, в gif, webp и apng записывается
+    один раз с большей длительностью, в mp4 и mjpeg (постоянная частота) — повторяется.
+    
+    Args:
+        save_path: Путь к файлу
+        images: Итератор кадров (изображения Pillow) в порядке показа
+        fps: Кадров в секунду
+        num_frames: Количество кадров (для progress_callback)
+        progress_callback: Функция (номер кадра, всего кадров)
+        fmt: Формат (см. ANIMATION_EXTENSIONS)
+        lossless: WebP без потерь
+        quality: Качество WebP с потерями и JPEG (0–100)
+        schedule: Расписание [(номер кадра, сколько кадров длится)] для images
+            (None — каждое изображение длится один кадр)
+    """
+    if schedule is None:
+        schedule = [(frame_num, 1) for frame_num in range(num_frames)]
+    
+    def counted():
+        for (frame_num, count), image in zip(schedule, images):
+            if progress_callback:
+                progress_callback(frame_num, num_frames)
+            yield image, count
+    
+    frames = counted()
+    if fmt == 'mp4':
+        _write_mp4(save_path, (image for image, count in frames for _ in range(count)), fps)
+        return
+    if fmt == 'mjpeg':
+        with open(save_path, 'wb') as f:
+            for image, count in frames:
+                buffer = io.BytesIO()
+                image.save(buffer, format='JPEG', quality=quality)
+                f.write(buffer.getvalue() * count)
+        return
+    
+    frames = (image for image, _ in frames)
+    
+    if fmt == 'gif':
+        options = {'format': 'GIF', 'disposal': 1}
+    elif fmt == 'apng':
+        options = {'format': 'PNG', 'disposal': Disposal.OP_NONE, 'blend': Blend.OP_SOURCE}
+    else:
+        options = {'format': 'WEBP', 'lossless': lossless, 'quality': quality}
+    first = next(frames)
+    if fmt == 'apng':
+        frames = list(frames)  # кодировщик APNG проходит по кадрам дважды
+    first.save(save_path, save_all=True, append_images=frames, duration=frame_durations(schedule, fps),
+               loop=0, **options)
+
+
+def _write_mp4(save_path: str, frames, fps: int, crf: int = 23):
+    """
+    Кодирование RGB-кадров в MP4 (H.264, yuv420p) процессом ffmpeg.
+    
+    Raises:
+        RuntimeError: если ffmpeg не установлен или завершился с ошибкой
+    """
+    ffmpeg = ffmpeg_path()
+    if ffmpeg is None:
+        raise RuntimeError('Для MP4 нужен ffmpeg (не найден в PATH)')
+    
+    first = next(frames)
+    width, height = first.size
+    command = [
+        ffmpeg, '-y', '-loglevel', 'error',
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+        '-an', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',  # yuv420p требует четных размеров
+        '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-crf', str(crf), '-movflags', '+faststart',
+        '-f', 'mp4', save_path
+    ]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for image in chain([first], frames):
+            process.stdin.write(image.tobytes())
+    except BrokenPipeError:
+        pass  # ffmpeg завершился раньше — причина будет в stderr
+    stderr = process.communicate()[1]
+    if process.returncode != 0:
+        raise RuntimeError(f'ffmpeg: {stderr.decode(errors="replace").strip()}')
 
 
 class TorsionAnimator:
@@ -30,31 +325,116 @@ class TorsionAnimator:
         self.phi_data = np.array(phi_data)
         self.fig = None
         self.anim = None
+        self._artists = {}
+        self._draft = False
+    
+    def frame_indices(self, num_frames: int) -> np.ndarray:
+        """Индексы точек данных для каждого кадра (равномерно по всей кривой)."""
+        return np.linspace(0, len(self.T_data) - 1, num_frames).astype(int)
     
-    def create_torsion_animation(self, save_path: str = None, fps: int = 30, duration: int = 10):
+    def frame_schedule(self, num_frames: int, threshold: float = FRAME_CHANGE_THRESHOLD) -> list:
         """
-        Создает анимацию процесса кручения с визуализацией деформации и напряжений.
-        
-        Args:
-            save_path: Путь для сохранения анимации (если None - показывает интерактивно)
-            fps: Кадров в секунду
-            duration: Длительность анимации в секундах
+        Адаптивное расписание кадров. Кадр рисуется, только если состояние заметно
+        изменилось относительно последнего нарисованного: T или φ — больше чем на
+        threshold от размаха, или продвижение по кривой — больше threshold числа точек.
+        Остальные кадры (в том числе с той же точкой данных: при 50 точках и 160 кадрах
+        их больше двух третей) продлевают предыдущий; последняя точка кривой всегда
+        показывается. Общая длительность анимации не меняется.
         
         Returns:
-            FuncAnimation объект
+            Список (номер кадра, сколько кадров он длится); сумма длительностей — num_frames
         """
-        # Создаем фигуру с несколькими подграфиками
-        self.fig = plt.figure(figsize=(14, 8))
+        indices = self.frame_indices(num_frames)
+        T_tol = threshold * (np.ptp(self.T_data) or 1.0)
+        phi_tol = threshold * (np.ptp(self.phi_data) or 1.0)
+        progress_tol = threshold * max(len(self.T_data) - 1, 1)
+        
+        schedule = []
+        shown = None
+        for frame_num, idx in enumerate(indices):
+            if shown is not None and idx == shown:
+                schedule[-1][1] += 1
+                continue
+            if (shown is not None and idx != indices[-1]
+                    and abs(self.T_data[idx] - self.T_data[shown]) <= T_tol
+                    and abs(self.phi_data[idx] - self.phi_data[shown]) <= phi_tol
+                    and idx - shown <= progress_tol):
+                schedule[-1][1] += 1
+                continue
+            schedule.append([frame_num, 1])
+            shown = idx
+        return [tuple(run) for run in schedule]
+    
+    def _build_figure(self, num_frames: int, offscreen: bool = True, dpi: float = None,
+                      draft: bool = False):
+        """
+        Создает фигуру и все artists анимации один раз: заголовки, подписи, сетка,
+        легенда, стрелка момента и кривая T-φ больше не перерисовываются.
+        В кадре меняются только данные artists из self._artists (см. _draw_frame).
+        
+        Args:
+            num_frames: Количество кадров
+            offscreen: Фигура с холстом Agg без pyplot (для файлов и превью: не зависит
+                от GUI-бэкенда и безопасна вне главного потока); False — окно pyplot
+            dpi: Разрешение кадра (None — figure.dpi из настроек matplotlib)
+            draft: Черновик: панель параметров — одна строка без рамки, а оформление
+                (оси, подписи, деления, легенда) растеризуется один раз в фон, на который
+                в каждом кадре накладываются только меняющиеся artists (см. _frame_rgba)
+        """
+        if offscreen:
+            self.fig = Figure(figsize=(14, 8), dpi=dpi)
+            FigureCanvasAgg(self.fig)
+        else:
+            self.fig = plt.figure(figsize=(14, 8), dpi=dpi)
         gs = self.fig.add_gridspec(2, 3, hspace=0.3, wspace=0.3)
+        length_mm = self.calculator.L * 1000
+        radius_mm = self.calculator.D * 1000 / 2
         
-        # 1. 3D визуализация закручивания вала
+        tau_peak = self._tau_peak()
+        
+        # 1. Закрученный вал: боковая поверхность и верхний торец в косоугольной проекции,
+        # цвет — касательное напряжение τ, яркость — освещенность грани
         ax_3d = self.fig.add_subplot(gs[:, 0])
-        ax_3d.set_xlim(-1.2, 1.2)
-        ax_3d.set_ylim(0, self.calculator.L * 1000 + 50)  # мм
-        ax_3d.set_aspect('equal')
+        ax_3d.set_xlim(-1.6 * radius_mm, 1.6 * radius_mm)
+        ax_3d.set_ylim(-0.08 * length_mm, 1.2 * length_mm)
         ax_3d.set_title('Закручивание образца', fontsize=12, fontweight='bold')
-        ax_3d.set_xlabel('Смещение, мм')
+        ax_3d.set_xticks([-radius_mm, 0, radius_mm])
+        ax_3d.set_xlabel('Диаметр, мм')
         ax_3d.set_ylabel('Длина образца, мм')
+        shaft_cmap = colormaps[SHAFT_CMAP].resampled(SHAFT_LEVELS)
+        colorbar = self.fig.colorbar(ScalarMappable(Normalize(0, tau_peak), shaft_cmap), ax=ax_3d,
+                                     location='bottom', fraction=0.04, pad=0.1, label='τ, МПа')
+        colorbar.locator = MaxNLocator(4)
+        
+        # Масштаб глубины: торец на экране — эллипс с отношением полуосей SHAFT_TILT
+        # (масштабы осей x и y разные, вал растянут по ширине, чтобы быть заметным)
+        box = ax_3d.get_position()
+        width, height = self.fig.get_size_inches()
+        x_span = np.ptp(ax_3d.get_xlim())
+        y_span = np.ptp(ax_3d.get_ylim())
+        depth_scale = SHAFT_TILT * y_span / x_span * (box.width * width) / (box.height * height)
+        
+        # Сетка для всех точек данных, которые встречаются в кадрах, строится сразу
+        shown, self._shaft_rows = np.unique(self.frame_indices(num_frames), return_inverse=True)
+        self._shaft_verts, self._shaft_colors, self._shaft_visible = self._shaft_mesh(
+            shown, depth_scale, tau_peak, shaft_cmap)
+        shaft = PolyCollection(self._shaft_verts[0][self._shaft_visible[0]],
+                               facecolors=self._shaft_colors[0][self._shaft_visible[0]],
+                               edgecolors='face', linewidths=0.3, antialiased=False)
+        ax_3d.add_collection(shaft, autolim=False)
+        
+        # Заделка нижнего конца (поверх вала)
+        clamp = Rectangle((-1.5 * radius_mm, -0.08 * length_mm), 3 * radius_mm, 0.1 * length_mm,
+                          facecolor='0.75', edgecolor='0.3', hatch='///', zorder=3)
+        ax_3d.add_patch(clamp)
+        
+        # Стрелка момента над торцом
+        arrow_y = length_mm + depth_scale * radius_mm + 0.04 * length_mm
+        ax_3d.annotate('', xy=(radius_mm, arrow_y), xytext=(-radius_mm, arrow_y),
+                      arrowprops=dict(arrowstyle='->', color='red', lw=2,
+                                      connectionstyle='arc3,rad=0.3'))
+        moment_text = ax_3d.text(0, arrow_y + 0.06 * length_mm, '', ha='center', fontsize=10,
+                                 color='red', fontweight='bold')
         
         # 2. Диаграмма T-φ
         ax_diagram = self.fig.add_subplot(gs[0, 1])
@@ -65,110 +445,176 @@ class TorsionAnimator:
         ax_diagram.grid(True, alpha=0.3)
         line_current, = ax_diagram.plot([], [], 'ro-', linewidth=2, markersize=8)
         
-        # 3. Распределение касательных напряжений
+        # 3. Распределение касательных напряжений: пределы осей — по максимальному моменту,
+        # чтобы шкала не менялась от кадра к кадру
         ax_stress = self.fig.add_subplot(gs[0, 2])
+        ax_stress.set_xlim(-0.05 * tau_peak, 1.05 * tau_peak)
+        ax_stress.set_ylim(-0.05 * radius_mm, 1.05 * radius_mm)
         ax_stress.set_xlabel('τ, МПа', fontsize=10)
         ax_stress.set_ylabel('Радиус ρ, мм', fontsize=10)
         ax_stress.set_title('Распределение τ по сечению', fontsize=11, fontweight='bold')
         ax_stress.grid(True, alpha=0.3)
+        ax_stress.axhline(y=radius_mm, color='k', linestyle='--', linewidth=1, label='R наруж')
+        ax_stress.legend(fontsize=8)
+        stress_line, = ax_stress.plot([], [], 'r-', linewidth=2)
+        stress_fill = PolyCollection([np.zeros((1, 2))], facecolors=to_rgba('red', 0.3),
+                                     edgecolors='none')
+        ax_stress.add_collection(stress_fill, autolim=False)
         
         # 4. Информационная панель
         ax_info = self.fig.add_subplot(gs[1, 1:])
         ax_info.axis('off')
-        info_text = ax_info.text(0.05, 0.9, '', transform=ax_info.transAxes, 
-                                fontsize=11, verticalalignment='top', 
-                                family='monospace',
-                                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+        if draft:
+            info_text = ax_info.text(0.05, 0.9, '', transform=ax_info.transAxes,
+                                     fontsize=11, verticalalignment='top', family='monospace')
+        else:
+            info_text = ax_info.text(0.05, 0.9, '', transform=ax_info.transAxes, 
+                                    fontsize=11, verticalalignment='top', 
+                                    family='monospace',
+                                    bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
         
-        # Количество кадров
-        num_frames = fps * duration
-        frame_indices = np.linspace(0, len(self.T_data) - 1, num_frames).astype(int)
+        self._draft = draft
+        self._background = None
+        self._num_frames = num_frames
+        self._frame_indices = self.frame_indices(num_frames)
+        self._artists = {
+            'shaft': shaft,
+            'clamp': clamp,
+            'moment_text': moment_text,
+            'line_current': line_current,
+            'stress_line': stress_line,
+            'stress_fill': stress_fill,
+            'info_text': info_text,
+        }
+    
+    def _tau_peak(self) -> float:
+        """Наибольшее τ на поверхности по всей кривой, МПа (предел шкал τ)."""
+        tau_peak = self.calculator.calc_max_shear_stress(self.T_data.max()) / 1e6 if len(self.T_data) else 0
+        return tau_peak if tau_peak > 0 else 1.0
+    
+    def _shaft_palette(self, num_frames: int) -> np.ndarray:
+        """
+        Все цвета граней вала в кадрах анимации (RGB uint8). Цвета ступенчатые, их немного
+        (не больше (SHAFT_LEVELS + 1)·(SHAFT_SHADES + 1)), и они закрепляются в общей палитре
+        GIF: иначе оттенки, которых нет в кадрах выборки, заменяются чужими цветами.
+        """
+        indices = np.unique(self.frame_indices(num_frames))
+        cmap = colormaps[SHAFT_CMAP].resampled(SHAFT_LEVELS)
+        _, colors, _ = self._shaft_mesh(indices, 0.0, self._tau_peak(), cmap)
+        return np.unique(np.round(colors[..., :3].reshape(-1, 3) * 255).astype(np.uint8), axis=0)
+    
+    def _shaft_mesh(self, indices: np.ndarray, depth_scale: float, tau_peak: float, cmap) -> tuple:
+        """
+        Сетка закрученного вала сразу для всех точек данных indices (массивы формы
+        (точек, сечений, граней), без циклов по сечениям). Сечение на высоте y повернуто
+        на φ·y/L, поэтому образующие становятся винтовыми линиями, а торец поворачивается
+        на φ. Боковая поверхность окрашена по τ на поверхности (τmax), кольца торца — по τ(ρ)
+        в середине кольца; яркость граней боковой поверхности — по освещенности.
         
-        # Создаем сетку вала для визуализации
-        num_sections = 20
-        y_sections = np.linspace(0, self.calculator.L * 1000, num_sections)
+        Args:
+            indices: Индексы точек данных
+            depth_scale: Смещение по оси y на 1 мм глубины (проекция со взглядом сверху)
+            tau_peak: τ, которому соответствует верх цветовой шкалы, МПа
+            cmap: Цветовая шкала τ (та же, что у colorbar панели)
+            
+        Returns:
+            Кортеж (вершины (точек, граней, 4, 2), цвета RGBA (точек, граней, 4),
+            видимость (точек, граней)); грани — боковая поверхность, затем торец
+        """
+        length_mm = self.calculator.L * 1000
+        radius_mm = self.calculator.D * 1000 / 2
+        phi = self.phi_data[indices]
+        T = self.T_data[indices]
+        stripes = np.arange(SHAFT_SEGMENTS) % SHAFT_STRIPE == 0
         
-        def init():
-            """Инициализация анимации."""
-            line_current.set_data([], [])
-            return line_current, info_text
+        def quads(a):
+            """Узлы сетки (точек, i+1, j+1) -> четырехугольники (точек, i, j, 4)."""
+            return np.stack([a[:, :-1, :-1], a[:, :-1, 1:], a[:, 1:, 1:], a[:, 1:, :-1]], axis=-1)
         
-        def animate(frame_num):
-            """Функция анимации для каждого кадра."""
-            idx = frame_indices[frame_num]
-            T_current = self.T_data[idx]
-            phi_current = self.phi_data[idx]
-            
-            # Обновление диаграммы T-φ
-            line_current.set_data(self.phi_data[:idx+1] * 180/np.pi, self.T_data[:idx+1])
-            
-            # Очистка и перерисовка 3D вала
-            ax_3d.clear()
-            ax_3d.set_xlim(-1.5, 1.5)
-            ax_3d.set_ylim(0, self.calculator.L * 1000 + 50)
-            ax_3d.set_aspect('equal')
-            ax_3d.set_title('Закручивание образца', fontsize=12, fontweight='bold')
-            ax_3d.set_xlabel('Смещение, мм')
-            ax_3d.set_ylabel('Длина образца, мм')
-            
-            # Рисуем закрученный вал (проекция)
-            radius_mm = self.calculator.D * 1000 / 2
-            for i, y in enumerate(y_sections):
-                # Угол поворота пропорционален расстоянию от основания
-                angle = phi_current * (y / (self.calculator.L * 1000))
-                
-                # Координаты точек на окружности
-                x1 = radius_mm * np.cos(angle)
-                x2 = -radius_mm * np.cos(angle)
-                
-                # Рисуем вертикальные линии (образующие)
-                if i == 0:
-                    ax_3d.plot([x1, x1], [y, y], 'b-', linewidth=2)
-                    ax_3d.plot([x2, x2], [y, y], 'b-', linewidth=2)
-                else:
-                    y_prev = y_sections[i-1]
-                    angle_prev = phi_current * (y_prev / (self.calculator.L * 1000))
-                    x1_prev = radius_mm * np.cos(angle_prev)
-                    x2_prev = -radius_mm * np.cos(angle_prev)
-                    
-                    ax_3d.plot([x1_prev, x1], [y_prev, y], 'b-', linewidth=1.5, alpha=0.7)
-                    ax_3d.plot([x2_prev, x2], [y_prev, y], 'r-', linewidth=1.5, alpha=0.7)
-                
-                # Горизонтальные сечения
-                if i % 4 == 0:
-                    ax_3d.plot([x1, x2], [y, y], 'k-', linewidth=0.5, alpha=0.5)
-            
-            # Стрелка момента
-            arrow_y = self.calculator.L * 1000 + 20
-            ax_3d.annotate('', xy=(0.8, arrow_y), xytext=(-0.8, arrow_y),
-                          arrowprops=dict(arrowstyle='<->', color='red', lw=2))
-            ax_3d.text(0, arrow_y + 10, f'M = {T_current:.2f} Н·м', 
-                      ha='center', fontsize=10, color='red', fontweight='bold')
-            
-            # Обновление распределения напряжений
-            ax_stress.clear()
-            rho, tau = self.calculator.calc_shear_stress_distribution(T_current, 50)
-            tau_mpa = tau / 1e6
-            rho_mm = rho * 1000
-            
-            ax_stress.plot(tau_mpa, rho_mm, 'r-', linewidth=2)
-            ax_stress.fill_betweenx(rho_mm, 0, tau_mpa, alpha=0.3, color='red')
-            ax_stress.set_xlabel('τ, МПа', fontsize=10)
-            ax_stress.set_ylabel('Радиус ρ, мм', fontsize=10)
-            ax_stress.set_title('Распределение τ по сечению', fontsize=11, fontweight='bold')
-            ax_stress.grid(True, alpha=0.3)
-            ax_stress.axhline(y=self.calculator.D * 1000 / 2, color='k', 
-                             linestyle='--', linewidth=1, label='R наруж')
-            ax_stress.legend(fontsize=8)
-            
-            # Обновление информационной панели
-            tau_max = self.calculator.calc_max_shear_stress(T_current) / 1e6
-            gamma = self.calculator.calc_relative_shear(phi_current)
-            G = self.calculator.calc_shear_modulus(T_current, phi_current) / 1e6 if phi_current > 0 else 0
-            
-            info_str = f"""
+        def faces(x, y):
+            return np.stack([quads(x), quads(y)], axis=-1).reshape(len(indices), -1, 4, 2)
+        
+        # Боковая поверхность: узлы (точек, сечений + 1, граней + 1)
+        y = np.linspace(0, length_mm, SHAFT_SECTIONS + 1)
+        theta0 = np.linspace(0, 2 * np.pi, SHAFT_SEGMENTS + 1)
+        theta = theta0[None, None, :] + (phi[:, None] * y[None, :] / length_mm)[:, :, None]
+        depth = radius_mm * np.sin(theta)
+        side = faces(radius_mm * np.cos(theta), y[None, :, None] - depth_scale * depth)
+        
+        # Освещенность по нормали в центре грани (свет слева спереди); видна передняя половина
+        center = (theta[:, :-1, :-1] + theta[:, 1:, 1:]) / 2
+        light = np.clip(-0.45 * np.cos(center) + 0.89 * np.sin(center), 0, 1)
+        shade = 0.45 + 0.55 * np.round(light * SHAFT_SHADES) / SHAFT_SHADES
+        tau_surface = self.calculator.calc_max_shear_stress(T) / 1e6 / tau_peak
+        side_colors = np.repeat(cmap(tau_surface)[:, None, None, :], SHAFT_SEGMENTS, axis=2)
+        side_colors = np.repeat(side_colors, SHAFT_SECTIONS, axis=1)
+        side_colors[:, :, stripes] = to_rgba(SHAFT_STRIPE_COLOR)
+        side_colors[..., :3] *= shade[..., None]
+        side_visible = np.sin(center) > 0
+        
+        # Верхний торец: кольца, повернутые на φ; τ(ρ) = T·ρ/Jp
+        rho = np.linspace(0, radius_mm, SHAFT_RINGS + 1)
+        theta_top = theta0[None, :] + phi[:, None]
+        ring_x = rho[None, :, None] * np.cos(theta_top)[:, None, :]
+        ring_y = length_mm - depth_scale * rho[None, :, None] * np.sin(theta_top)[:, None, :]
+        top = faces(ring_x, ring_y)
+        rho_mid = (rho[:-1] + rho[1:]) / 2000  # м
+        tau_rings = T[:, None] * rho_mid[None, :] / self.calculator.calc_polar_moment_inertia() / 1e6
+        top_colors = np.repeat(cmap(tau_rings / tau_peak)[:, :, None, :], SHAFT_SEGMENTS, axis=2)
+        top_colors[:, :, stripes] = to_rgba(SHAFT_STRIPE_COLOR)
+        
+        n = len(indices)
+        verts = np.concatenate([side, top], axis=1)
+        colors = np.concatenate([side_colors.reshape(n, -1, 4), top_colors.reshape(n, -1, 4)], axis=1)
+        visible = np.concatenate([side_visible.reshape(n, -1),
+                                  np.ones((n, SHAFT_RINGS * SHAFT_SEGMENTS), dtype=bool)], axis=1)
+        return verts, colors, visible
+    
+    def _draw_frame(self, frame_num: int) -> tuple:
+        """
+        Обновляет данные artists для кадра (без очистки осей).
+        
+        Returns:
+            Измененные artists (для блиттинга)
+        """
+        artists = self._artists
+        idx = self._frame_indices[frame_num]
+        T_current = self.T_data[idx]
+        phi_current = self.phi_data[idx]
+        
+        # Диаграмма T-φ и вал: сетка вала для точки уже построена (см. _shaft_mesh)
+        artists['line_current'].set_data(self.phi_data[:idx+1] * 180/np.pi, self.T_data[:idx+1])
+        row = self._shaft_rows[frame_num]
+        visible = self._shaft_visible[row]
+        artists['shaft'].set_verts(self._shaft_verts[row][visible])
+        artists['shaft'].set_facecolor(self._shaft_colors[row][visible])
+        artists['moment_text'].set_text(f'M = {T_current:.2f} Н·м')
+        
+        # Распределение напряжений: кривая и закрашенная область между ней и осью ρ
+        rho, tau = self.calculator.calc_shear_stress_distribution(T_current, 50)
+        tau_mpa = tau / 1e6
+        rho_mm = rho * 1000
+        artists['stress_line'].set_data(tau_mpa, rho_mm)
+        artists['stress_fill'].set_verts([np.concatenate([
+            np.column_stack([tau_mpa, rho_mm]),
+            np.column_stack([np.zeros_like(rho_mm), rho_mm])[::-1]
+        ])])
+        
+        # Информационная панель
+        tau_max = self.calculator.calc_max_shear_stress(T_current) / 1e6
+        if self._draft:
+            artists['info_text'].set_text(
+                f'Точка {idx+1}/{len(self.T_data)}:  T = {T_current:.2f} Н·м,  '
+                f'φ = {phi_current*180/np.pi:.2f}°,  τ = {tau_max:.2f} МПа'
+            )
+            return tuple(artists.values())
+        
+        gamma = self.calculator.calc_relative_shear(phi_current)
+        G = self.calculator.calc_shear_modulus(T_current, phi_current) / 1e6 if phi_current > 0 else 0
+        
+        info_str = f"""
 ╔═══════════════════════════════════════════════════════════╗
-║  ПАРАМЕТРЫ ЭКСПЕРИМЕНТА (Кадр {frame_num+1}/{num_frames})
+║  ПАРАМЕТРЫ ЭКСПЕРИМЕНТА (Точка {idx+1}/{len(self.T_data)})
 ╠═══════════════════════════════════════════════════════════╣
 ║  Материал: {self.calculator.material:<15}  D = {self.calculator.D*1000:.1f} мм
 ║  Длина: L = {self.calculator.L*1000:.1f} мм
@@ -181,25 +627,352 @@ class TorsionAnimator:
 ║  • Модуль сдвига:          G = {G:8.0f} МПа
 ╚═══════════════════════════════════════════════════════════╝
             """
-            info_text.set_text(info_str)
-            
-            return line_current, info_text
+        artists['info_text'].set_text(info_str)
         
-        # Создаем анимацию
-        self.anim = FuncAnimation(self.fig, animate, init_func=init,
-                                 frames=num_frames, interval=1000/fps,
-                                 blit=False, repeat=True)
+        return tuple(artists.values())
+    
+    def create_torsion_animation(self, save_path: str = None, fps: int = 30, duration: int = 10,
+                                 progress_callback=None, workers: int = 1, fmt: str = None,
+                                 lossless: bool = False, quality: int = 80,
+                                 cache: AnimationCache = None, cancel: CancelToken = None):
+        """
+        Создает анимацию процесса кручения с визуализацией деформации и напряжений.
+        Фигура и оформление строятся один раз, в кадре обновляются только данные artists;
+        при интерактивном показе используется блиттинг.
         
-        # Сохранение или показ
+        При сохранении кадры берутся прямо из буфера Agg и передаются кодировщику
+        (см. _save_frames и write_animation); GIF квантуется одной общей палитрой.
+        С кэшем готовый файл с тем же ключом (cache_key) копируется без отрисовки,
+        а новый после сохранения помещается в кэш. Файл пишется во временный рядом
+        с save_path и заменяет его только готовым (os.replace): при ошибке или отмене
+        прежний файл по этому пути не меняется.
+        
+        Args:
+            save_path: Путь для сохранения анимации (если None - показывает интерактивно)
+            fps: Кадров в секунду
+            duration: Длительность анимации в секундах
+            progress_callback: Функция (номер кадра, всего кадров), вызываемая при сохранении
+            workers: Число процессов для отрисовки кадров при сохранении (1 — в текущем процессе)
+            fmt: Формат файла: gif, webp, apng, mp4 (None — по расширению save_path)
+            lossless: WebP и APNG без потерь
+            quality: Качество WebP с потерями (0–100)
+            cache: Кэш готовых анимаций (None — без кэша)
+            cancel: Токен отмены сохранения
+        
+        Returns:
+            FuncAnimation объект (None при сохранении в файл)
+        
+        Raises:
+            AnimationCancelled: сохранение отменено через cancel
+            Exception: ошибка отрисовки или записи файла передается вызывающему,
+                чтобы причина не терялась
+        """
+        num_frames = fps * duration
         if save_path:
+            fmt = animation_format(save_path, fmt)
+            key = self.cache_key(fps, duration, lossless=lossless, quality=quality)
+            cached = cache.get(key, fmt) if cache else None
+            # Расширение сохраняется: по нему ffmpeg выбирает контейнер
+            root, extension = os.path.splitext(save_path)
+            temp_path = f'{root}.tmp-{os.getpid()}-{threading.get_ident()}{extension}'
             try:
-                self.anim.save(save_path, writer='pillow', fps=fps)
-                print(f"Анимация сохранена: {save_path}")
-            except Exception as e:
-                print(f"Ошибка сохранения анимации: {e}")
+                if cached:
+                    shutil.copyfile(cached, temp_path)
+                else:
+                    self._save_frames(temp_path, fps, num_frames, workers, progress_callback,
+                                      fmt=fmt, lossless=lossless, quality=quality, cancel=cancel)
+                    if cache:
+                        cache_temp_path = cache.temp_path(fmt)
+                        shutil.copyfile(temp_path, cache_temp_path)
+                        cache.store(key, fmt, cache_temp_path)
+                os.replace(temp_path, save_path)
+            except AnimationCancelled:
+                print(f"Сохранение анимации отменено: {save_path}")
+                raise
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            print(f"Анимация сохранена{' (из кэша)' if cached else ''}: {save_path}")
+            return None
         
+        self._build_figure(num_frames, offscreen=False)
+        self.anim = FuncAnimation(self.fig, self._draw_frame, init_func=lambda: self._draw_frame(0),
+                                 frames=num_frames, interval=1000/fps, blit=True, repeat=True)
         return self.anim
     
+    def cache_key(self, fps: int, duration: int, **options) -> str:
+        """Ключ анимации в кэше: образец, кривая T-φ, fps, длительность и options (см. animation_key)."""
+        return animation_key(self.calculator.material, self.calculator.D, self.calculator.L,
+                             self.T_data, self.phi_data, fps, duration, **options)
+    
+    def _preview_key(self, fps: int, duration: int, dpi: float, quality: int, draft: bool) -> str:
+        options = {'dpi': dpi, 'quality': quality}
+        if draft:
+            options['draft'] = True
+        return self.cache_key(fps, duration, **options)
+    
+    def cached_jpeg_frames(self, fps: int, duration: int, dpi: float = PREVIEW_DPI, quality: int = 80,
+                           cache: AnimationCache = None, draft: bool = False) -> Optional[list]:
+        """Кадры превью в JPEG из кэша (формат mjpeg) или None, если их там нет."""
+        if cache is None:
+            return None
+        path = cache.get(self._preview_key(fps, duration, dpi, quality, draft), 'mjpeg')
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return split_jpeg_frames(f.read())
+        except FileNotFoundError:
+            return None  # вытеснен другим процессом
+    
+    def iter_jpeg_frames(self, fps: int = 20, duration: int = 8, dpi: float = PREVIEW_DPI,
+                         quality: int = 80, cache: AnimationCache = None, cancel: CancelToken = None,
+                         draft: bool = False):
+        """
+        Кадры живого превью в JPEG. Если превью с тем же ключом есть в кэше, кадры читаются
+        из файла без отрисовки; иначе рисуются (iter_frames), по мере отрисовки дописываются
+        во временный файл кэша и, если превью просмотрено до конца, сохраняются в кэше.
+        
+        Yields:
+            Кадр JPEG (bytes)
+        
+        Raises:
+            AnimationCancelled: при отмене через cancel (превью не попадает в кэш)
+        """
+        cached = self.cached_jpeg_frames(fps, duration, dpi, quality, cache, draft)
+        if cached is not None:
+            yield from cached
+            return
+        # Повторяющийся кадр расписания рисуется и сжимается один раз
+        if cache is None:
+            for rgba, count in self._iter_scheduled(fps, duration, dpi, cancel, draft):
+                frame = encode_jpeg(rgba, quality)
+                for _ in range(count):
+                    yield frame
+            return
+        
+        temp_path = cache.temp_path('mjpeg')
+        try:
+            with open(temp_path, 'wb') as f:
+                for rgba, count in self._iter_scheduled(fps, duration, dpi, cancel, draft):
+                    frame = encode_jpeg(rgba, quality)
+                    for _ in range(count):
+                        f.write(frame)
+                        yield frame
+            cache.store(self._preview_key(fps, duration, dpi, quality, draft), 'mjpeg', temp_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def iter_preview_frames(self, fps: int = 20, duration: int = 8, cache: AnimationCache = None,
+                            cancel: CancelToken = None):
+        """
+        Превью в два прохода: сначала черновик (DRAFT_FPS кадров в секунду, DRAFT_DPI,
+        упрощенная отрисовка — первый кадр через доли секунды, весь черновик за 1–2 с),
+        затем превью полного качества (fps, PREVIEW_DPI). Оба прохода кэшируются
+        отдельно; если в кэше уже есть полное превью, черновик не строится.
+        
+        Yields:
+            Кортежи (draft, номер кадра, всего кадров в проходе, JPEG)
+        """
+        full_key = self._preview_key(fps, duration, PREVIEW_DPI, 80, draft=False)
+        if cache is None or cache.get(full_key, 'mjpeg') is None:
+            draft_frames = DRAFT_FPS * duration
+            for frame_num, frame in enumerate(self.iter_jpeg_frames(DRAFT_FPS, duration, DRAFT_DPI,
+                                                                    cache=cache, cancel=cancel, draft=True)):
+                yield True, frame_num, draft_frames, frame
+        num_frames = fps * duration
+        for frame_num, frame in enumerate(self.iter_jpeg_frames(fps, duration, cache=cache, cancel=cancel)):
+            yield False, frame_num, num_frames, frame
+    
+    def iter_frames(self, fps: int = 20, duration: int = 8, dpi: float = None,
+                    cancel: CancelToken = None, draft: bool = False):
+        """
+        Кадры анимации по мере отрисовки — для живого превью (окно приложения, поток MJPEG):
+        первый кадр готов сразу после построения фигуры, не дожидаясь всей анимации,
+        и в памяти одновременно находится только буфер Agg одного кадра. Рисуются только
+        кадры адаптивного расписания (frame_schedule), повторы отдаются без отрисовки.
+        
+        Args:
+            fps: Кадров в секунду
+            duration: Длительность анимации в секундах
+            dpi: Разрешение кадра (например, PREVIEW_DPI; None — как при сохранении)
+            cancel: Токен отмены, проверяется перед каждым кадром
+            draft: Упрощенная отрисовка черновика (см. _build_figure)
+        
+        Yields:
+            Массив (высота, ширина, 4) uint8 — буфер холста без копирования; действителен
+            до следующего кадра (нужную копию или JPEG делает потребитель, см. encode_jpeg)
+        
+        Raises:
+            AnimationCancelled: при отмене через cancel
+        """
+        for rgba, count in self._iter_scheduled(fps, duration, dpi, cancel, draft):
+            for _ in range(count):
+                yield rgba
+    
+    def _iter_scheduled(self, fps: int, duration: int, dpi: float = None, cancel: CancelToken = None,
+                        draft: bool = False):
+        """Кадры адаптивного расписания: (буфер RGBA, сколько кадров он длится)."""
+        num_frames = fps * duration
+        self._build_figure(num_frames, dpi=dpi, draft=draft)
+        try:
+            for frame_num, count in self.frame_schedule(num_frames):
+                if cancel is not None:
+                    cancel.check()
+                yield self._frame_rgba(frame_num), count
+        finally:
+            self.fig = None
+            self._artists = {}
+    
+    def _frame_rgba(self, frame_num: int) -> np.ndarray:
+        """
+        Отрисовка кадра в буфер Agg.
+        
+        Returns:
+            Массив (высота, ширина, 4) uint8 — представление буфера холста без копирования;
+            действителен до следующей отрисовки
+        """
+        canvas = self.fig.canvas
+        artists = self._draw_frame(frame_num)
+        if not self._draft:
+            canvas.draw()
+        else:
+            # Черновик: фон без меняющихся artists рисуется один раз, дальше они накладываются на копию
+            if self._background is None:
+                for artist in artists:
+                    artist.set_animated(True)
+                canvas.draw()
+                self._background = canvas.copy_from_bbox(self.fig.bbox)
+            canvas.restore_region(self._background)
+            for artist in artists:
+                artist.axes.draw_artist(artist)
+        buffer = canvas.buffer_rgba()
+        return np.frombuffer(buffer, dtype=np.uint8).reshape(buffer.shape)
+    
+    def _render_image(self, frame_num: int, palette: Image.Image = None) -> Image.Image:
+        """
+        Кадр в виде изображения Pillow: RGB или, если задана палитра, P с этой палитрой (для GIF).
+        """
+        return quantize_frame(rgb_image(self._frame_rgba(frame_num)), palette)
+    
+    def _save_frames(self, save_path: str, fps: int, num_frames: int, workers: int = 1,
+                     progress_callback=None, fmt: str = 'gif', lossless: bool = False,
+                     quality: int = 80, cancel: CancelToken = None):
+        """
+        Сохранение анимации без FuncAnimation.save: кадр рисуется в буфер Agg, оборачивается
+        в изображение Pillow без копирования (Image.frombuffer) и сразу переводится в RGB
+        или в палитру, после чего передается кодировщику.
+        
+        Для GIF (и APNG без lossless) палитра строится один раз по PALETTE_SAMPLES кадрам, равномерно взятым
+        по всей анимации; каждый кадр квантуется ею без дизеринга (около 3 мс против
+        75–95 мс на собственную палитру кадра), а одинаковая палитра позволяет Pillow
+        записывать только изменившуюся область кадра.
+        
+        Память на кадр при 1400×800: буфер Agg 4,3 МБ (один на фигуру, переиспользуется),
+        временное RGB-изображение 3,2 МБ, хранимый до записи кадр GIF 1,1 МБ (P) — кодировщик
+        Pillow собирает все кадры перед записью; для WebP хранится RGB-кадр. Раньше
+        FuncAnimation.save хранил копию RGBA (4,3 МБ) для каждого кадра. Время по этапам:
+        python tools/bench_animation.py.
+        
+        При workers > 1 порции кадров рисуются в пуле процессов: у каждого процесса своя
+        фигура, порции возвращаются по порядку и сразу передаются кодировщику.
+        
+        Рисуются только кадры адаптивного расписания (frame_schedule): при 50 точках
+        и 160 кадрах — 50 кадров, каждый со своей длительностью (см. write_animation).
+        
+        Args:
+            save_path: Путь к файлу
+            fps: Кадров в секунду
+            num_frames: Количество кадров
+            workers: Число процессов
+            progress_callback: Функция (номер кадра, всего кадров)
+            fmt, lossless, quality: Формат и параметры кодирования (см. write_animation)
+            cancel: Токен отмены, проверяется перед каждым кадром (в пуле — перед
+                передачей кадра кодировщику; невыполненные порции снимаются)
+        
+        Raises:
+            AnimationCancelled: при отмене через cancel
+        """
+        schedule = self.frame_schedule(num_frames)
+        keys = [frame_num for frame_num, _ in schedule]
+        samples = [keys[i] for i in palette_samples(len(keys))] if uses_palette(fmt, lossless) else []
+        encoding = {'fmt': fmt, 'lossless': lossless, 'quality': quality, 'schedule': schedule}
+        check = cancel.check if cancel is not None else lambda: None
+        
+        if workers <= 1:
+            self._build_figure(num_frames)
+            sampled = {}
+            for frame_num in samples:
+                check()
+                sampled[frame_num] = self._render_image(frame_num)
+            palette = None
+            if sampled:
+                palette = build_palette(list(sampled.values()), fixed=self._shaft_palette(num_frames))
+            
+            def images():
+                for frame_num in keys:
+                    check()
+                    if frame_num in sampled:
+                        yield quantize_frame(sampled.pop(frame_num), palette)
+                    else:
+                        yield self._render_image(frame_num, palette)
+            
+            write_animation(save_path, images(), fps, num_frames, progress_callback, **encoding)
+            return
+        
+        # Порций больше, чем процессов: первые кадры приходят раньше, нагрузка выравнивается
+        chunk_size = max(1, math.ceil(len(keys) / (workers * 4)))
+        chunks = [keys[start:start + chunk_size] for start in range(0, len(keys), chunk_size)]
+        
+        context = multiprocessing.get_context('spawn')
+        stop = context.Event()  # отмена для процессов пула: проверяется между кадрами порции
+        
+        def result(future):
+            # Ожидание порции с проверкой отмены, чтобы не ждать всю порцию
+            while True:
+                try:
+                    return future.result(timeout=0.1)
+                except FutureTimeoutError:  # до Python 3.11 — не встроенный TimeoutError
+                    if cancel is not None and cancel.cancelled:
+                        stop.set()
+                        raise AnimationCancelled()
+        
+        submitted = []
+        
+        def submit(chunk, palette=None):
+            future = executor.submit(_render_chunk, chunk, palette)
+            submitted.append(future)
+            return future
+        
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_render_worker,
+                                 initargs=(self.calculator, self.T_data, self.phi_data,
+                                           num_frames, stop)) as executor:
+            try:
+                palette = None
+                if samples:
+                    sampled = [submit([frame_num]) for frame_num in samples]
+                    palette = build_palette([result(future)[0] for future in sampled],
+                                            fixed=self._shaft_palette(num_frames))
+                
+                def images():
+                    for future in [submit(chunk, palette) for chunk in chunks]:
+                        for image in result(future):
+                            check()
+                            yield image
+                
+                write_animation(save_path, images(), fps, num_frames, progress_callback, **encoding)
+            except BaseException:
+                # Не дожидаться порций: невыполненные снимаются, выполняющиеся останавливаются
+                # после текущего кадра, так что выход из with ждет не дольше одного кадра
+                # (cancel_futures у shutdown есть только с Python 3.9, а shutdown(wait=False)
+                # в Python 3.8 закрывает канал пула раньше его потока, и процессы не завершаются)
+                stop.set()
+                for future in submitted:
+                    future.cancel()
+                raise
+    
     def create_stress_distribution_frames(self, num_frames: int = 10) -> list:
         """
         Создает набор статичных кадров распределения напряжений для отчета.
@@ -239,3 +1012,27 @@ class TorsionAnimator:
         
         return saved_paths
 
+
+# Аниматор рабочего процесса параллельного сохранения (фигура строится один раз на процесс)
+_worker_animator = None
+_worker_stop = None
+
+
+def _init_render_worker(calculator, T_data, phi_data, num_frames: int, stop=None):
+    """Инициализация процесса пула: свой аниматор и своя фигура; stop — событие отмены."""
+    global _worker_animator, _worker_stop
+    import matplotlib
+    matplotlib.use('Agg')
+    _worker_animator = TorsionAnimator(calculator, T_data, phi_data)
+    _worker_animator._build_figure(num_frames)
+    _worker_stop = stop
+
+
+def _render_chunk(frames, palette: Image.Image = None) -> list:
+    """Отрисовка порции кадров в процессе пула (при отмене — только уже готовые кадры)."""
+    images = []
+    for frame_num in frames:
+        if _worker_stop is not None and _worker_stop.is_set():
+            break
+        images.append(_worker_animator._render_image(frame_num, palette))
+    return images
@@ -0,0 +1,173 @@
+"""
+Модуль пакетного (векторизованного) расчета серии экспериментов по кручению.
+Повторяет TorsionCalculator.generate_diagram_data + process_experiment_data,
+но обрабатывает сразу много наборов параметров массивами NumPy.
+"""
+
+import math
+import numpy as np
+from typing import Dict, List
+
+from core.calculator import G_REFERENCE, determine_failure_type
+
+
+# Модуль сдвига, используемый при генерации данных для неизвестного материала
+G_FALLBACK = 8.1e10
+
+
+def normalize_params(item: dict, max_points: int = 1000) -> Dict:
+    """
+    Проверка и приведение набора параметров к единицам СИ.
+
+    Args:
+        item: Параметры как в /api/calculate (diameter и length в мм)
+        max_points: Максимально допустимое количество точек
+
+    Returns:
+        Словарь с параметрами (м, Н·м)
+
+    Raises:
+        ValueError: если параметры некорректны
+    """
+    if not isinstance(item, dict):
+        raise ValueError('Набор параметров должен быть объектом')
+
+    diameter = float(item.get('diameter', 10.0)) / 1000
+    length = float(item.get('length', 200.0)) / 1000
+    max_moment = float(item.get('max_moment', 100.0))
+    num_points = int(item.get('num_points', 50))
+    error_percent = float(item.get('error_percent', 2.0))
+
+    if diameter <= 0 or length <= 0 or max_moment <= 0:
+        raise ValueError('diameter, length и max_moment должны быть положительными')
+    if not 10 <= num_points <= max_points:
+        raise ValueError(f'num_points должно быть в диапазоне 10..{max_points}')
+
+    return {
+        'material': item.get('material', 'Сталь'),
+        'diameter': diameter,
+        'length': length,
+        'max_moment': max_moment,
+        'num_points': num_points,
+        'add_noise': bool(item.get('add_noise', True)),
+        'error_percent': error_percent
+    }
+
+
+def evaluate_batch(param_sets: List[Dict], rng: np.random.Generator = None,
+                   include_series: bool = False) -> List[Dict]:
+    """
+    Векторизованный расчет набора экспериментов.
+    Наборы с одинаковым num_points считаются одной матричной операцией.
+
+    Args:
+        param_sets: Список нормализованных параметров (см. normalize_params)
+        rng: Генератор случайных чисел (для воспроизводимости)
+        include_series: Включать ли массивы moments/angles в результаты
+
+    Returns:
+        Список словарей результатов в порядке param_sets (поля как у /api/calculate)
+    """
+    rng = rng or np.random.default_rng()
+    results = [None] * len(param_sets)
+
+    groups = {}
+    for i, params in enumerate(param_sets):
+        groups.setdefault(params['num_points'], []).append(i)
+
+    for num_points, indices in groups.items():
+        group = [param_sets[i] for i in indices]
+        for i, result in zip(indices, _evaluate_group(group, num_points, rng, include_series)):
+            results[i] = result
+
+    return results
+
+
+def _evaluate_group(group: List[Dict], num_points: int, rng: np.random.Generator,
+                    include_series: bool) -> List[Dict]:
+    """Расчет группы наборов с одинаковым количеством точек (матрицы n × num_points)."""
+    n = len(group)
+    D = np.array([p['diameter'] for p in group])
+    L = np.array([p['length'] for p in group])
+    T_max = np.array([p['max_moment'] for p in group])
+    noise = np.array([p['add_noise'] for p in group])
+    error = np.array([p['error_percent'] for p in group]) / 100
+    G_ref = np.array([G_REFERENCE.get(p['material'], np.nan) for p in group])
+
+    Jp = math.pi * D**4 / 32
+    Wp = math.pi * D**3 / 16
+
+    # --- Генерация данных T-φ (как generate_diagram_data) ---
+    G_gen = np.where(np.isnan(G_ref), G_FALLBACK, G_ref)
+    G_used = np.where(noise, G_gen * (1.0 + rng.uniform(-error, error)), G_gen)
+    compliance = L / (G_used * Jp)  # рад/(Н·м)
+
+    n_elastic = int(num_points * 0.7)
+    n_plastic = int(num_points * 0.3)
+
+    T_elastic = T_max * 0.7
+    phi_elastic = T_elastic * compliance
+
+    T_el = T_elastic[:, None] * np.linspace(0, 1, n_elastic)[None, :]
+    phi_el = T_el * compliance[:, None]
+    phi_el_noise = rng.normal(0, 1, (n, n_elastic)) * (phi_elastic * 0.01)[:, None]
+    phi_el = np.where(noise[:, None], np.maximum(phi_el + phi_el_noise, 0), phi_el)
+
+    ratio = np.linspace(0, 1, n_plastic)[None, :]
+    T_pl = T_elastic[:, None] + (T_max - T_elastic)[:, None] * ratio
+    phi_pl = phi_elastic[:, None] + 2 * phi_elastic[:, None] * ratio**2
+    phi_pl_noise = rng.normal(0, 1, (n, n_plastic)) * (phi_elastic * 0.03)[:, None]
+    phi_pl = np.where(noise[:, None], phi_pl + phi_pl_noise, phi_pl)
+
+    T = np.concatenate([T_el, T_pl], axis=1)
+    phi = np.concatenate([phi_el, phi_pl], axis=1)
+
+    # --- Обработка (как process_experiment_data) ---
+    linear_idx = int(T.shape[1] * 0.7)
+    T_lin = T[:, :linear_idx]
+    phi_lin = phi[:, :linear_idx]
+
+    # МНК для T = k·φ + b по строкам
+    if linear_idx > 1:
+        phi_c = phi_lin - phi_lin.mean(axis=1, keepdims=True)
+        T_c = T_lin - T_lin.mean(axis=1, keepdims=True)
+        denom = (phi_c**2).sum(axis=1)
+        valid = (phi_lin[:, -1] != 0) & (denom > 0)
+        k = np.where(valid, (phi_c * T_c).sum(axis=1) / np.where(denom > 0, denom, 1), 0.0)
+    else:
+        k = np.zeros(n)
+    G_exp = k * L / Jp
+
+    idx_max = np.argmax(T, axis=1)
+    T_peak = T[np.arange(n), idx_max]
+    phi_peak = phi[np.arange(n), idx_max]
+
+    tau_max = T_peak / Wp
+    gamma_raw = phi_peak * D / (2 * L)
+    gamma_max = np.where(gamma_raw < 0.1, gamma_raw, np.arctan(gamma_raw))
+
+    G_ref_used = np.where(np.isnan(G_ref), G_exp, G_ref)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative_error = np.where(G_ref_used != 0,
+                                  np.abs(G_exp - G_ref_used) / G_ref_used * 100, 0.0)
+
+    results = []
+    for i, params in enumerate(group):
+        result = {
+            'Jp': float(Jp[i]),
+            'Wp': float(Wp[i]),
+            'G_experimental': float(G_exp[i] / 1e6),
+            'G_reference': float(G_ref_used[i] / 1e6),
+            'relative_error': float(relative_error[i]),
+            'T_max': float(T_peak[i]),
+            'phi_max': float(phi_peak[i]),
+            'tau_max': float(tau_max[i] / 1e6),
+            'gamma_max': float(gamma_max[i]),
+            'linear_slope': float(k[i]),
+            'failure_type': determine_failure_type(params['material'])
+        }
+        if include_series:
+            result['moments'] = T[i].tolist()
+            result['angles'] = phi[i].tolist()
+        results.append(result)
+    return results
@@ -4,10 +4,18 @@
 """
 
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import math
 
 
+# Эталонные значения модуля сдвига G (Па)
+G_REFERENCE = {
+    'Сталь': 8.1e10,   # 81000 МПа
+    'Чугун': 4.0e10,   # 40000 МПа
+    'Дерево': 0.5e9    # 500 МПа
+}
+
+
 class TorsionCalculator:
     """
     Класс для расчета параметров кручения валов круглого сечения.
@@ -27,11 +35,7 @@ class TorsionCalculator:
         self.material = material
         
         # Эталонные значения модуля сдвига G (Па)
-        self.G_reference = {
-            'Сталь': 8.1e10,   # 81000 МПа
-            'Чугун': 4.0e10,   # 40000 МПа
-            'Дерево': 0.5e9    # 500 МПа
-        }
+        self.G_reference = dict(G_REFERENCE)
     
     def calc_polar_moment_inertia(self) -> float:
         """
@@ -240,7 +244,8 @@ class TorsionCalculator:
         }
     
     def generate_diagram_data(self, T_max: float, num_points: int = 100, 
-                             add_experimental_noise: bool = True, error_percent: float = 2.0) -> Dict:
+                             add_experimental_noise: bool = True, error_percent: float = 2.0,
+                             rng: Optional[np.random.Generator] = None) -> Dict:
         """
         Генерация данных для построения диаграммы T-φ с учетом упругой и пластической стадий.
         ВАЖНО: Добавляет реалистичную погрешность для имитации реальных экспериментальных данных!
@@ -250,17 +255,19 @@ class TorsionCalculator:
             num_points: Количество точек
             add_experimental_noise: Добавлять ли экспериментальную погрешность
             error_percent: Процент погрешности (по умолчанию 2%)
+            rng: Генератор случайных чисел (для воспроизводимости); None — глобальный np.random
             
         Returns:
             Словарь с массивами для построения графика
         """
+        random = rng if rng is not None else np.random
         G_ref = self.G_reference.get(self.material, 8.1e10)  # Па (эталонное значение)
         Jp = self.calc_polar_moment_inertia()
         
         # Имитация реального экспериментального модуля сдвига с погрешностью
         if add_experimental_noise:
             # Случайное отклонение модуля сдвига (±error_percent%)
-            G_experimental = G_ref * (1.0 + np.random.uniform(-error_percent/100, error_percent/100))
+            G_experimental = G_ref * (1.0 + random.uniform(-error_percent/100, error_percent/100))
         else:
             G_experimental = G_ref
         
@@ -274,7 +281,7 @@ class TorsionCalculator:
         
         # Добавляем небольшой шум в упругую область
         if add_experimental_noise:
-            noise_elastic = np.random.normal(0, phi_elastic * 0.01, len(phi_elastic_curve))
+            noise_elastic = random.normal(0, phi_elastic * 0.01, len(phi_elastic_curve))
             phi_elastic_curve = phi_elastic_curve + noise_elastic
             phi_elastic_curve = np.maximum(phi_elastic_curve, 0)  # Убираем отрицательные значения
         
@@ -285,7 +292,7 @@ class TorsionCalculator:
         
         # Добавляем больший шум в пластическую область
         if add_experimental_noise:
-            noise_plastic = np.random.normal(0, phi_elastic * 0.03, len(phi_plastic_curve))
+            noise_plastic = random.normal(0, phi_elastic * 0.03, len(phi_plastic_curve))
             phi_plastic_curve = phi_plastic_curve + noise_plastic
         
         T_full = np.concatenate([T_elastic_curve, T_plastic_curve])
@@ -0,0 +1,161 @@
+"""
+Модуль подготовки данных для построения графиков на стороне браузера.
+Формирует компактные прореженные ряды T-φ и τ(ρ) вместе с метаданными
+упругой области и теоретической прямой, чтобы сервер не растеризовал графики.
+"""
+
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+
+# Максимальное число точек ряда, отправляемых клиенту
+DEFAULT_MAX_POINTS = 200
+
+# Число значащих цифр при сериализации рядов
+DEFAULT_PRECISION = 6
+
+
+def compact_values(values, precision: int = DEFAULT_PRECISION) -> list:
+    """
+    Округление массива до заданного числа значащих цифр для компактного JSON.
+
+    Args:
+        values: Массив чисел
+        precision: Количество значащих цифр
+
+    Returns:
+        Список чисел с плавающей точкой
+    """
+    return [float(f'{v:.{precision}g}') for v in np.asarray(values, dtype=float)]
+
+
+def downsample_series(x: Sequence[float], y: Sequence[float],
+                      max_points: int = DEFAULT_MAX_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Прореживание ряда методом LTTB (Largest-Triangle-Three-Buckets).
+    Сохраняет форму кривой: крайние точки и локальные экстремумы остаются на месте.
+
+    Args:
+        x: Значения по оси абсцисс
+        y: Значения по оси ординат
+        max_points: Максимальное количество точек результата
+
+    Returns:
+        Кортеж (прореженный x, прореженный y)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return x, y
+
+    # Границы корзин для всех точек, кроме первой и последней
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # Среднее по следующей корзине (или последняя точка)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # Площадь треугольника (a, кандидат, среднее следующей корзины)
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) -
+                      (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return x[selected], y[selected]
+
+
+def build_torsion_chart(moments: Sequence[float], angles: Sequence[float],
+                        length_m: Optional[float] = None, Jp: Optional[float] = None,
+                        G_ref: Optional[float] = None, G_exp: Optional[float] = None,
+                        max_points: int = DEFAULT_MAX_POINTS,
+                        precision: int = DEFAULT_PRECISION) -> Dict:
+    """
+    Данные диаграммы T-φ для отрисовки в браузере.
+
+    Args:
+        moments: Массив крутящих моментов, Н·м
+        angles: Массив углов закручивания, рад
+        length_m: Длина образца, м (для теоретической прямой)
+        Jp: Полярный момент инерции, м⁴ (для теоретической прямой)
+        G_ref: Эталонный модуль сдвига, МПа (для теоретической прямой)
+        G_exp: Экспериментальный модуль сдвига, МПа
+        max_points: Максимальное количество точек ряда
+        precision: Количество значащих цифр
+
+    Returns:
+        Словарь с рядом (углы в градусах), упругой областью и теоретической прямой
+    """
+    moments = np.asarray(moments, dtype=float)
+    angles_deg = np.asarray(angles, dtype=float) * 180 / np.pi
+
+    # Упругая область определяется по исходным данным (первые 70%), как в process_experiment_data
+    elastic_region = None
+    linear_idx = int(len(moments) * 0.7)
+    if linear_idx > 1:
+        elastic_region = {
+            'x_start': 0.0,
+            'x_end': float(f'{angles_deg[linear_idx]:.{precision}g}'),
+            'T_limit': float(f'{moments[linear_idx]:.{precision}g}')
+        }
+
+    # Теоретическая прямая T = G·Jp·φ/ℓ по эталонному G, до T_max
+    theory_line = None
+    if length_m and Jp and G_ref and len(moments):
+        stiffness = G_ref * 1e6 * Jp / length_m  # Н·м/рад
+        phi_end = min(angles_deg.max() * np.pi / 180, moments.max() / stiffness)
+        theory_line = {
+            'x': [0.0, float(f'{phi_end * 180 / np.pi:.{precision}g}')],
+            'y': [0.0, float(f'{stiffness * phi_end:.{precision}g}')],
+            'G_reference': float(G_ref)
+        }
+
+    x_sent, y_sent = downsample_series(angles_deg, moments, max_points)
+
+    return {
+        'kind': 'torsion',
+        'x': compact_values(x_sent, precision),
+        'y': compact_values(y_sent, precision),
+        'points_total': int(len(moments)),
+        'elastic_region': elastic_region,
+        'theory_line': theory_line,
+        'G_experimental': float(G_exp) if G_exp is not None else None,
+        'G_reference': float(G_ref) if G_ref is not None else None
+    }
+
+
+def build_stress_chart(calculator, moment: float, precision: int = DEFAULT_PRECISION) -> Dict:
+    """
+    Данные распределения касательных напряжений τ(ρ) для отрисовки в браузере.
+    Распределение линейное, поэтому достаточно двух точек: центр и поверхность.
+
+    Args:
+        calculator: Экземпляр TorsionCalculator
+        moment: Крутящий момент, Н·м
+        precision: Количество значащих цифр
+
+    Returns:
+        Словарь с рядом τ (МПа) по радиусу ρ (мм)
+    """
+    rho, tau = calculator.calc_shear_stress_distribution(moment, 2)
+    tau_mpa = tau / 1e6
+    rho_mm = rho * 1000
+
+    return {
+        'kind': 'stress',
+        'x': compact_values(tau_mpa, precision),
+        'y': compact_values(rho_mm, precision),
+        'tau_max': float(f'{tau_mpa[-1]:.{precision}g}'),
+        'radius': float(f'{rho_mm[-1]:.{precision}g}'),
+        'moment': float(moment)
+    }
@@ -3,9 +3,9 @@
 Хранит результаты экспериментов и данные пользователей.
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, Float, DateTime, Text, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, deferred
 from datetime import datetime
 import json
 import os
@@ -67,6 +67,30 @@ class TestResult(Base):
         return f"<TestResult(id={self.id}, user={self.user_name}, score={self.score}/8)>"
 
 
+class Job(Base):
+    """
+    Модель фоновой задачи (генерация отчета и т.п.), выполняемой в пуле процессов.
+    """
+    __tablename__ = 'jobs'
+    
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default='queued')  # queued/running/done/failed
+    progress = Column(Integer, nullable=False, default=0)          # 0..100 %
+    stage = Column(String(50))
+    partial = Column(Text)                  # JSON с частичными результатами (доступны до завершения)
+    params = Column(Text, nullable=False)   # JSON с параметрами задачи
+    result_path = Column(Text)
+    result_name = Column(String(255))                 # Имя файла результата для скачивания
+    result_data = deferred(Column(LargeBinary))       # Результат в памяти (docx и т.п.)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
+    
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind={self.kind}, status={self.status}, progress={self.progress})>"
+
+
 class DatabaseManager:
     """
     Менеджер для работы с базой данных.
@@ -82,8 +106,23 @@ class DatabaseManager:
         self.db_path = db_path
         self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
         Base.metadata.create_all(self.engine)
+        self._add_missing_columns()
         self.Session = sessionmaker(bind=self.engine)
     
+    def _add_missing_columns(self):
+        """
+        Добавление новых столбцов в таблицы, созданные прошлыми версиями
+        (create_all создает только отсутствующие таблицы). Новые столбцы допускают NULL.
+        """
+        inspector = inspect(self.engine)
+        with self.engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                existing = {column['name'] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in existing:
+                        column_type = column.type.compile(dialect=self.engine.dialect)
+                        connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+    
     def save_experiment(self, user_name: str, material: str, diameter: float, 
                        length: float, input_params: dict, results: dict) -> int:
         """
@@ -293,4 +332,156 @@ class DatabaseManager:
             } for r in results]
         finally:
             session.close()
-
+    
+    def create_job(self, job_id: str, kind: str, params: dict) -> str:
+        """
+        Регистрация новой фоновой задачи в очереди.
+        
+        Args:
+            job_id: Идентификатор задачи
+            kind: Тип задачи ('report', ...)
+            params: Словарь с параметрами задачи
+            
+        Returns:
+            ID задачи
+        """
+        session = self.Session()
+        try:
+            job = Job(
+                id=job_id,
+                kind=kind,
+                status='queued',
+                params=json.dumps(params, ensure_ascii=False)
+            )
+            session.add(job)
+            session.commit()
+            return job_id
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def update_job(self, job_id: str, **fields) -> bool:
+        """
+        Обновление состояния фоновой задачи.
+        
+        Args:
+            job_id: ID задачи
+            **fields: Обновляемые поля (status, progress, stage, partial, result_path, result_name,
+                      result_data, error)
+            
+        Returns:
+            True если задача найдена
+        """
+        session = self.Session()
+        try:
+            job = session.query(Job).filter_by(id=job_id).first()
+            if not job:
+                return False
+            for name, value in fields.items():
+                setattr(job, name, value)
+            session.commit()
+            return True
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def get_job(self, job_id: str) -> dict:
+        """
+        Получение состояния фоновой задачи.
+        
+        Args:
+            job_id: ID задачи
+            
+        Returns:
+            Словарь с данными задачи или None
+        """
+        session = self.Session()
+        try:
+            job = session.query(Job).filter_by(id=job_id).first()
+            if job:
+                return {
+                    'id': job.id,
+                    'kind': job.kind,
+                    'status': job.status,
+                    'progress': job.progress,
+                    'stage': job.stage,
+                    'partial': json.loads(job.partial) if job.partial else {},
+                    'params': json.loads(job.params),
+                    'result_path': job.result_path,
+                    'result_name': job.result_name,
+                    'error': job.error,
+                    'created_at': job.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                    'updated_at': job.updated_at.strftime('%Y-%m-%d %H:%M:%S')
+                }
+            return None
+        finally:
+            session.close()
+    
+    def get_job_result(self, job_id: str) -> tuple:
+        """
+        Получение результата задачи, сохраненного в БД.
+        
+        Args:
+            job_id: ID задачи
+            
+        Returns:
+            Кортеж (имя файла, данные) или None
+        """
+        session = self.Session()
+        try:
+            job = session.query(Job).filter_by(id=job_id).first()
+            if job and job.result_data is not None:
+                return job.result_name, job.result_data
+            return None
+        finally:
+            session.close()
+    
+    def delete_finished_jobs(self, older_than: datetime) -> int:
+        """
+        Удаление завершенных задач (done и failed) вместе с их результатами.
+        
+        Args:
+            older_than: Удаляются задачи, завершенные (последнее обновление) раньше этого момента
+            
+        Returns:
+            Количество удаленных задач
+        """
+        session = self.Session()
+        try:
+            count = session.query(Job).filter(
+                Job.status.in_(['done', 'failed']), Job.updated_at < older_than
+            ).delete(synchronize_session=False)
+            session.commit()
+            return count
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def fail_unfinished_jobs(self, error: str) -> int:
+        """
+        Пометка незавершенных задач как неудачных (например, после перезапуска сервера).
+        
+        Args:
+            error: Текст ошибки
+            
+        Returns:
+            Количество обновленных задач
+        """
+        session = self.Session()
+        try:
+            count = session.query(Job).filter(Job.status.in_(['queued', 'running'])).update(
+                {'status': 'failed', 'error': error}, synchronize_session=False
+            )
+            session.commit()
+            return count
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
@@ -0,0 +1,415 @@
+"""
+Модуль фоновых задач: ограниченный пул процессов с хранением состояния задач в SQLite.
+Используется веб-приложением для тяжелых операций (генерация отчетов и анимаций,
+расчеты с построением графиков), чтобы не блокировать обработчики запросов.
+
+Обработчик задачи сообщает этапы через progress(percent, stage, **partial):
+именованные аргументы — частичные результаты, которые клиент видит до завершения
+задачи (например, модуль сдвига G до построения графиков).
+"""
+
+import base64
+import json
+import os
+import time
+import uuid
+import threading
+import multiprocessing
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from core.database import DatabaseManager
+
+# Как часто (не чаще, с) удалять устаревшие завершенные задачи при завершении очередной
+JOB_CLEANUP_INTERVAL = 600
+
+
+class JobQueueFull(Exception):
+    """Очередь задач переполнена (сработало ограничение backpressure)."""
+
+
+class JobQueue:
+    """
+    Очередь фоновых задач поверх пула процессов.
+    Состояние и прогресс задач хранятся в таблице jobs, поэтому их видят
+    все процессы, работающие с той же базой данных.
+    """
+
+    def __init__(self, db_path: str, max_workers: int = 2, max_pending: int = 16, recover_stale: bool = True,
+                 retention_hours: float = 24):
+        """
+        Инициализация очереди.
+
+        Args:
+            db_path: Путь к файлу базы данных SQLite
+            max_workers: Количество рабочих процессов
+            max_pending: Максимальное число задач в очереди и в работе
+            recover_stale: Помечать ли незавершенные задачи прошлого запуска как неудачные
+            retention_hours: Сколько часов хранить завершенные задачи и их результаты
+                (0 — хранить всегда); устаревшие удаляются при создании очереди
+                и не чаще раза в JOB_CLEANUP_INTERVAL при завершении задач
+        """
+        # SQLAlchemy импортируется только при создании очереди, а не при импорте модуля
+        from core.database import DatabaseManager
+
+        self.db_path = os.path.abspath(db_path)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention_hours = retention_hours
+        self.db = DatabaseManager(self.db_path)
+        self._executor = None
+        self._pending = set()
+        self._keys = {}
+        self._lock = threading.Lock()
+
+        # Задачи, оставшиеся от предыдущего запуска, уже никто не выполнит.
+        # В рабочих процессах пула (spawn заново импортирует главный модуль) этого делать нельзя:
+        # там незавершенные задачи — это задачи, выполняемые прямо сейчас.
+        if recover_stale and multiprocessing.current_process().name == 'MainProcess':
+            self.db.fail_unfinished_jobs('Задача прервана перезапуском сервера')
+        self._next_cleanup = 0.0
+        self.delete_expired()
+
+    @property
+    def pending_count(self) -> int:
+        """Количество задач в очереди и в работе."""
+        with self._lock:
+            return len(self._pending)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Ленивое создание пула процессов (при первой задаче)."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def submit(self, kind: str, params: dict) -> str:
+        """
+        Постановка задачи в очередь.
+
+        Args:
+            kind: Тип задачи (ключ JOB_HANDLERS)
+            params: Параметры задачи (JSON-сериализуемый словарь)
+
+        Returns:
+            ID задачи
+
+        Raises:
+            JobQueueFull: если очередь заполнена
+            ValueError: если тип задачи неизвестен
+        """
+        return self.submit_once(kind, params)[0]
+
+    def submit_once(self, kind: str, params: dict, key: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        Постановка задачи с объединением одинаковых: пока задача с тем же ключом
+        в очереди или выполняется, новая не создается.
+
+        Args:
+            kind: Тип задачи (ключ JOB_HANDLERS)
+            params: Параметры задачи (JSON-сериализуемый словарь)
+            key: Ключ объединения (None — без объединения)
+
+        Returns:
+            Кортеж (ID задачи, shared): shared=True, если возвращена уже поставленная задача
+
+        Raises:
+            JobQueueFull: если очередь заполнена
+            ValueError: если тип задачи неизвестен
+        """
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f'Неизвестный тип задачи: {kind}')
+
+        with self._lock:
+            if key is not None and key in self._keys:
+                return self._keys[key], True
+
+            if len(self._pending) >= self.max_pending:
+                raise JobQueueFull(f'Очередь задач заполнена ({self.max_pending})')
+
+            job_id = uuid.uuid4().hex
+            self.db.create_job(job_id, kind, params)
+            try:
+                future = self._get_executor().submit(
+                    run_job, self.db_path, job_id, kind, params
+                )
+            except BrokenProcessPool:
+                # Рабочий процесс аварийно завершился — пересоздаем пул
+                self._executor = None
+                future = self._get_executor().submit(
+                    run_job, self.db_path, job_id, kind, params
+                )
+            self._pending.add(future)
+            if key is not None:
+                self._keys[key] = job_id
+
+        future.add_done_callback(lambda f, job_id=job_id, key=key: self._on_done(f, job_id, key))
+        return job_id, False
+
+    def _on_done(self, future, job_id: str, key: Optional[str] = None):
+        """Обработка завершения задачи (в том числе падения рабочего процесса)."""
+        with self._lock:
+            self._pending.discard(future)
+            if key is not None and self._keys.get(key) == job_id:
+                del self._keys[key]
+
+        error = future.exception()
+        if error is not None:
+            self.db.update_job(job_id, status='failed', error=str(error))
+        self.delete_expired()
+
+    def delete_expired(self) -> int:
+        """
+        Удаление завершенных задач старше retention_hours (не чаще раза в JOB_CLEANUP_INTERVAL).
+
+        Returns:
+            Количество удаленных задач
+        """
+        if self.retention_hours <= 0:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_cleanup:
+                return 0
+            self._next_cleanup = now + JOB_CLEANUP_INTERVAL
+        return self.db.delete_finished_jobs(datetime.now() - timedelta(hours=self.retention_hours))
+
+    def get(self, job_id: str) -> dict:
+        """Получение состояния задачи."""
+        return self.db.get_job(job_id)
+
+    def shutdown(self, wait: bool = True):
+        """Остановка пула процессов."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# ---------------------------------------------------------------------------
+# Код, выполняемый в рабочих процессах
+# ---------------------------------------------------------------------------
+
+_worker_databases: Dict[str, 'DatabaseManager'] = {}
+
+
+def _get_worker_db(db_path: str) -> 'DatabaseManager':
+    """Один экземпляр DatabaseManager на рабочий процесс."""
+    from core.database import DatabaseManager
+
+    if db_path not in _worker_databases:
+        _worker_databases[db_path] = DatabaseManager(db_path)
+    return _worker_databases[db_path]
+
+
+def run_job(db_path: str, job_id: str, kind: str, params: dict):
+    """
+    Выполнение задачи в рабочем процессе с записью прогресса в БД.
+    Обработчик возвращает словарь полей результата (result_path или result_name/result_data).
+
+    Args:
+        db_path: Путь к файлу базы данных SQLite
+        job_id: ID задачи
+        kind: Тип задачи
+        params: Параметры задачи
+    """
+    db = _get_worker_db(db_path)
+    partial = {}
+
+    def progress(percent: int, stage: str, **fields):
+        update = {'status': 'running', 'progress': percent, 'stage': stage}
+        if fields:
+            partial.update(fields)
+            update['partial'] = json.dumps(partial, ensure_ascii=False)
+        db.update_job(job_id, **update)
+
+    progress(0, 'start')
+    try:
+        result = JOB_HANDLERS[kind](params, progress)
+        db.update_job(job_id, status='done', progress=100, stage='done', **result)
+    except Exception as e:
+        db.update_job(job_id, status='failed', error=str(e))
+
+
+def build_report_job(params: dict, progress: Callable[..., None]) -> dict:
+    """
+    Генерация отчета .docx по результатам эксперимента.
+    Графики и документ собираются в памяти, результат сохраняется в таблицу jobs.
+
+    Args:
+        params: user_name, group, material, diameter (мм), length (мм), results
+        progress: Функция обновления прогресса
+
+    Returns:
+        Поля результата задачи (result_name, result_data)
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    from core.calculator import TorsionCalculator
+    from core.report_generator import ReportGenerator, render_report_figures
+
+    user_name = params.get('user_name', 'Пользователь')
+    group = params.get('group', 'ИН-31')
+    material = params.get('material', 'Сталь')
+    diameter = float(params.get('diameter', 10.0)) / 1000
+    length = float(params.get('length', 200.0)) / 1000
+    results = params.get('results', {})
+
+    calculator = TorsionCalculator(diameter, length, material)
+
+    progress(10, 'render')
+    diagram_image, stress_image = render_report_figures(calculator, results)
+
+    progress(60, 'document')
+    stream = BytesIO()
+    report_gen = ReportGenerator()
+    filename = report_gen.generate_experiment_report(
+        user_name, group, calculator, results,
+        diagram_image, stress_image, stream=stream
+    )
+
+    return {'result_name': filename, 'result_data': stream.getvalue()}
+
+
+def build_animation_job(params: dict, progress: Callable[..., None]) -> dict:
+    """
+    Построение анимации кручения в дисковый кэш анимаций.
+    Если такая анимация уже есть в кэше (построена другим процессом), она не строится заново.
+
+    Args:
+        params: key, format, material, diameter (мм), length (мм), moments, angles, fps, duration,
+                lossless, cache_dir, cache_max_bytes, workers (процессов отрисовки кадров, по умолчанию 1)
+        progress: Функция обновления прогресса
+
+    Returns:
+        Поля результата задачи (result_path)
+    """
+    from core.animation_cache import AnimationCache
+
+    cache = AnimationCache(params['cache_dir'], params['cache_max_bytes'])
+    key = params['key']
+    fmt = params.get('format', 'gif')
+    cached = cache.get(key, fmt)
+    if cached:
+        return {'result_path': cached}
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from core.calculator import TorsionCalculator
+    from core.animator import TorsionAnimator
+
+    calculator = TorsionCalculator(float(params['diameter']) / 1000, float(params['length']) / 1000,
+                                   params.get('material', 'Сталь'))
+    animator = TorsionAnimator(calculator, params['moments'], params['angles'])
+
+    reported = [5]
+
+    def frame_saved(frame: int, total: int):
+        percent = 5 + int(90 * (frame + 1) / total)
+        # Не чаще, чем раз в 5%: каждая отметка — запись в БД
+        if percent - reported[0] >= 5:
+            reported[0] = percent
+            progress(percent, 'render')
+
+    progress(5, 'render')
+    temp_path = cache.temp_path(fmt)
+    try:
+        animator.create_torsion_animation(temp_path, fps=int(params.get('fps', 10)),
+                                          duration=int(params.get('duration', 5)),
+                                          progress_callback=frame_saved,
+                                          workers=int(params.get('workers', 1)), fmt=fmt,
+                                          lossless=bool(params.get('lossless', False)))
+        if os.path.getsize(temp_path) == 0:
+            raise RuntimeError('Не удалось сохранить анимацию')
+        path = cache.store(key, fmt, temp_path)
+    finally:
+        if animator.fig is not None:
+            plt.close(animator.fig)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return {'result_path': path}
+
+
+def build_calculation_job(params: dict, progress: Callable[..., None]) -> dict:
+    """
+    Расчет эксперимента с построением графиков по этапам generate → fit → render → encode.
+    После этапа fit модуль сдвига и погрешность доступны как частичные результаты,
+    не дожидаясь отрисовки графиков.
+
+    Args:
+        params: material, diameter (мм), length (мм), max_moment, num_points, seed, plots
+        progress: Функция обновления прогресса
+
+    Returns:
+        Поля результата задачи (result_name, result_data — JSON с results, charts и images)
+    """
+    import numpy as np
+    from core.calculator import TorsionCalculator, determine_failure_type
+    from core.chart_data import build_torsion_chart, build_stress_chart
+
+    material = params.get('material', 'Сталь')
+    length = float(params.get('length', 200.0)) / 1000
+    calculator = TorsionCalculator(float(params.get('diameter', 10.0)) / 1000, length, material)
+    seed = params.get('seed')
+
+    progress(5, 'generate')
+    diagram_data = calculator.generate_diagram_data(
+        float(params.get('max_moment', 100.0)),
+        int(params.get('num_points', 50)),
+        add_experimental_noise=True,
+        error_percent=2.0,
+        rng=np.random.default_rng(int(seed)) if seed is not None else None
+    )
+
+    progress(20, 'fit')
+    results = calculator.process_experiment_data(diagram_data['T'], diagram_data['phi'])
+    results['failure_type'] = determine_failure_type(material)
+    results['Jp'] = float(calculator.calc_polar_moment_inertia())
+    results['Wp'] = float(calculator.calc_polar_section_modulus())
+    charts = {
+        'torsion': build_torsion_chart(
+            results['moments'], results['angles'],
+            length_m=length, Jp=results['Jp'],
+            G_ref=results['G_reference'], G_exp=results['G_experimental']
+        ),
+        'stress': build_stress_chart(calculator, results['T_max'])
+    }
+    progress(40, 'fit',
+             G_experimental=float(results['G_experimental']),
+             G_reference=float(results['G_reference']),
+             relative_error=float(results['relative_error']),
+             T_max=float(results['T_max']),
+             tau_max=float(results['tau_max']),
+             failure_type=results['failure_type'])
+
+    images = {}
+    if params.get('plots', True):
+        progress(45, 'render')
+        import matplotlib
+        matplotlib.use('Agg')
+        from core.report_generator import render_report_figures
+
+        diagram_image, stress_image = render_report_figures(calculator, results)
+        for name, image in (('torsion', diagram_image), ('stress', stress_image)):
+            if image is not None:
+                images[name] = 'data:image/png;base64,' + base64.b64encode(image.getvalue()).decode()
+
+    progress(90, 'encode')
+    payload = json.dumps({'success': True, 'results': results, 'charts': charts, 'images': images},
+                         ensure_ascii=False, default=float)
+    return {'result_name': 'calculation.json', 'result_data': payload.encode('utf-8')}
+
+
+# Обработчики задач по типам
+JOB_HANDLERS = {
+    'report': build_report_job,
+    'animation': build_animation_job,
+    'calculation': build_calculation_job,
+}
@@ -0,0 +1,19 @@
+"""
+Модуль пользовательских каталогов приложения.
+Без тяжелых зависимостей: импортируется лаунчером и runtime-хуком PyInstaller
+до загрузки numpy и matplotlib.
+"""
+
+import os
+import sys
+
+
+def user_cache_dir(app_name: str = 'TorsionLab') -> str:
+    """Пользовательский каталог кэша: %LOCALAPPDATA% (Windows), ~/Library/Caches (macOS), XDG_CACHE_HOME."""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+        return os.path.join(base, app_name, 'Cache')
+    if sys.platform == 'darwin':
+        return os.path.join(os.path.expanduser('~'), 'Library', 'Caches', app_name)
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, app_name.lower())
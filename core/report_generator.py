@@ -8,7 +8,9 @@ from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.style import WD_STYLE_TYPE
 from datetime import datetime
+from io import BytesIO
 import os
+import numpy as np
 import matplotlib.pyplot as plt
 
 
@@ -174,16 +176,18 @@ class ReportGenerator:
             p = self.doc.add_paragraph(item, style='List Number')
             p.paragraph_format.left_indent = Inches(0.5)
     
-    def add_image(self, image_path: str, width: float = 5.0):
+    def add_image(self, image, width: float = 5.0):
         """
         Добавление изображения.
         
         Args:
-            image_path: Путь к изображению
+            image: Путь к изображению или файловый объект (BytesIO) с PNG
             width: Ширина в дюймах
         """
-        if os.path.exists(image_path):
-            self.doc.add_picture(image_path, width=Inches(width))
+        if _image_available(image):
+            if hasattr(image, 'seek'):
+                image.seek(0)
+            self.doc.add_picture(image, width=Inches(width))
             last_paragraph = self.doc.paragraphs[-1]
             last_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
     
@@ -218,7 +222,9 @@ class ReportGenerator:
     def generate_experiment_report(self, user_name: str, group: str, 
                                    calculator, results: dict, 
                                    diagram_path: str = None,
-                                   stress_path: str = None):
+                                   stress_path: str = None,
+                                   output_dir: str = None,
+                                   stream=None):
         """
         Генерация полного отчета по эксперименту.
         
@@ -227,11 +233,13 @@ class ReportGenerator:
             group: Группа
             calculator: Экземпляр TorsionCalculator
             results: Словарь с результатами расчетов
-            diagram_path: Путь к диаграмме T-φ
-            stress_path: Путь к графику распределения напряжений
+            diagram_path: Путь к диаграмме T-φ или BytesIO с PNG
+            stress_path: Путь к графику распределения напряжений или BytesIO с PNG
+            output_dir: Каталог для сохранения (по умолчанию текущий)
+            stream: Файловый объект (BytesIO) для записи документа вместо файла на диске
         
         Returns:
-            Путь к созданному файлу
+            Путь к созданному файлу (при записи в stream — предлагаемое имя файла)
         """
         # Титульный лист
         self.add_title_page(
@@ -308,12 +316,12 @@ class ReportGenerator:
         # 5. Графики
         self.add_heading('5. Диаграммы и графики', level=1)
         
-        if diagram_path and os.path.exists(diagram_path):
+        if _image_available(diagram_path):
             self.add_paragraph('5.1. Диаграмма кручения T-φ:', bold=True)
             self.add_image(diagram_path, width=5.5)
             self.add_paragraph('')
         
-        if stress_path and os.path.exists(stress_path):
+        if _image_available(stress_path):
             self.add_paragraph('5.2. Распределение касательных напряжений по сечению:', bold=True)
             self.add_image(stress_path, width=5.5)
         
@@ -341,6 +349,12 @@ class ReportGenerator:
         
         # Сохранение
         filename = f'Отчет_{user_name.replace(" ", "_")}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.docx'
+        if stream is not None:
+            self.doc.save(stream)
+            stream.seek(0)
+            return filename
+        if output_dir:
+            filename = os.path.join(output_dir, filename)
         self.doc.save(filename)
         return filename
     
@@ -363,3 +377,78 @@ class ReportGenerator:
         self.doc.save(filename)
         return filename
 
+
+def _image_available(image) -> bool:
+    """Проверка, что изображение задано: файловый объект или существующий путь."""
+    if image is None:
+        return False
+    if hasattr(image, 'read'):
+        return True
+    return bool(image) and os.path.exists(image)
+
+
+def render_report_figures(calculator, results: dict):
+    """
+    Построение графиков для отчета в памяти (без временных файлов).
+    
+    Args:
+        calculator: Экземпляр TorsionCalculator
+        results: Словарь с результатами расчетов
+        
+    Returns:
+        Кортеж (BytesIO диаграммы T-φ или None, BytesIO распределения τ или None)
+    """
+    diagram = None
+    stress = None
+    if 'moments' in results and 'angles' in results:
+        diagram = BytesIO()
+        save_diagram_figure(results, diagram)
+        diagram.seek(0)
+    if 'T_max' in results:
+        stress = BytesIO()
+        save_stress_figure(calculator, results['T_max'], stress)
+        stress.seek(0)
+    return diagram, stress
+
+
+def save_diagram_figure(results: dict, target):
+    """
+    Построение диаграммы T-φ для отчета.
+    
+    Args:
+        results: Словарь с результатами (moments, angles)
+        target: Путь к файлу PNG или файловый объект
+    """
+    fig, ax = plt.subplots(figsize=(8, 6))
+    angles_deg = np.array(results['angles']) * 180 / np.pi
+    ax.plot(angles_deg, results['moments'], 'b-', linewidth=2)
+    ax.scatter(angles_deg, results['moments'], c='red', s=30, alpha=0.6)
+    ax.set_xlabel('Угол закручивания φ, град', fontsize=12)
+    ax.set_ylabel('Крутящий момент T, Н·м', fontsize=12)
+    ax.set_title('Диаграмма кручения T-φ', fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(target, dpi=150, format='png')
+    plt.close(fig)
+
+
+def save_stress_figure(calculator, moment: float, target):
+    """
+    Построение графика распределения касательных напряжений для отчета.
+    
+    Args:
+        calculator: Экземпляр TorsionCalculator
+        moment: Крутящий момент, Н·м
+        target: Путь к файлу PNG или файловый объект
+    """
+    fig, ax = plt.subplots(figsize=(8, 6))
+    rho, tau = calculator.calc_shear_stress_distribution(moment, 50)
+    ax.plot(tau/1e6, rho*1000, 'r-', linewidth=2)
+    ax.fill_betweenx(rho*1000, 0, tau/1e6, alpha=0.3, color='red')
+    ax.set_xlabel('Касательное напряжение τ, МПа', fontsize=12)
+    ax.set_ylabel('Радиус ρ, мм', fontsize=12)
+    ax.set_title('Распределение τ по сечению', fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(target, dpi=150, format='png')
+    plt.close(fig)
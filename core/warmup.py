@@ -0,0 +1,84 @@
+"""
+Модуль прогрева: загрузка кэша шрифтов matplotlib и первая отрисовка до первого запроса,
+а также подготовка кэша шрифтов для сборки PyInstaller.
+"""
+
+import json
+import os
+from io import BytesIO
+from typing import Dict, List
+
+from core.calculator import G_REFERENCE
+
+
+# Параметры эксперимента по умолчанию (как в веб-форме и десктоп-приложении)
+DEFAULT_DIAMETER_MM = 10.0
+DEFAULT_LENGTH_MM = 200.0
+DEFAULT_MAX_MOMENT = 100.0
+DEFAULT_NUM_POINTS = 50
+DEFAULT_STRESS_MOMENT = 50.0
+
+
+def default_experiments() -> List[Dict]:
+    """Параметры экспериментов по умолчанию для каждого материала."""
+    return [
+        {
+            'material': material,
+            'diameter': DEFAULT_DIAMETER_MM,
+            'length': DEFAULT_LENGTH_MM,
+            'max_moment': DEFAULT_MAX_MOMENT,
+            'num_points': DEFAULT_NUM_POINTS,
+        }
+        for material in G_REFERENCE
+    ]
+
+
+def warm_up_matplotlib():
+    """
+    Загрузка кэша шрифтов и отрисовка маленькой фигуры с кириллицей обычным и жирным
+    начертанием (как на графиках приложения). Не использует pyplot, поэтому не зависит
+    от выбранного бэкенда и безопасна в любом процессе.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(2, 2))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot([0, 1], [0, 1], label='τ(ρ)')
+    ax.set_title('Прогрев', fontweight='bold')
+    ax.set_xlabel('Угол φ, град')
+    ax.legend()
+    fig.savefig(BytesIO(), format='png')
+
+
+def build_font_cache(target_dir: str) -> str:
+    """
+    Построение кэша шрифтов matplotlib для поставки в сборке PyInstaller.
+    В кэш попадают только шрифты из состава matplotlib: их пути хранятся относительно
+    каталога данных matplotlib и остаются верными на любом компьютере.
+
+    Args:
+        target_dir: Каталог для файла fontlist-v*.json
+
+    Returns:
+        Путь к созданному файлу
+    """
+    import matplotlib
+    from matplotlib import font_manager
+
+    data_path = os.path.realpath(matplotlib.get_data_path())
+    manager = font_manager.FontManager()
+    manager.ttflist = [f for f in manager.ttflist if os.path.realpath(f.fname).startswith(data_path)]
+    manager.afmlist = [f for f in manager.afmlist if os.path.realpath(f.fname).startswith(data_path)]
+
+    os.makedirs(target_dir, exist_ok=True)
+    path = os.path.join(target_dir, f'fontlist-v{font_manager.FontManager.__version__}.json')
+    font_manager.json_dump(manager, path)
+
+    # Проверка: все пути в кэше относительные
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)['ttflist']
+    if any(os.path.isabs(entry['fname']) for entry in entries):
+        raise RuntimeError('В кэше шрифтов остались абсолютные пути')
+    return path
@@ -6,6 +6,7 @@
 Группа: ИН-31
 """
 
+import multiprocessing
 import sys
 import subprocess
 import webbrowser
@@ -24,18 +25,31 @@ class FlaskServerThread(QThread):
     def __init__(self):
         super().__init__()
         self.process = None
+        self.log_path = None
     
     def run(self):
         try:
             import os
-            # Запуск Flask в фоновом режиме
-            self.process = subprocess.Popen(
-                [sys.executable, 'web_app.py'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=os.path.dirname(os.path.abspath(__file__))
-            )
+            from core.paths import user_cache_dir
+            
+            # Запуск Flask в фоновом режиме (несколько процессов-воркеров, см. serve.py).
+            # Вывод пишется в журнал в пользовательском кэше: PIPE никто не читает (заполненный
+            # остановил бы сервер), а без журнала ошибка при запуске сервера не видна
+            log_dir = user_cache_dir()
+            os.makedirs(log_dir, exist_ok=True)
+            self.log_path = os.path.join(log_dir, 'serve.log')
+            with open(self.log_path, 'ab') as log:
+                self.process = subprocess.Popen(
+                    [sys.executable, 'serve.py', '--workers', str(min(os.cpu_count() or 1, 4))],
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    cwd=os.path.dirname(os.path.abspath(__file__))
+                )
             time.sleep(2)  # Даём время на запуск
+            if self.process.poll() is not None:
+                print(f"Сервер завершился при запуске (код {self.process.returncode}), журнал: {self.log_path}")
+                self.server_started.emit(False)
+                return
             self.server_started.emit(True)
         except Exception as e:
             print(f"Ошибка запуска Flask: {e}")
@@ -43,6 +57,8 @@ class FlaskServerThread(QThread):
     
     def stop(self):
         if self.process:
+            # POSIX: SIGTERM, serve.py дожидается завершения начатых запросов.
+            # Windows: terminate() — это TerminateProcess, сервер завершается сразу, без ожидания
             self.process.terminate()
             self.process.wait()
 
@@ -335,7 +351,9 @@ class LauncherWindow(QMainWindow):
             QTimer.singleShot(500, lambda: webbrowser.open('http://localhost:5001'))
             QTimer.singleShot(1500, self.close)
         else:
-            self.status_label.setText("❌ Ошибка запуска сервера")
+            log_path = self.flask_thread.log_path
+            self.status_label.setText(f"❌ Ошибка запуска сервера (журнал: {log_path})" if log_path
+                                      else "❌ Ошибка запуска сервера")
             self.web_btn.setEnabled(True)
     
     def open_docs(self):
@@ -389,6 +407,9 @@ def main():
 
 
 if __name__ == '__main__':
+    # Сборка PyInstaller: дочерние процессы пула (сохранение анимации) запускаются этим же exe
+    multiprocessing.freeze_support()
+    
     print("="*70)
     print("  🚀 ПРОФЕССИОНАЛЬНЫЙ ЛАУНЧЕР")
     print("  Лабораторная работа №4: Кручение")
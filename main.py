@@ -7,16 +7,20 @@
 Дата: 15.12.2025
 """
 
+import multiprocessing
 import sys
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QIcon
-from ui.main_window import TorsionLabWindow
 
 
 def main():
     """Главная функция запуска приложения."""
     app = QApplication(sys.argv)
     
+    # Главное окно (с matplotlib) импортируется после создания QApplication;
+    # БД, анимация и генератор отчетов загружаются при первом использовании
+    from ui.main_window import TorsionLabWindow
+    
     # Настройка стиля приложения
     app.setStyle('Fusion')
     
@@ -35,6 +39,10 @@ def main():
 
 
 if __name__ == '__main__':
+    # Анимация сохраняется в пуле процессов: в собранном exe дочерние процессы
+    # запускаются тем же исполняемым файлом
+    multiprocessing.freeze_support()
+    
     print("="*70)
     print("  ЛАБОРАТОРНАЯ РАБОТА №4: ОПРЕДЕЛЕНИЕ МОДУЛЯ СДВИГА ПРИ КРУЧЕНИИ")
     print("="*70)
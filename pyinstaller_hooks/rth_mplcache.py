@@ -0,0 +1,37 @@
+"""
+Runtime-хук PyInstaller: готовый кэш шрифтов matplotlib из сборки.
+
+Без него matplotlib при каждом запуске собранного приложения заново сканирует
+шрифты (каталог настроек onefile-сборки временный). Кэш строится при сборке
+(tools/build_font_cache.py) и копируется до импорта matplotlib в постоянный
+каталог настроек (<пользовательский кэш>/matplotlib, если MPLCONFIGDIR не задан):
+копия делается один раз и обновляется, только если в сборке другой файл.
+Переменная наследуется процессами сервера, запущенными лаунчером.
+"""
+
+import filecmp
+import glob
+import os
+import shutil
+import sys
+
+from core.paths import user_cache_dir
+
+
+def _install_font_cache():
+    bundled = glob.glob(os.path.join(getattr(sys, '_MEIPASS', ''), 'mpl_cache', 'fontlist-v*.json'))
+    if not bundled:
+        return
+
+    config_dir = os.environ.get('MPLCONFIGDIR')
+    if not config_dir:
+        config_dir = os.environ['MPLCONFIGDIR'] = os.path.join(user_cache_dir(), 'matplotlib')
+    os.makedirs(config_dir, exist_ok=True)
+
+    for path in bundled:
+        target = os.path.join(config_dir, os.path.basename(path))
+        if not os.path.exists(target) or not filecmp.cmp(path, target, shallow=False):
+            shutil.copyfile(path, target)
+
+
+_install_font_cache()
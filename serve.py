@@ -0,0 +1,262 @@
+"""
+Производственный запуск веб-приложения: несколько процессов-воркеров
+на общем слушающем сокете (pre-fork), только стандартная библиотека и werkzeug.
+
+Каждый воркер импортирует web_app уже после fork, поэтому у него свой движок БД
+и своё «прогретое» состояние matplotlib. По SIGTERM/SIGINT воркеры перестают
+принимать соединения и дожидаются завершения начатых запросов.
+
+Запуск:
+    python serve.py --workers 4 --threads 8 --port 5001
+
+Авторы: Коваленко К., Иокерс А.
+Группа: ИН-31
+"""
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+
+class RequestHandler(WSGIRequestHandler):
+    """
+    Обработчик HTTP/1.0: соединение закрывается после ответа,
+    чтобы простаивающие keep-alive клиенты не занимали потоки пула.
+    """
+    protocol_version = 'HTTP/1.0'
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    WSGI-сервер с ограниченным пулом потоков.
+    Пока все потоки заняты, воркер не принимает новые соединения —
+    они остаются в очереди ядра и достаются свободным воркерам.
+    """
+    multithread = True
+
+    def __init__(self, *args, threads: int = 4, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='torsion-http')
+        self._slots = threading.BoundedSemaphore(threads)
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        self.executor.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self):
+        """Закрытие сокета и ожидание уже начатых запросов (graceful drain)."""
+        super().server_close()
+        # BaseWSGIServer вызывает server_close еще в __init__ (при передаче fd), до создания пула
+        executor = getattr(self, 'executor', None)
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def create_listener(host: str, port: int, backlog: int = 128) -> socket.socket:
+    """
+    Создание общего слушающего сокета до fork.
+
+    Args:
+        host: Адрес
+        port: Порт
+        backlog: Длина очереди соединений ядра
+
+    Returns:
+        Слушающий сокет
+    """
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.create_server((host, port), family=family, backlog=backlog, reuse_port=False)
+    sock.set_inheritable(True)
+    return sock
+
+
+def warm_up_worker():
+    """Прогрев воркера: загрузка шрифтов matplotlib и первая отрисовка."""
+    from core.warmup import warm_up_matplotlib
+
+    warm_up_matplotlib()
+
+
+def run_worker(listener: socket.socket, host: str, threads: int) -> int:
+    """
+    Цикл воркера: импорт приложения, прогрев, обслуживание запросов до сигнала.
+
+    Args:
+        listener: Общий слушающий сокет
+        host: Адрес (для определения семейства адресов)
+        threads: Количество потоков обработки запросов
+
+    Returns:
+        Код завершения процесса
+    """
+    import web_app
+
+    warm_up_worker()
+    web_app.get_db()  # свой движок БД у каждого воркера, открытый до первого запроса
+    web_app.start_warm_up()  # графики по умолчанию строятся в фоне, воркер уже принимает запросы
+    server = PooledWSGIServer(host, listener.getsockname()[1], web_app.app,
+                              handler=RequestHandler, fd=listener.fileno(), threads=threads)
+
+    def stop(signum, frame):
+        # shutdown() ждет выхода из serve_forever, поэтому вызывается из отдельного потока
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f'  [воркер {os.getpid()}] готов, потоков: {threads}', flush=True)
+    server.serve_forever()
+    server.server_close()
+    web_app.shutdown_job_queue(wait=True)
+    print(f'  [воркер {os.getpid()}] остановлен', flush=True)
+    return 0
+
+
+def spawn_worker(listener: socket.socket, host: str, threads: int) -> int:
+    """Запуск воркера через fork. Возвращает PID дочернего процесса."""
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            code = run_worker(listener, host, threads)
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+    return pid
+
+
+def recover_stale_jobs():
+    """
+    Пометка задач, прерванных прошлым запуском, один раз в мастер-процессе.
+    Воркерам это запрещено: иначе перезапущенный воркер «провалит» задачи соседей.
+    """
+    from core.database import DatabaseManager
+
+    DatabaseManager().fail_unfinished_jobs('Задача прервана перезапуском сервера')
+    os.environ['TORSION_JOBS_RECOVER'] = '0'
+
+
+def serve(host: str, port: int, workers: int, threads: int, graceful_timeout: float) -> int:
+    """
+    Мастер-процесс: создает сокет, запускает воркеров, перезапускает упавших
+    и при SIGTERM/SIGINT корректно останавливает всех.
+
+    Args:
+        host: Адрес
+        port: Порт
+        workers: Количество процессов-воркеров
+        threads: Количество потоков в каждом воркере
+        graceful_timeout: Сколько ждать завершения начатых запросов, с
+
+    Returns:
+        Код завершения
+    """
+    listener = create_listener(host, port)
+    recover_stale_jobs()
+
+    if not hasattr(os, 'fork'):
+        # Windows: fork недоступен — один процесс с пулом потоков
+        print('  fork недоступен, запуск в одном процессе', flush=True)
+        return run_worker(listener, host, threads)
+
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    children = {spawn_worker(listener, host, threads) for _ in range(workers)}
+
+    while not stopping:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        if pid and pid in children:
+            children.discard(pid)
+            print(f'  воркер {pid} завершился (статус {status}), перезапуск', flush=True)
+            time.sleep(1.0)  # не перезапускать в цикле, если воркер падает сразу при старте
+            children.add(spawn_worker(listener, host, threads))
+        time.sleep(0.2)
+
+    # Graceful drain: воркеры дообрабатывают начатые запросы
+    print('\n  Остановка: ожидание завершения запросов...', flush=True)
+    for pid in children:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    deadline = time.monotonic() + graceful_timeout
+    while children and time.monotonic() < deadline:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            children.discard(pid)
+        else:
+            time.sleep(0.1)
+
+    for pid in children:
+        print(f'  воркер {pid} не успел завершиться, SIGKILL', flush=True)
+        try:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+
+    listener.close()
+    return 0
+
+
+def main():
+    """Разбор аргументов командной строки и запуск сервера."""
+    parser = argparse.ArgumentParser(description='Многопроцессный запуск веб-приложения')
+    parser.add_argument('--host', default=os.environ.get('TORSION_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('TORSION_PORT', 5001)))
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('TORSION_WORKERS', os.cpu_count() or 1)),
+                        help='количество процессов (по умолчанию — число ядер)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('TORSION_THREADS', 4)),
+                        help='потоков обработки запросов в каждом процессе')
+    parser.add_argument('--graceful-timeout', type=float,
+                        default=float(os.environ.get('TORSION_GRACEFUL_TIMEOUT', 30)),
+                        help='время на завершение начатых запросов при остановке, с')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  FLASK ВЕБ-ПРИЛОЖЕНИЕ: ПРОИЗВОДСТВЕННЫЙ РЕЖИМ")
+    print("=" * 70)
+    print(f"  Адрес: http://{args.host}:{args.port}")
+    print(f"  Воркеров: {args.workers}, потоков в каждом: {args.threads}")
+    print("=" * 70, flush=True)
+
+    sys.exit(serve(args.host, args.port, args.workers, args.threads, args.graceful_timeout))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,479 @@
+/*
+ * Логика главной страницы лабораторной работы: расчет, графики, сохранение
+ * экспериментов и тест (ранее — встроенный <script> в index.html).
+ */
+
+let currentResults = null;
+let currentInput = null;  // параметры последнего расчета и seed его шума (для живого превью)
+let currentCharts = null;
+let selectedExampleRow = null;
+
+// Декодирование массивов, переданных как base64 float32 (encoding=f32);
+// по умолчанию страница запрашивает precision=6 — со сжатием gzip это компактнее
+function decodeArray(value) {
+    if (!value || Array.isArray(value) || value.encoding !== 'base64') return value;
+    const raw = atob(value.data);
+    const bytes = new Uint8Array(raw.length);
+    for (let i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+    return Array.from(new Float32Array(bytes.buffer, 0, value.length));
+}
+
+function decodeArrays(results) {
+    results.moments = decodeArray(results.moments);
+    results.angles = decodeArray(results.angles);
+    return results;
+}
+
+// Эталонные примеры
+const examples = [
+    {material: 'Сталь', diameter: 10.0, length: 200.0, max_moment: 100.0, G: 81000, desc: 'Стандартный стальной образец'},
+    {material: 'Сталь', diameter: 15.0, length: 250.0, max_moment: 200.0, G: 81000, desc: 'Усиленный стальной образец'},
+    {material: 'Чугун', diameter: 12.0, length: 180.0, max_moment: 80.0, G: 40000, desc: 'Стандартный чугунный образец'},
+    {material: 'Чугун', diameter: 18.0, length: 220.0, max_moment: 150.0, G: 40000, desc: 'Усиленный чугунный образец'},
+    {material: 'Дерево', diameter: 20.0, length: 300.0, max_moment: 50.0, G: 500, desc: 'Деревянный образец (сосна)'},
+    {material: 'Дерево', diameter: 25.0, length: 350.0, max_moment: 70.0, G: 500, desc: 'Деревянный образец (дуб)'},
+    {material: 'Сталь', diameter: 8.0, length: 150.0, max_moment: 60.0, G: 81000, desc: 'Тонкий стальной стержень'},
+    {material: 'Чугун', diameter: 10.0, length: 200.0, max_moment: 90.0, G: 40000, desc: 'Стандартный чугунный вал'}
+];
+
+// Заполнение таблицы примеров
+function populateExamples() {
+    const tbody = document.getElementById('examplesTableBody');
+    tbody.innerHTML = '';
+    
+    examples.forEach((ex, idx) => {
+        const row = tbody.insertRow();
+        row.onclick = () => selectExample(idx);
+        row.ondblclick = () => { selectExample(idx); applyExample(); };
+        
+        let badgeClass = '';
+        if (ex.material === 'Сталь') badgeClass = 'badge-steel';
+        else if (ex.material === 'Чугун') badgeClass = 'badge-cast-iron';
+        else badgeClass = 'badge-wood';
+        
+        row.innerHTML = `
+            <td style="font-weight: bold; text-align: center;">${idx + 1}</td>
+            <td><span class="example-badge ${badgeClass}">${ex.material}</span></td>
+            <td>${ex.diameter.toFixed(1)}</td>
+            <td>${ex.length.toFixed(1)}</td>
+            <td>${ex.max_moment.toFixed(1)}</td>
+            <td>${ex.G.toLocaleString()}</td>
+            <td><em>${ex.desc}</em></td>
+        `;
+    });
+}
+
+function showExamples() {
+    populateExamples();
+    document.getElementById('examplesModal').style.display = 'block';
+}
+
+function closeExamples() {
+    document.getElementById('examplesModal').style.display = 'none';
+    selectedExampleRow = null;
+}
+
+function selectExample(idx) {
+    const tbody = document.getElementById('examplesTableBody');
+    const rows = tbody.getElementsByTagName('tr');
+    
+    // Убираем выделение со всех строк
+    for (let row of rows) {
+        row.classList.remove('selected');
+    }
+    
+    // Выделяем выбранную
+    rows[idx].classList.add('selected');
+    selectedExampleRow = idx;
+}
+
+function applyExample() {
+    if (selectedExampleRow === null) {
+        alert('Пожалуйста, выберите пример!');
+        return;
+    }
+    
+    const ex = examples[selectedExampleRow];
+    
+    // Заполняем форму
+    document.getElementById('material').value = ex.material;
+    document.getElementById('diameter').value = ex.diameter;
+    document.getElementById('length').value = ex.length;
+    document.getElementById('maxMoment').value = ex.max_moment;
+    
+    closeExamples();
+    
+    // Показываем уведомление
+    const results = document.getElementById('results');
+    results.textContent = `✅ Применен пример: ${ex.desc}\nМатериал: ${ex.material}, D=${ex.diameter}мм, L=${ex.length}мм, T_max=${ex.max_moment}Н·м\n\nНажмите "Выполнить расчет" для запуска.`;
+    results.style.background = '#d5f4e6';
+    results.style.color = '#27ae60';
+    
+    setTimeout(() => {
+        results.style.background = '#f8f9fa';
+        results.style.color = 'inherit';
+    }, 3000);
+}
+
+// Закрытие модального окна при клике вне его
+window.onclick = function(event) {
+    const modal = document.getElementById('examplesModal');
+    if (event.target == modal) {
+        closeExamples();
+    }
+}
+
+// Переключение табов
+function switchTab(index) {
+    const tabs = document.querySelectorAll('.tab');
+    const contents = document.querySelectorAll('.tab-content');
+    
+    tabs.forEach(t => t.classList.remove('active'));
+    contents.forEach(c => c.classList.remove('active'));
+    
+    tabs[index].classList.add('active');
+    contents[index].classList.add('active');
+    
+    // Автоматическая загрузка данных
+    if (index === 2) {
+        loadExperiments();
+    } else if (index === 3) {
+        loadTestQuestions();
+    }
+}
+
+// Выполнение расчета фоновой задачей: ход расчета и G, δ, τmax (сразу после этапа fit,
+// до окончания задачи) приходят потоком Server-Sent Events, полный результат — по download_url
+async function performCalculation() {
+    const loading = document.getElementById('loading');
+    const resultsDiv = document.getElementById('results');
+    
+    loading.classList.add('active');
+    resultsDiv.textContent = 'Расчет...';
+    
+    const data = {
+        material: document.getElementById('material').value,
+        diameter: parseFloat(document.getElementById('diameter').value),
+        length: parseFloat(document.getElementById('length').value),
+        max_moment: parseFloat(document.getElementById('maxMoment').value),
+        num_points: parseInt(document.getElementById('numPoints').value),
+        // seed задается страницей, чтобы живое превью показало ту же кривую
+        seed: Math.floor(Math.random() * 2 ** 31)
+    };
+    
+    try {
+        const response = await fetch('/api/calculate/async', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            // Графики страница рисует сама по charts — растровые не нужны
+            body: JSON.stringify({ ...data, plots: false })
+        });
+        
+        // Очередь задач заполнена — обычный расчет в ответе на запрос
+        const result = response.status === 503
+            ? await calculateDirect(data)
+            : await calculateInBackground(await response.json(), resultsDiv);
+        
+        if (result.success) {
+            currentResults = decodeArrays(result.results);
+            currentInput = data;
+            currentCharts = result.charts;
+            displayResults(result.results, data);
+        } else {
+            resultsDiv.textContent = `Ошибка: ${result.error}`;
+        }
+    } catch (error) {
+        resultsDiv.textContent = `Ошибка: ${error.message}`;
+    } finally {
+        loading.classList.remove('active');
+    }
+}
+
+async function calculateDirect(data) {
+    const response = await fetch('/api/calculate?precision=6', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(data)
+    });
+    return response.json();
+}
+
+async function calculateInBackground(job, resultsDiv) {
+    if (!job.success) return job;
+    
+    const done = await waitForJob(job.events_url, (state) => {
+        const partial = state.partial || {};
+        if (partial.G_experimental !== undefined) {
+            resultsDiv.textContent = `Построение графиков (${state.progress}%)...\n\n` +
+                `  • Модуль сдвига (эксп.):       G = ${partial.G_experimental.toFixed(2)} МПа\n` +
+                `  • Относительная погрешность:   δ = ${partial.relative_error.toFixed(2)} %\n` +
+                `  • Макс. касательное напряжение: τ_max = ${partial.tau_max.toFixed(2)} МПа`;
+            renderResultBadges(partial);
+        } else {
+            resultsDiv.textContent = `Расчет (${state.progress}%)...`;
+        }
+    });
+    
+    const response = await fetch(done.download_url);
+    return response.json();
+}
+
+// Ожидание фоновой задачи по потоку событий: progress — ход, done/failed/timeout — конец
+// (поток закрывается, иначе EventSource переподключался бы к завершенной задаче)
+function waitForJob(eventsUrl, onProgress) {
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(eventsUrl);
+        source.addEventListener('progress', (event) => onProgress(JSON.parse(event.data)));
+        source.addEventListener('done', (event) => {
+            source.close();
+            resolve(JSON.parse(event.data));
+        });
+        for (const name of ['failed', 'timeout']) {
+            source.addEventListener(name, (event) => {
+                source.close();
+                reject(new Error(JSON.parse(event.data).error || 'Задача не завершилась вовремя'));
+            });
+        }
+        // Обрыв соединения — EventSource переподключается сам; закрытый поток (например, 404) — ошибка
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) {
+                reject(new Error('Поток событий задачи недоступен'));
+            }
+        };
+    });
+}
+
+// Отображение результатов
+function displayResults(results, inputData) {
+    const text = `
+${'='.repeat(70)}
+  РЕЗУЛЬТАТЫ ЭКСПЕРИМЕНТАЛЬНОГО ОПРЕДЕЛЕНИЯ МОДУЛЯ СДВИГА
+${'='.repeat(70)}
+
+ИСХОДНЫЕ ДАННЫЕ:
+  • Материал:                    ${inputData.material}
+  • Диаметр D:                   ${inputData.diameter.toFixed(2)} мм
+  • Длина L:                     ${inputData.length.toFixed(2)} мм
+  • Полярный момент инерции Jp:  ${results.Jp.toExponential(6)} м⁴
+  • Полярный момент сопротивления Wp: ${results.Wp.toExponential(6)} м³
+
+РЕЗУЛЬТАТЫ РАСЧЕТА:
+  • Модуль сдвига (эксп.):       G = ${results.G_experimental.toFixed(2)} МПа
+  • Модуль сдвига (эталон):      G = ${results.G_reference.toFixed(2)} МПа
+  • Относительная погрешность:   δ = ${results.relative_error.toFixed(2)} %
+
+МЕХАНИЧЕСКИЕ ХАРАКТЕРИСТИКИ:
+  • Максимальный момент:         T_max = ${results.T_max.toFixed(2)} Н·м
+  • Угол при T_max:              φ_max = ${results.phi_max.toFixed(5)} рад
+                                (${(results.phi_max * 180 / Math.PI).toFixed(3)}°)
+  • Макс. касательное напряжение: τ_max = ${results.tau_max.toFixed(2)} МПа
+  • Макс. остаточный сдвиг:      γ_max = ${results.gamma_max.toFixed(5)} рад
+
+ХАРАКТЕР РАЗРУШЕНИЯ:
+  ${results.failure_type}
+
+${'='.repeat(70)}
+    `;
+    
+    document.getElementById('results').textContent = text;
+    renderResultBadges(results);
+}
+
+function renderResultBadges(results) {
+    const wrap = document.getElementById('resultBadges');
+    if (!wrap) return;
+    wrap.innerHTML = `
+        <div class="metric-chip success">Gэксп: ${results.G_experimental.toFixed(1)} МПа</div>
+        <div class="metric-chip info">Gэталон: ${results.G_reference.toFixed(1)} МПа</div>
+        <div class="metric-chip warn">δ: ${results.relative_error.toFixed(2)}%</div>
+        <div class="metric-chip info">T_max: ${results.T_max.toFixed(1)} Н·м</div>
+        <div class="metric-chip info">τ_max: ${results.tau_max.toFixed(2)} МПа</div>
+    `;
+}
+
+// Отображение графика (отрисовка в браузере по данным из /api/calculate)
+function showGraph(type) {
+    if (!currentResults || !currentCharts) {
+        alert('Сначала выполните расчет!');
+        return;
+    }
+    
+    const container = document.getElementById('graphContainer');
+    
+    try {
+        TorsionCharts.render(container, currentCharts[type]);
+    } catch (error) {
+        container.innerHTML = `<p>Ошибка: ${error.message}</p>`;
+    }
+}
+
+// Живое превью анимации: поток MJPEG, кадры появляются по мере отрисовки на сервере
+function showAnimationStream() {
+    // После расчета — та же кривая, что в результатах (тот же seed), иначе — по полям формы
+    const params = new URLSearchParams(currentInput || {
+        material: document.getElementById('material').value,
+        diameter: document.getElementById('diameter').value,
+        length: document.getElementById('length').value,
+        max_moment: document.getElementById('maxMoment').value,
+        num_points: document.getElementById('numPoints').value
+    });
+    document.getElementById('animationCaption').textContent =
+        `${params.get('material')}, D = ${params.get('diameter')} мм, L = ${params.get('length')} мм`;
+    document.getElementById('animationPreview').src = `/api/animation/stream?${params}`;
+}
+
+// Сохранение в БД
+async function saveToDatabase() {
+    if (!currentResults) {
+        alert('Сначала выполните расчет!');
+  return;
+}
+
+    const data = {
+        user_name: document.getElementById('userName').value,
+        material: document.getElementById('material').value,
+        diameter: parseFloat(document.getElementById('diameter').value),
+        length: parseFloat(document.getElementById('length').value),
+        input_params: {
+            max_moment: parseFloat(document.getElementById('maxMoment').value),
+            num_points: parseInt(document.getElementById('numPoints').value)
+        },
+        results: currentResults
+    };
+    
+    try {
+        const response = await fetch('/api/experiments', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+        
+        const result = await response.json();
+        
+        if (result.success) {
+            alert(`Эксперимент сохранен (ID: ${result.experiment_id})`);
+  } else {
+            alert(`Ошибка: ${result.error}`);
+  }
+} catch (error) {
+        alert(`Ошибка: ${error.message}`);
+    }
+}
+
+// Загрузка экспериментов
+async function loadExperiments() {
+    const listDiv = document.getElementById('experimentsList');
+    listDiv.innerHTML = '<p>Загрузка...</p>';
+    
+    try {
+        const response = await fetch('/api/experiments');
+  const result = await response.json();
+
+        if (result.success && result.experiments.length > 0) {
+            let html = '<table style="width:100%; border-collapse: collapse;">';
+            html += '<tr style="background:#ecf0f1;"><th style="padding:10px; border:1px solid #bdc3c7;">ID</th><th style="padding:10px; border:1px solid #bdc3c7;">Дата</th><th style="padding:10px; border:1px solid #bdc3c7;">Пользователь</th><th style="padding:10px; border:1px solid #bdc3c7;">Материал</th><th style="padding:10px; border:1px solid #bdc3c7;">D (мм)</th><th style="padding:10px; border:1px solid #bdc3c7;">L (мм)</th></tr>';
+            
+            result.experiments.forEach(exp => {
+                html += `<tr>
+                    <td style="padding:8px; border:1px solid #bdc3c7; text-align:center;">${exp.id}</td>
+                    <td style="padding:8px; border:1px solid #bdc3c7;">${exp.timestamp}</td>
+                    <td style="padding:8px; border:1px solid #bdc3c7;">${exp.user_name}</td>
+                    <td style="padding:8px; border:1px solid #bdc3c7;">${exp.material}</td>
+                    <td style="padding:8px; border:1px solid #bdc3c7; text-align:center;">${(exp.diameter * 1000).toFixed(2)}</td>
+                    <td style="padding:8px; border:1px solid #bdc3c7; text-align:center;">${(exp.length * 1000).toFixed(2)}</td>
+                </tr>`;
+            });
+            
+            html += '</table>';
+            listDiv.innerHTML = html;
+  } else {
+            listDiv.innerHTML = '<p>Нет сохраненных экспериментов.</p>';
+  }
+} catch (error) {
+        listDiv.innerHTML = `<p>Ошибка: ${error.message}</p>`;
+    }
+}
+
+// Загрузка вопросов теста
+function loadTestQuestions() {
+    const questions = [
+        { q: '1. Как формулируется закон Гука при кручении?', a: ['φ = T·ℓ/(G·Jp)', 'σ = E·ε', 'τ = G·γ', 'F = k·Δl'] },
+        { q: '2. В какой точке сечения наблюдаются максимальные касательные напряжения при кручении?', a: ['В центре сечения', 'На расстоянии R/2 от центра', 'На поверхности вала (максимальный радиус)', 'Равномерно по всему сечению'] },
+        { q: '3. Как вычисляется полярный момент инерции круглого сечения?', a: ['Jp = π·D³/32', 'Jp = π·D⁴/32', 'Jp = π·D²/4', 'Jp = π·D⁴/64'] },
+        { q: '4. Что такое модуль сдвига G?', a: ['Коэффициент пропорциональности при растяжении', 'Характеристика упругих свойств материала при сдвиге', 'Отношение нормального напряжения к деформации', 'Предел прочности при кручении'] },
+        { q: '5. В каких единицах измеряется модуль сдвига?', a: ['Н', 'мм', 'МПа (Па)', 'рад'] },
+        { q: '6. Каков приблизительный модуль сдвига для стали?', a: ['8·10⁴ МПа', '2·10⁵ МПа', '4·10⁴ МПа', '1·10³ МПа'] },
+        { q: '7. Как распределяются касательные напряжения по сечению круглого вала?', a: ['Равномерно', 'По параболическому закону', 'По линейному закону (от 0 в центре до максимума на поверхности)', 'Максимум в центре, минимум на поверхности'] },
+        { q: '8. Какой характер разрушения при кручении у стали?', a: ['Расслоение вдоль волокон', 'Разрушение по плоскости, перпендикулярной оси', 'Разрушение по винтовой поверхности под углом 45° (срез)', 'Хрупкое разрушение без деформации'] }
+    ];
+    
+    let html = '';
+    questions.forEach((item, i) => {
+        html += `<div class="test-question">
+            <h3>${item.q}</h3>`;
+        
+        item.a.forEach((answer, j) => {
+            html += `<div class="test-option">
+                <input type="radio" name="q${i}" value="${j}" id="q${i}_${j}">
+                <label for="q${i}_${j}">${answer}</label>
+            </div>`;
+        });
+        
+        html += '</div>';
+    });
+    
+    document.getElementById('testQuestions').innerHTML = html;
+}
+
+// Проверка теста
+async function checkTest() {
+    const answers = {};
+    
+    for (let i = 0; i < 8; i++) {
+        const selected = document.querySelector(`input[name="q${i}"]:checked`);
+        if (selected) {
+            answers[i] = parseInt(selected.value);
+        }
+    }
+    
+    if (Object.keys(answers).length < 8) {
+        alert('Пожалуйста, ответьте на все вопросы!');
+  return;
+}
+
+try {
+        const response = await fetch('/api/test', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                answers: answers,
+                user_name: document.getElementById('userName').value
+            })
+  });
+
+  const result = await response.json();
+
+  if (result.success) {
+            let className = 'alert-success';
+            if (result.percentage < 50) className = 'alert-danger';
+            else if (result.percentage < 75) className = 'alert-info';
+            
+            document.getElementById('testResult').innerHTML = `
+                <div class="alert ${className}">
+                    <h3>${result.grade}</h3>
+                    <p>Правильных ответов: ${result.score} из ${result.total}</p>
+                    <p>Процент: ${result.percentage.toFixed(1)}%</p>
+        </div>
+    `;
+        } else {
+            alert(`Ошибка: ${result.error}`);
+  }
+} catch (error) {
+        alert(`Ошибка: ${error.message}`);
+    }
+}
+
+// Автозагрузка при открытии страницы
+window.addEventListener('load', () => {
+    console.log('Лабораторная работа загружена.');
+});
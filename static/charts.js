@@ -0,0 +1,400 @@
+/*
+ * Лёгкие интерактивные графики на canvas для лабораторной работы по кручению.
+ * Рисует диаграмму T-φ и распределение τ(ρ) по данным /api/calculate (поле charts)
+ * без обращения к серверу: масштаб колесом мыши, перемещение перетаскиванием,
+ * двойной клик — исходный вид.
+ */
+(function (global) {
+    'use strict';
+
+    const COLORS = {
+        curve: '#2471a3',
+        points: '#e74c3c',
+        theory: '#16a085',
+        elastic: 'rgba(39, 174, 96, 0.12)',
+        elasticLine: '#f39c12',
+        stress: '#c0392b',
+        stressFill: 'rgba(231, 76, 60, 0.25)',
+        grid: 'rgba(0, 0, 0, 0.08)',
+        axis: '#2c3e50',
+        text: '#2c3e50'
+    };
+
+    const PADDING = { left: 70, right: 20, top: 42, bottom: 52 };
+
+    // «Красивые» деления оси
+    function niceTicks(min, max, count) {
+        const span = max - min;
+        if (!(span > 0)) return [min];
+        const rough = span / count;
+        const power = Math.pow(10, Math.floor(Math.log10(rough)));
+        const fraction = rough / power;
+        let step;
+        if (fraction < 1.5) step = 1;
+        else if (fraction < 3) step = 2;
+        else if (fraction < 7) step = 5;
+        else step = 10;
+        step *= power;
+
+        const ticks = [];
+        for (let v = Math.ceil(min / step) * step; v <= max + step * 1e-9; v += step) {
+            ticks.push(Math.abs(v) < step * 1e-9 ? 0 : v);
+        }
+        return ticks;
+    }
+
+    function formatTick(value) {
+        const abs = Math.abs(value);
+        if (abs !== 0 && (abs >= 1e5 || abs < 1e-3)) return value.toExponential(1);
+        return parseFloat(value.toPrecision(6)).toString();
+    }
+
+    // Описание слоёв графика по данным сервера
+    function buildLayers(spec) {
+        const layers = [];
+
+        if (spec.kind === 'torsion') {
+            if (spec.elastic_region) {
+                layers.push({ type: 'band', x0: spec.elastic_region.x_start, x1: spec.elastic_region.x_end,
+                              color: COLORS.elastic, label: 'Упругая область' });
+                layers.push({ type: 'vline', x: spec.elastic_region.x_end, color: COLORS.elasticLine,
+                              dash: [6, 4], label: 'Предел упругости' });
+            }
+            layers.push({ type: 'line', x: spec.x, y: spec.y, color: COLORS.curve, width: 2.4,
+                          label: 'Экспериментальная кривая' });
+            layers.push({ type: 'points', x: spec.x, y: spec.y, color: COLORS.points, radius: 3,
+                          label: 'Измерения' });
+            if (spec.theory_line) {
+                layers.push({ type: 'line', x: spec.theory_line.x, y: spec.theory_line.y,
+                              color: COLORS.theory, width: 2.4, dash: [8, 5],
+                              label: `Теория (Gэтал = ${spec.theory_line.G_reference.toFixed(0)} МПа)` });
+            }
+            return {
+                title: 'Диаграмма кручения T-φ',
+                xLabel: 'Угол закручивания φ, град',
+                yLabel: 'Крутящий момент T, Н·м',
+                layers: layers
+            };
+        }
+
+        if (spec.kind === 'stress') {
+            layers.push({ type: 'fillx', x: spec.x, y: spec.y, color: COLORS.stressFill });
+            layers.push({ type: 'line', x: spec.x, y: spec.y, color: COLORS.stress, width: 3, label: 'τ(ρ)' });
+            layers.push({ type: 'points', x: [spec.tau_max], y: [spec.radius], color: COLORS.stress, radius: 6,
+                          label: `τmax = ${spec.tau_max.toFixed(2)} МПа` });
+            layers.push({ type: 'hline', y: spec.radius, color: '#000', dash: [6, 4],
+                          label: `R = ${spec.radius.toFixed(2)} мм` });
+            return {
+                title: `Распределение τ по сечению при T = ${spec.moment.toFixed(2)} Н·м`,
+                xLabel: 'Касательное напряжение τ, МПа',
+                yLabel: 'Радиус ρ, мм',
+                layers: layers
+            };
+        }
+
+        throw new Error(`Неизвестный тип графика: ${spec.kind}`);
+    }
+
+    // Границы данных с небольшим запасом
+    function dataBounds(layers) {
+        let xMin = Infinity, xMax = -Infinity, yMin = Infinity, yMax = -Infinity;
+        layers.forEach(layer => {
+            (layer.x || []).forEach(v => { xMin = Math.min(xMin, v); xMax = Math.max(xMax, v); });
+            (layer.y || []).forEach(v => { yMin = Math.min(yMin, v); yMax = Math.max(yMax, v); });
+            if (layer.type === 'band') { xMin = Math.min(xMin, layer.x0); xMax = Math.max(xMax, layer.x1); }
+            if (layer.type === 'vline') { xMax = Math.max(xMax, layer.x); }
+            if (layer.type === 'hline') { yMax = Math.max(yMax, layer.y); }
+        });
+        xMin = Math.min(xMin, 0);
+        yMin = Math.min(yMin, 0);
+        const padX = (xMax - xMin) * 0.05 || 1;
+        const padY = (yMax - yMin) * 0.08 || 1;
+        return { xMin: xMin, xMax: xMax + padX, yMin: yMin, yMax: yMax + padY };
+    }
+
+    class Chart {
+        constructor(container, spec) {
+            this.container = container;
+            this.description = buildLayers(spec);
+            this.home = dataBounds(this.description.layers);
+            this.view = Object.assign({}, this.home);
+
+            container.innerHTML = '';
+            this.canvas = document.createElement('canvas');
+            this.canvas.style.width = '100%';
+            this.canvas.style.height = '460px';
+            this.canvas.style.cursor = 'grab';
+            this.canvas.style.borderRadius = '8px';
+            this.canvas.style.background = '#fbfcff';
+            this.canvas.style.boxShadow = '0 5px 20px rgba(0,0,0,0.2)';
+            container.appendChild(this.canvas);
+
+            this._bindEvents();
+            this.resize();
+        }
+
+        resize() {
+            const ratio = global.devicePixelRatio || 1;
+            const rect = this.canvas.getBoundingClientRect();
+            this.width = rect.width;
+            this.height = rect.height;
+            this.canvas.width = Math.round(rect.width * ratio);
+            this.canvas.height = Math.round(rect.height * ratio);
+            this.ctx = this.canvas.getContext('2d');
+            this.ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+            this.draw();
+        }
+
+        // Преобразования координат данные <-> пиксели
+        toPx(x, y) {
+            const w = this.width - PADDING.left - PADDING.right;
+            const h = this.height - PADDING.top - PADDING.bottom;
+            return [
+                PADDING.left + (x - this.view.xMin) / (this.view.xMax - this.view.xMin) * w,
+                PADDING.top + h - (y - this.view.yMin) / (this.view.yMax - this.view.yMin) * h
+            ];
+        }
+
+        toData(px, py) {
+            const w = this.width - PADDING.left - PADDING.right;
+            const h = this.height - PADDING.top - PADDING.bottom;
+            return [
+                this.view.xMin + (px - PADDING.left) / w * (this.view.xMax - this.view.xMin),
+                this.view.yMin + (PADDING.top + h - py) / h * (this.view.yMax - this.view.yMin)
+            ];
+        }
+
+        draw() {
+            const ctx = this.ctx;
+            const plotW = this.width - PADDING.left - PADDING.right;
+            const plotH = this.height - PADDING.top - PADDING.bottom;
+            ctx.clearRect(0, 0, this.width, this.height);
+
+            ctx.save();
+            ctx.font = '12px sans-serif';
+            ctx.fillStyle = COLORS.text;
+            ctx.strokeStyle = COLORS.grid;
+            ctx.lineWidth = 1;
+
+            // Сетка и подписи делений
+            const xTicks = niceTicks(this.view.xMin, this.view.xMax, 8);
+            const yTicks = niceTicks(this.view.yMin, this.view.yMax, 6);
+            ctx.setLineDash([4, 4]);
+            ctx.textAlign = 'center';
+            ctx.textBaseline = 'top';
+            xTicks.forEach(t => {
+                const [px] = this.toPx(t, 0);
+                ctx.beginPath();
+                ctx.moveTo(px, PADDING.top);
+                ctx.lineTo(px, PADDING.top + plotH);
+                ctx.stroke();
+                ctx.fillText(formatTick(t), px, PADDING.top + plotH + 6);
+            });
+            ctx.textAlign = 'right';
+            ctx.textBaseline = 'middle';
+            yTicks.forEach(t => {
+                const [, py] = this.toPx(0, t);
+                ctx.beginPath();
+                ctx.moveTo(PADDING.left, py);
+                ctx.lineTo(PADDING.left + plotW, py);
+                ctx.stroke();
+                ctx.fillText(formatTick(t), PADDING.left - 6, py);
+            });
+            ctx.setLineDash([]);
+
+            // Слои данных (обрезка по области построения)
+            ctx.save();
+            ctx.beginPath();
+            ctx.rect(PADDING.left, PADDING.top, plotW, plotH);
+            ctx.clip();
+            this.description.layers.forEach(layer => this._drawLayer(layer, plotW, plotH));
+            ctx.restore();
+
+            // Рамка, заголовок, подписи осей
+            ctx.strokeStyle = COLORS.axis;
+            ctx.strokeRect(PADDING.left, PADDING.top, plotW, plotH);
+            ctx.textAlign = 'center';
+            ctx.textBaseline = 'alphabetic';
+            ctx.font = 'bold 15px sans-serif';
+            ctx.fillText(this.description.title, PADDING.left + plotW / 2, PADDING.top - 14);
+            ctx.font = 'bold 13px sans-serif';
+            ctx.fillText(this.description.xLabel, PADDING.left + plotW / 2, this.height - 10);
+            ctx.save();
+            ctx.translate(16, PADDING.top + plotH / 2);
+            ctx.rotate(-Math.PI / 2);
+            ctx.fillText(this.description.yLabel, 0, 0);
+            ctx.restore();
+
+            this._drawLegend();
+            ctx.restore();
+        }
+
+        _drawLayer(layer, plotW, plotH) {
+            const ctx = this.ctx;
+            ctx.save();
+            ctx.strokeStyle = layer.color;
+            ctx.fillStyle = layer.color;
+            ctx.lineWidth = layer.width || 1.5;
+            ctx.setLineDash(layer.dash || []);
+
+            if (layer.type === 'band') {
+                const [x0] = this.toPx(layer.x0, 0);
+                const [x1] = this.toPx(layer.x1, 0);
+                ctx.fillRect(x0, PADDING.top, x1 - x0, plotH);
+            } else if (layer.type === 'vline') {
+                const [px] = this.toPx(layer.x, 0);
+                ctx.lineWidth = 2;
+                ctx.beginPath();
+                ctx.moveTo(px, PADDING.top);
+                ctx.lineTo(px, PADDING.top + plotH);
+                ctx.stroke();
+            } else if (layer.type === 'hline') {
+                const [, py] = this.toPx(0, layer.y);
+                ctx.beginPath();
+                ctx.moveTo(PADDING.left, py);
+                ctx.lineTo(PADDING.left + plotW, py);
+                ctx.stroke();
+            } else if (layer.type === 'line') {
+                ctx.beginPath();
+                layer.x.forEach((x, i) => {
+                    const [px, py] = this.toPx(x, layer.y[i]);
+                    if (i === 0) ctx.moveTo(px, py);
+                    else ctx.lineTo(px, py);
+                });
+                ctx.stroke();
+            } else if (layer.type === 'points') {
+                ctx.globalAlpha = 0.75;
+                layer.x.forEach((x, i) => {
+                    const [px, py] = this.toPx(x, layer.y[i]);
+                    ctx.beginPath();
+                    ctx.arc(px, py, layer.radius, 0, 2 * Math.PI);
+                    ctx.fill();
+                });
+            } else if (layer.type === 'fillx') {
+                // Заливка между кривой и осью ординат (аналог fill_betweenx)
+                ctx.beginPath();
+                const [sx, sy] = this.toPx(0, layer.y[0]);
+                ctx.moveTo(sx, sy);
+                layer.x.forEach((x, i) => {
+                    const [px, py] = this.toPx(x, layer.y[i]);
+                    ctx.lineTo(px, py);
+                });
+                const [ex, ey] = this.toPx(0, layer.y[layer.y.length - 1]);
+                ctx.lineTo(ex, ey);
+                ctx.closePath();
+                ctx.fill();
+            }
+            ctx.restore();
+        }
+
+        _drawLegend() {
+            const ctx = this.ctx;
+            const items = this.description.layers.filter(l => l.label);
+            ctx.font = '12px sans-serif';
+            const width = Math.max(...items.map(l => ctx.measureText(l.label).width)) + 44;
+            const x = PADDING.left + 10;
+            let y = PADDING.top + 10;
+
+            ctx.fillStyle = 'rgba(255, 255, 255, 0.9)';
+            ctx.strokeStyle = '#bdc3c7';
+            ctx.fillRect(x, y, width, items.length * 18 + 8);
+            ctx.strokeRect(x, y, width, items.length * 18 + 8);
+            ctx.textAlign = 'left';
+            ctx.textBaseline = 'middle';
+
+            items.forEach(layer => {
+                y += 18;
+                ctx.save();
+                ctx.strokeStyle = layer.color;
+                ctx.fillStyle = layer.color;
+                ctx.setLineDash(layer.dash || []);
+                ctx.lineWidth = 2;
+                if (layer.type === 'points') {
+                    ctx.beginPath();
+                    ctx.arc(x + 18, y - 5, 4, 0, 2 * Math.PI);
+                    ctx.fill();
+                } else if (layer.type === 'band') {
+                    ctx.fillRect(x + 8, y - 10, 22, 10);
+                } else {
+                    ctx.beginPath();
+                    ctx.moveTo(x + 8, y - 5);
+                    ctx.lineTo(x + 30, y - 5);
+                    ctx.stroke();
+                }
+                ctx.restore();
+                ctx.fillStyle = COLORS.text;
+                ctx.fillText(layer.label, x + 36, y - 5);
+            });
+        }
+
+        _bindEvents() {
+            let drag = null;
+
+            // Масштабирование колесом относительно курсора
+            this.canvas.addEventListener('wheel', event => {
+                event.preventDefault();
+                const rect = this.canvas.getBoundingClientRect();
+                const [cx, cy] = this.toData(event.clientX - rect.left, event.clientY - rect.top);
+                const factor = event.deltaY < 0 ? 0.85 : 1 / 0.85;
+                this.view = {
+                    xMin: cx - (cx - this.view.xMin) * factor,
+                    xMax: cx + (this.view.xMax - cx) * factor,
+                    yMin: cy - (cy - this.view.yMin) * factor,
+                    yMax: cy + (this.view.yMax - cy) * factor
+                };
+                this.draw();
+            }, { passive: false });
+
+            // Перемещение перетаскиванием
+            this.canvas.addEventListener('mousedown', event => {
+                drag = { x: event.clientX, y: event.clientY, view: Object.assign({}, this.view) };
+                this.canvas.style.cursor = 'grabbing';
+            });
+            this._onMouseMove = event => {
+                if (!drag) return;
+                const plotW = this.width - PADDING.left - PADDING.right;
+                const plotH = this.height - PADDING.top - PADDING.bottom;
+                const dx = (event.clientX - drag.x) / plotW * (drag.view.xMax - drag.view.xMin);
+                const dy = (event.clientY - drag.y) / plotH * (drag.view.yMax - drag.view.yMin);
+                this.view = {
+                    xMin: drag.view.xMin - dx,
+                    xMax: drag.view.xMax - dx,
+                    yMin: drag.view.yMin + dy,
+                    yMax: drag.view.yMax + dy
+                };
+                this.draw();
+            };
+            this._onMouseUp = () => {
+                drag = null;
+                this.canvas.style.cursor = 'grab';
+            };
+            this._onResize = () => this.resize();
+            global.addEventListener('mousemove', this._onMouseMove);
+            global.addEventListener('mouseup', this._onMouseUp);
+            global.addEventListener('resize', this._onResize);
+
+            // Двойной клик — исходный масштаб
+            this.canvas.addEventListener('dblclick', () => {
+                this.view = Object.assign({}, this.home);
+                this.draw();
+            });
+        }
+
+        destroy() {
+            global.removeEventListener('mousemove', this._onMouseMove);
+            global.removeEventListener('mouseup', this._onMouseUp);
+            global.removeEventListener('resize', this._onResize);
+        }
+    }
+
+    let current = null;
+
+    global.TorsionCharts = {
+        // Отрисовка графика в контейнере; предыдущий график снимает свои обработчики
+        render: function (container, spec) {
+            if (current) current.destroy();
+            current = new Chart(container, spec);
+            return current;
+        }
+    };
+})(window);
@@ -0,0 +1,91 @@
+"""
+Сравнение форматов сохранения анимации кручения: размер файла и время сохранения.
+
+Каждый вариант сохраняется полностью (create_torsion_animation); время отрисовки
+кадров в буфер Agg считается отдельно, остальное — квантование и кодирование.
+MP4 пропускается, если ffmpeg не установлен.
+
+Запуск (из корня проекта):
+    python tools/animation_formats.py [--fps 20] [--duration 4] [--keep DIR]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from core.animator import ffmpeg_path
+from tools.bench_animation import make_animator
+
+
+# (название, формат, lossless)
+VARIANTS = [
+    ('GIF, общая палитра', 'gif', False),
+    ('WebP с потерями (quality=80)', 'webp', False),
+    ('WebP без потерь', 'webp', True),
+    ('APNG, общая палитра', 'apng', False),
+    ('APNG без потерь (RGB)', 'apng', True),
+    ('MP4 H.264 (ffmpeg)', 'mp4', False),
+]
+
+EXTENSIONS = {'gif': 'gif', 'webp': 'webp', 'apng': 'png', 'mp4': 'mp4'}
+
+
+def count_render_time(animator) -> list:
+    """Подмена _frame_rgba аниматора: суммарное время отрисовки накапливается в [0] результата."""
+    spent = [0.0]
+    frame_rgba = animator._frame_rgba
+
+    def timed(frame_num):
+        start = time.perf_counter()
+        try:
+            return frame_rgba(frame_num)
+        finally:
+            spent[0] += time.perf_counter() - start
+
+    animator._frame_rgba = timed
+    return spent
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Размер и время сохранения анимации по форматам')
+    parser.add_argument('--fps', type=int, default=20)
+    parser.add_argument('--duration', type=int, default=4)
+    parser.add_argument('--keep', help='каталог, куда сохранить файлы (по умолчанию удаляются)')
+    args = parser.parse_args()
+
+    num_frames = args.fps * args.duration
+    out_dir = args.keep or tempfile.mkdtemp(prefix='torsion_formats_')
+    os.makedirs(out_dir, exist_ok=True)
+
+    print(f'Кадров: {num_frames} ({args.fps} fps × {args.duration} с)\n')
+    print(f'  {"формат":<30} {"размер":>10} {"сохранение":>11} {"отрисовка":>10} {"кодирование":>12}')
+
+    for title, fmt, lossless in VARIANTS:
+        if fmt == 'mp4' and ffmpeg_path() is None:
+            print(f'  {title:<30} пропущен: ffmpeg не найден')
+            continue
+        suffix = '-lossless' if lossless else ''
+        path = os.path.join(out_dir, f'animation{suffix}.{EXTENSIONS[fmt]}')
+        animator = make_animator()
+        render = count_render_time(animator)
+        start = time.perf_counter()
+        animator.create_torsion_animation(path, fps=args.fps, duration=args.duration,
+                                          fmt=fmt, lossless=lossless)
+        elapsed = time.perf_counter() - start
+        plt.close(animator.fig)
+        print(f'  {title:<30} {os.path.getsize(path) / 1024:7.0f} КБ {elapsed:9.1f} с '
+              f'{render[0]:8.1f} с {elapsed - render[0]:10.1f} с')
+        if not args.keep:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
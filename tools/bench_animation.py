@@ -0,0 +1,178 @@
+"""
+Замер времени кадра анимации кручения (TorsionAnimator).
+
+Для выборки кадров отдельно измеряются обновление данных artists, полная
+отрисовка фигуры (так кадр растеризуется при сохранении в файл) и отрисовка
+с блиттингом (восстановление фона и отрисовка только меняющихся artists, как
+при интерактивном показе), а также этапы конвейера сохранения: буфер Agg →
+RGB-изображение Pillow → квантование общей палитрой → кодирование GIF, с объемом
+памяти на кадр. Затем измеряется полное сохранение в GIF в одном процессе и в пуле
+из нескольких процессов (--workers); одинаковые кадры расписания рисуются один раз.
+С --preview вместо этого замеряется превью в два прохода (черновик и полное
+качество, без кэша).
+
+Запуск (из корня проекта):
+    python tools/bench_animation.py [--fps 20] [--duration 8] [--sample 40] [--workers 1 2 4] [--no-save]
+    python tools/bench_animation.py --preview
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+from core.animator import (DRAFT_DPI, DRAFT_FPS, PREVIEW_DPI, TorsionAnimator, build_palette,
+                           default_workers, palette_samples, quantize_frame, rgb_image)
+from core.calculator import TorsionCalculator
+
+
+def make_animator(num_points: int = 50) -> TorsionAnimator:
+    """Аниматор для стального образца D = 10 мм, L = 200 мм с детерминированной кривой."""
+    calculator = TorsionCalculator(0.01, 0.2, 'Сталь')
+    data = calculator.generate_diagram_data(100.0, num_points, rng=np.random.default_rng(0))
+    return TorsionAnimator(calculator, data['T'], data['phi'])
+
+
+def measure(callback, frames) -> list:
+    """Время вызова callback(кадр) для каждого кадра, мс."""
+    times = []
+    for frame in frames:
+        start = time.perf_counter()
+        callback(frame)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(name: str, times: list):
+    print(f'  {name:<36} среднее {statistics.mean(times):7.1f} мс, '
+          f'медиана {statistics.median(times):7.1f} мс, макс. {max(times):7.1f} мс')
+
+
+def measure_preview(fps: int, duration: int):
+    """Превью в два прохода без кэша: когда готов первый кадр и весь проход, от начала отрисовки."""
+    animator = make_animator()
+    start = time.perf_counter()
+    first, last = {}, {}
+    for draft, frame_num, total, frame in animator.iter_preview_frames(fps, duration):
+        elapsed = time.perf_counter() - start
+        first.setdefault(draft, elapsed)
+        last[draft] = (elapsed, total, len(frame))
+    print(f'Превью в два прохода ({duration} с, без кэша):')
+    for draft, name in ((True, f'черновик ({DRAFT_FPS} fps, {DRAFT_DPI} dpi)'),
+                        (False, f'полное качество ({fps} fps, {PREVIEW_DPI} dpi)')):
+        elapsed, total, size = last[draft]
+        print(f'  {name:<32} первый кадр {first[draft]:5.2f} с, проход завершен {elapsed:6.2f} с '
+              f'({total} кадров, {(elapsed - first[draft]) / max(total - 1, 1) * 1000:.0f} мс/кадр, '
+              f'последний JPEG {size / 1024:.0f} КБ)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Время кадра анимации кручения')
+    parser.add_argument('--fps', type=int, default=20)
+    parser.add_argument('--duration', type=int, default=8)
+    parser.add_argument('--sample', type=int, default=40, help='кадров в выборке замера')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, default_workers()],
+                        help='число процессов при сохранении')
+    parser.add_argument('--no-save', action='store_true', help='не замерять сохранение в GIF')
+    parser.add_argument('--preview', action='store_true', help='замерить только превью в два прохода')
+    args = parser.parse_args()
+
+    if args.preview:
+        measure_preview(args.fps, args.duration)
+        return
+
+    num_frames = args.fps * args.duration
+    frames = np.linspace(0, num_frames - 1, min(args.sample, num_frames)).astype(int)
+    animator = make_animator()
+
+    start = time.perf_counter()
+    animator._build_figure(num_frames)
+    canvas = animator.fig.canvas
+    canvas.draw()
+    print(f'Кадров: {num_frames} ({args.fps} fps × {args.duration} с), '
+          f'построение фигуры: {(time.perf_counter() - start) * 1000:.0f} мс\n')
+
+    def full_draw(frame):
+        animator._draw_frame(frame)
+        canvas.draw()
+
+    update = measure(animator._draw_frame, frames)
+    full = measure(full_draw, frames)
+
+    # Этапы конвейера сохранения на тех же кадрах
+    samples = [animator._render_image(frame) for frame in palette_samples(num_frames)]
+    start = time.perf_counter()
+    palette = build_palette(samples, fixed=animator._shaft_palette(num_frames))
+    palette_ms = (time.perf_counter() - start) * 1000
+    rgba = animator._frame_rgba(0)
+    rgb = rgb_image(rgba)
+    wrap = measure(lambda frame: rgb_image(rgba), frames)
+    fixed = measure(lambda frame: quantize_frame(rgb, palette), frames)
+    adaptive = measure(lambda frame: rgb.convert('P', palette=Image.Palette.ADAPTIVE), frames)
+    quantized = [animator._render_image(frame, palette) for frame in frames]
+    start = time.perf_counter()
+    quantized[0].save(io.BytesIO(), format='GIF', save_all=True, append_images=quantized[1:],
+                      duration=int(1000 / args.fps), loop=0)
+    encode = [(time.perf_counter() - start) * 1000 / len(quantized)]
+
+    # Фон без меняющихся artists рисуется один раз
+    artists = animator._draw_frame(0)
+    for artist in artists:
+        artist.set_animated(True)
+    canvas.draw()
+    background = canvas.copy_from_bbox(animator.fig.bbox)
+
+    def blit_draw(frame):
+        canvas.restore_region(background)
+        for artist in animator._draw_frame(frame):
+            artist.axes.draw_artist(artist)
+        canvas.blit(animator.fig.bbox)
+
+    blit = measure(blit_draw, frames)
+    plt.close(animator.fig)
+
+    print(f'Выборка: {len(frames)} кадров')
+    report('обновление данных artists', update)
+    report('кадр с полной отрисовкой (файл)', full)
+    report('кадр с блиттингом (экран)', blit)
+    report('буфер Agg → RGB-изображение', wrap)
+    report('квантование общей палитрой', fixed)
+    report('квантование своей палитрой кадра', adaptive)
+    report('кодирование GIF (на кадр)', encode)
+    print(f'  построение общей палитры по {len(samples)} кадрам: {palette_ms:.0f} мс (один раз)')
+    print(f'  память на кадр: буфер Agg {rgba.nbytes / 2**20:.1f} МБ (переиспользуется), '
+          f'RGB {len(rgb.tobytes()) / 2**20:.1f} МБ (временно), '
+          f'кадр GIF {len(quantized[0].tobytes()) / 2**20:.1f} МБ (хранится до записи)')
+
+    if args.no_save:
+        return
+    schedule = make_animator().frame_schedule(num_frames)
+    print(f'\nСохранение GIF (CPU: {os.cpu_count()}), различных кадров: {len(schedule)} из {num_frames}:')
+    baseline = None
+    for workers in dict.fromkeys(args.workers):
+        path = os.path.join(tempfile.mkdtemp(prefix='torsion_anim_'), 'animation.gif')
+        animator = make_animator()
+        start = time.perf_counter()
+        animator.create_torsion_animation(path, fps=args.fps, duration=args.duration, workers=workers)
+        elapsed = time.perf_counter() - start
+        if animator.fig is not None:
+            plt.close(animator.fig)
+        baseline = baseline or elapsed
+        print(f'  процессов: {workers}  {elapsed:6.1f} с ({elapsed / num_frames * 1000:4.0f} мс/кадр, '
+              f'×{baseline / elapsed:.2f}), {os.path.getsize(path) / 1024:.0f} КБ')
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
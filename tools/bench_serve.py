@@ -0,0 +1,115 @@
+"""
+Нагрузочный тест serve.py: пропускная способность /api/plot/torsion
+при разном количестве процессов-воркеров.
+
+Запуск (из корня проекта):
+    python tools/bench_serve.py [--workers 1 2 4] [--requests 200] [--concurrency 16]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_body(num_points: int) -> bytes:
+    """Тело запроса /api/plot/torsion с синтетической диаграммой."""
+    moments = np.linspace(0, 100, num_points)
+    angles = moments * 1e-3
+    return json.dumps({'moments': moments.tolist(), 'angles': angles.tolist()}).encode()
+
+
+def wait_ready(port: int, timeout: float = 60.0):
+    """Ожидание готовности сервера."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.3)
+    raise RuntimeError('Сервер не запустился')
+
+
+def post(port: int, body: bytes) -> float:
+    """Один запрос; возвращает время ответа, с."""
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+    conn.request('POST', '/api/plot/torsion', body, {'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    payload = response.read()
+    conn.close()
+    if response.status != 200:
+        raise RuntimeError(f'HTTP {response.status}: {payload[:200]!r}')
+    return time.perf_counter() - start
+
+
+def run(workers: int, threads: int, port: int, requests: int, concurrency: int, body: bytes) -> dict:
+    """Запуск serve.py с заданным числом воркеров и замер под нагрузкой."""
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'serve.py'), '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--threads', str(threads)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env=dict(os.environ, TORSION_RATE_LIMIT='0'),  # замеряется пропускная способность, а не бюджеты
+        cwd=tempfile.mkdtemp(prefix='torsion_bench_')  # отдельная БД
+    )
+    try:
+        wait_ready(port)
+        # Прогрев: по одному запросу на поток каждого воркера
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(lambda _: post(port, body), range(workers * threads)))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(lambda _: post(port, body), range(requests)))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    latencies.sort()
+    return {
+        'rps': requests / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Масштабирование serve.py по количеству процессов')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--num-points', type=int, default=50)
+    parser.add_argument('--port', type=int, default=5097)
+    args = parser.parse_args()
+
+    body = make_body(args.num_points)
+    print(f'CPU: {os.cpu_count()}, запросов: {args.requests}, параллельно: {args.concurrency}, '
+          f'потоков на воркер: {args.threads}\n')
+    print(f'{"воркеров":>9} | {"запр/с":>8} | {"p50, мс":>8} | {"p95, мс":>8} | ускорение')
+
+    baseline = None
+    for workers in args.workers:
+        stats = run(workers, args.threads, args.port, args.requests, args.concurrency, body)
+        baseline = baseline or stats['rps']
+        print(f'{workers:>9} | {stats["rps"]:8.1f} | {stats["p50"]:8.1f} | {stats["p95"]:8.1f} | '
+              f'{stats["rps"] / baseline:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Построение кэша шрифтов matplotlib для сборки PyInstaller.
+
+Файл fontlist-v*.json кладется в build/mpl_cache и попадает в сборку как mpl_cache/;
+runtime-хук pyinstaller_hooks/rth_mplcache.py копирует его в каталог настроек
+matplotlib, и первый график в собранном приложении строится без сканирования шрифтов.
+
+Запуск (из корня проекта, перед pyinstaller):
+    python tools/build_font_cache.py [--output build/mpl_cache]
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.warmup import build_font_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Кэш шрифтов matplotlib для сборки PyInstaller')
+    parser.add_argument('--output', default=os.path.join(ROOT, 'build', 'mpl_cache'),
+                        help='каталог для fontlist-v*.json')
+    args = parser.parse_args()
+
+    path = build_font_cache(args.output)
+    print(f'Кэш шрифтов: {path}')
+
+
+if __name__ == '__main__':
+    main()
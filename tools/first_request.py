@@ -0,0 +1,83 @@
+"""
+Задержка первых запросов после запуска serve.py без прогрева и с прогревом кэшей.
+
+Сервер запускается дважды (TORSION_WARM_UP=0 и 1) с одним воркером; после готовности
+и паузы (время, за которое пользователь открывает страницу) замеряются первые запросы
+графика τ(ρ) и расчета с параметрами по умолчанию.
+
+Запуск (из корня проекта):
+    python tools/first_request.py [--delay 3] [--port 5096]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools.bench_serve import wait_ready
+
+# Запросы в порядке замера: (название, путь, тело)
+REQUESTS = (
+    ('график τ(ρ)', '/api/plot/stress', {'material': 'Сталь', 'diameter': 10, 'length': 200, 'moment': 50}),
+    ('график τ(ρ), Чугун', '/api/plot/stress', {'material': 'Чугун', 'diameter': 10, 'length': 200, 'moment': 50}),
+    ('расчет', '/api/calculate', {'material': 'Сталь', 'diameter': 10, 'length': 200,
+                                  'max_moment': 100, 'num_points': 50}),
+    ('график τ(ρ), повтор', '/api/plot/stress', {'material': 'Сталь', 'diameter': 10, 'length': 200, 'moment': 50}),
+)
+
+
+def timed_post(port: int, path: str, body: dict) -> float:
+    """Один запрос; возвращает время ответа, мс."""
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+    conn.request('POST', path, json.dumps(body), {'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    payload = response.read()
+    conn.close()
+    if response.status != 200:
+        raise RuntimeError(f'HTTP {response.status}: {payload[:200]!r}')
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(warm_up: bool, port: int, delay: float) -> list:
+    """Запуск сервера и замер первых запросов."""
+    env = dict(os.environ, TORSION_WARM_UP='1' if warm_up else '0')
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'serve.py'), '--host', '127.0.0.1', '--port', str(port),
+         '--workers', '1'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env,
+        cwd=tempfile.mkdtemp(prefix='torsion_first_')  # отдельная БД
+    )
+    try:
+        wait_ready(port)
+        time.sleep(delay)
+        return [timed_post(port, path, body) for _, path, body in REQUESTS]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Задержка первых запросов без прогрева и с прогревом')
+    parser.add_argument('--delay', type=float, default=3.0, help='пауза после готовности сервера, с')
+    parser.add_argument('--port', type=int, default=5096)
+    args = parser.parse_args()
+
+    cold = measure(False, args.port, args.delay)
+    warm = measure(True, args.port, args.delay)
+
+    print(f'{"запрос":>22} | {"без прогрева, мс":>16} | {"с прогревом, мс":>15}')
+    for (name, _, _), cold_ms, warm_ms in zip(REQUESTS, cold, warm):
+        print(f'{name:>22} | {cold_ms:16.1f} | {warm_ms:15.1f}')
+
+
+if __name__ == '__main__':
+    main()
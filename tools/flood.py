@@ -0,0 +1,161 @@
+"""
+Проверка ограничения нагрузки: один клиент заваливает дорогие и дешевые маршруты,
+другие клиенты в это время работают в обычном темпе.
+
+Сервер serve.py запускается локально с TORSION_TRUST_PROXY=1, клиенты различаются
+заголовком X-Forwarded-For. Проверка не проходит (код возврата 1), если агрессивный
+клиент не получил ни одного 429 или обычным клиентам было отказано.
+
+Запуск (из корня проекта):
+    python tools/flood.py [--duration 10] [--flooders 16] [--port 5095]
+"""
+
+import argparse
+import collections
+import http.client
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools.bench_serve import wait_ready
+
+FLOODER_IP = '10.0.0.1'
+POLITE_IP = '10.0.0.2'
+READER_IP = '10.0.0.3'
+
+
+def request(port: int, client_ip: str, method: str, path: str, body: dict = None):
+    """Один запрос от имени клиента; возвращает (статус, время ответа в с, Retry-After)."""
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    headers = {'X-Forwarded-For': client_ip}
+    payload = None
+    if body is not None:
+        payload = json.dumps(body)
+        headers['Content-Type'] = 'application/json'
+    conn.request(method, path, payload, headers)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.status, time.perf_counter() - start, response.getheader('Retry-After')
+
+
+def request_body(port: int, path: str) -> bytes:
+    """Тело ответа GET без ограничений (маршрут /metrics не ограничивается)."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('GET', path)
+    data = conn.getresponse().read()
+    conn.close()
+    return data
+
+
+def plot_body() -> dict:
+    """Тело /api/plot/torsion со случайной кривой (кэш графиков не должен помогать)."""
+    scale = random.uniform(50, 150)
+    moments = [scale * i / 49 for i in range(50)]
+    return {'moments': moments, 'angles': [m * 1e-3 for m in moments]}
+
+
+def run_client(stop: threading.Event, results: list, port: int, client_ip: str,
+               method: str, path: str, make_body=None, pause: float = 0.0):
+    """Клиент, повторяющий запрос до остановки (pause=0 — без пауз)."""
+    while not stop.is_set():
+        try:
+            results.append(request(port, client_ip, method, path, make_body() if make_body else None))
+        except OSError:
+            results.append(('error', 0.0, None))
+        if pause:
+            stop.wait(pause)
+
+
+def summarize(name: str, results: list) -> collections.Counter:
+    statuses = collections.Counter(status for status, _, _ in results)
+    ok = sorted(elapsed for status, elapsed, _ in results if status == 200)
+    latency = (f'p50 {statistics.median(ok) * 1000:.0f} мс, макс. {ok[-1] * 1000:.0f} мс'
+               if ok else 'нет успешных')
+    retry = sorted({value for _, _, value in results if value})
+    print(f'  {name:<34} {dict(statuses)}  {latency}'
+          + (f'  Retry-After: {", ".join(retry)}' if retry else ''))
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Проверка бюджетов запросов и очереди допуска')
+    parser.add_argument('--duration', type=float, default=10.0, help='длительность нагрузки, с')
+    parser.add_argument('--flooders', type=int, default=16, help='потоков агрессивного клиента')
+    parser.add_argument('--threads', type=int, default=8, help='потоков обработки в воркере')
+    parser.add_argument('--port', type=int, default=5095)
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'serve.py'), '--host', '127.0.0.1', '--port', str(args.port),
+         '--workers', '1', '--threads', str(args.threads)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env=dict(os.environ, TORSION_TRUST_PROXY='1', TORSION_WARM_UP='0'),
+        cwd=tempfile.mkdtemp(prefix='torsion_flood_')  # отдельная БД
+    )
+    try:
+        wait_ready(args.port)
+        stop = threading.Event()
+        flood_plot, flood_cheap, polite, reader = [], [], [], []
+        clients = [
+            threading.Thread(target=run_client, args=(stop, flood_plot, args.port, FLOODER_IP,
+                                                      'POST', '/api/plot/torsion', plot_body))
+            for _ in range(args.flooders)
+        ] + [
+            threading.Thread(target=run_client, args=(stop, flood_cheap, args.port, FLOODER_IP,
+                                                      'GET', '/api/experiments'))
+            for _ in range(max(args.flooders // 4, 1))
+        ] + [
+            threading.Thread(target=run_client, args=(stop, polite, args.port, POLITE_IP,
+                                                      'POST', '/api/plot/torsion', plot_body, 1.0)),
+            threading.Thread(target=run_client, args=(stop, reader, args.port, READER_IP,
+                                                      'GET', '/api/experiments', None, 0.5)),
+        ]
+        for client in clients:
+            client.start()
+        time.sleep(args.duration)
+        stop.set()
+        for client in clients:
+            client.join()
+
+        metrics = json.loads(request_body(args.port, '/metrics?format=json'))['metrics']
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    print(f'Нагрузка {args.duration:.0f} с, агрессивный клиент: {args.flooders} + '
+          f'{max(args.flooders // 4, 1)} потоков без пауз\n')
+    flood_statuses = summarize('агрессивный: /api/plot/torsion', flood_plot)
+    cheap_statuses = summarize('агрессивный: /api/experiments', flood_cheap)
+    polite_statuses = summarize('обычный: /api/plot/torsion раз в 1 с', polite)
+    reader_statuses = summarize('обычный: /api/experiments раз в 0,5 с', reader)
+
+    print('\nСчетчики /metrics:')
+    for name in ('torsion_ratelimit_rejected_total', 'torsion_admission_total'):
+        for series in metrics.get(name, {}).get('series', []):
+            print(f'  {name}{series["labels"]} = {series["value"]:.0f}')
+
+    failures = []
+    if not flood_statuses[429] or not cheap_statuses[429]:
+        failures.append('агрессивный клиент не получил 429')
+    if set(polite_statuses) - {200} or set(reader_statuses) - {200}:
+        failures.append('обычным клиентам было отказано')
+    if failures:
+        print('\nПРОВЕРКА НЕ ПРОЙДЕНА: ' + '; '.join(failures))
+        sys.exit(1)
+    print('\nПроверка пройдена: агрессивный клиент ограничен, обычные обслужены')
+
+
+if __name__ == '__main__':
+    main()
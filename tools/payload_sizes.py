@@ -0,0 +1,67 @@
+"""
+Замер размеров ответов /api/calculate и /api/experiments/<id>
+при разных способах кодирования массивов и сжатия.
+
+Запуск (из корня проекта):
+    python tools/payload_sizes.py [--num-points 50]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+VARIANTS = [
+    ('JSON, 17 цифр', ''),
+    ('JSON, precision=6', '?precision=6'),
+    ('base64 float32', '?encoding=f32'),
+]
+
+COMPRESSION = [
+    ('без сжатия', 'identity'),
+    ('gzip', 'gzip'),
+    ('deflate', 'deflate'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Размеры JSON-ответов API')
+    parser.add_argument('--num-points', type=int, default=50)
+    args = parser.parse_args()
+
+    # Отдельная временная БД, чтобы не трогать рабочую
+    os.chdir(tempfile.mkdtemp(prefix='torsion_payload_'))
+    import web_app
+
+    client = web_app.app.test_client()
+    calc = client.post('/api/calculate', json={'num_points': args.num_points}).get_json()
+    exp_id = client.post('/api/experiments', json={'results': calc['results']}).get_json()['experiment_id']
+
+    endpoints = [
+        ('POST /api/calculate', lambda q, enc: client.post(
+            '/api/calculate' + q, json={'num_points': args.num_points},
+            headers={'Accept-Encoding': enc})),
+        (f'GET /api/experiments/{exp_id}', lambda q, enc: client.get(
+            f'/api/experiments/{exp_id}' + q, headers={'Accept-Encoding': enc})),
+    ]
+
+    print(f'num_points = {args.num_points}\n')
+    for title, request in endpoints:
+        print(title)
+        baseline = None
+        for variant, query in VARIANTS:
+            sizes = []
+            for _, encoding in COMPRESSION:
+                size = len(request(query, encoding).data)
+                baseline = baseline or size
+                sizes.append(f'{size:7d} Б ({size / baseline * 100:5.1f}%)')
+            print(f'  {variant:<20}' + ' | '.join(
+                f'{name}: {size}' for (name, _), size in zip(COMPRESSION, sizes)))
+        print()
+
+
+if __name__ == '__main__':
+    main()
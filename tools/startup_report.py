@@ -0,0 +1,126 @@
+"""
+Отчет о времени запуска по данным `python -X importtime` и проверка бюджета.
+
+Для каждой точки входа (web_app, главное окно десктоп-приложения, лаунчер)
+импорт выполняется в отдельном чистом процессе; выводятся самые тяжелые
+импорты. Проверка не проходит (код возврата 1), если превышен бюджет времени
+или при запуске импортирован модуль, который должен загружаться лениво.
+
+Запуск (из корня проекта):
+    python tools/startup_report.py [--top 15] [--runs 3] [--scale 1.0] [--only web_app]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Точки входа: модуль, бюджет на импорт (мс) и модули, которые не должны загружаться при запуске
+TARGETS = {
+    'web_app': {
+        'module': 'web_app',
+        'budget_ms': 600,
+        'forbidden': ('matplotlib', 'docx', 'sqlalchemy', 'PIL'),
+    },
+    'desktop': {
+        'module': 'ui.main_window',
+        'budget_ms': 400,
+        'forbidden': ('docx', 'sqlalchemy', 'matplotlib', 'core.animator'),
+    },
+    'launcher': {
+        'module': 'launcher',
+        'budget_ms': 300,
+        'forbidden': ('matplotlib', 'numpy', 'sqlalchemy', 'docx', 'flask'),
+    },
+}
+
+
+def measure_imports(module: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Импорт модуля в чистом процессе с -X importtime.
+
+    Args:
+        module: Имя импортируемого модуля
+
+    Returns:
+        Список (модуль, собственное время мкс, накопленное время мкс, уровень вложенности)
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, env=env,
+        cwd=tempfile.mkdtemp(prefix='torsion_startup_')  # импорт не должен трогать рабочую БД
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f'Импорт {module} завершился ошибкой:\n{completed.stderr[-2000:]}')
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_part, cumulative_us, name = line.split('|', 2)
+        self_us = int(self_part.split(':')[1])
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        rows.append((name.strip(), self_us, int(cumulative_us), depth))
+    return rows
+
+
+def summarize(rows: List[Tuple[str, int, int, int]], module: str, top: int) -> Dict:
+    """Итоги замера: общее время, тяжелые прямые и собственные импорты."""
+    total = next((cumulative for name, _, cumulative, _ in rows if name == module), 0)
+    direct = [row for row in rows if row[3] == 1]
+    by_cumulative = sorted(direct, key=lambda row: -row[2])[:top]
+    by_self = sorted(rows, key=lambda row: -row[1])[:top]
+    loaded = {name for name, *_ in rows}
+    return {'total_ms': total / 1000, 'direct': by_cumulative, 'self': by_self, 'loaded': loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Время импорта точек входа и проверка бюджета')
+    parser.add_argument('--top', type=int, default=15, help='сколько импортов показывать')
+    parser.add_argument('--runs', type=int, default=3, help='замеров на точку входа (берется лучший)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='множитель бюджета (медленные машины, сборка PyInstaller)')
+    parser.add_argument('--only', choices=sorted(TARGETS), nargs='+', help='проверить только эти точки входа')
+    args = parser.parse_args()
+
+    failures = []
+    for target in args.only or list(TARGETS):
+        config = TARGETS[target]
+        module = config['module']
+        # Лучший из нескольких замеров: первый запуск может включать компиляцию .pyc
+        summary = min((summarize(measure_imports(module), module, args.top) for _ in range(args.runs)),
+                      key=lambda item: item['total_ms'])
+        budget = config['budget_ms'] * args.scale
+
+        print('=' * 70)
+        print(f'  {target}: import {module} — {summary["total_ms"]:.0f} мс (бюджет {budget:.0f} мс)')
+        print('=' * 70)
+        print('  Прямые импорты (накопленное время):')
+        for name, _, cumulative, _ in summary['direct']:
+            print(f'    {cumulative / 1000:8.1f} мс  {name}')
+        print('  Собственное время модулей:')
+        for name, self_us, _, _ in summary['self']:
+            print(f'    {self_us / 1000:8.1f} мс  {name}')
+
+        if summary['total_ms'] > budget:
+            failures.append(f'{target}: {summary["total_ms"]:.0f} мс > {budget:.0f} мс')
+        eager = [name for name in config['forbidden'] if name in summary['loaded']]
+        if eager:
+            failures.append(f'{target}: при запуске загружены {", ".join(eager)}')
+        print()
+
+    if failures:
+        print('БЮДЖЕТ ЗАПУСКА ПРЕВЫШЕН:')
+        for failure in failures:
+            print(f'  - {failure}')
+        sys.exit(1)
+    print('Бюджет запуска соблюден')
+
+
+if __name__ == '__main__':
+    main()
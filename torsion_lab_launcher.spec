@@ -5,11 +5,12 @@ a = Analysis(
     ['launcher.py'],
     pathex=[],
     binaries=[],
-    datas=[('templates', 'templates'), ('static', 'static'), ('torsion_lab.db', '.'), ('torsion_animation.gif', '.')],
+    datas=[('templates', 'templates'), ('static', 'static'), ('torsion_lab.db', '.'), ('torsion_animation.gif', '.'),
+           ('build/mpl_cache', 'mpl_cache')],
     hiddenimports=['PyQt5.sip'],
     hookspath=[],
     hooksconfig={},
-    runtime_hooks=[],
+    runtime_hooks=['pyinstaller_hooks/rth_mplcache.py'],
     excludes=[],
     noarchive=False,
     optimize=0,
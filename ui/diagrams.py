@@ -2,7 +2,6 @@
 Виджеты для отображения графиков и диаграмм с использованием Matplotlib.
 """
 
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
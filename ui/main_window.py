@@ -7,20 +7,20 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                             QGroupBox, QFormLayout, QTableWidget, QTableWidgetItem,
                             QMessageBox, QProgressBar, QTextEdit, QRadioButton,
                             QButtonGroup, QScrollArea, QFileDialog, QSpinBox, QDoubleSpinBox)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QFont, QColor, QMovie
+from PyQt5.QtCore import Qt, QObject, QThread, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont, QColor, QPixmap
 import numpy as np
 import sys
 import os
-import matplotlib.pyplot as plt
+import time
 
 from core.calculator import TorsionCalculator, determine_failure_type
-from core.database import DatabaseManager
-from core.animator import TorsionAnimator
-from core.report_generator import ReportGenerator
-from ui.diagrams import DiagramWidget
 from ui.premium_styles import GLOBAL_STYLE, TOOLTIP_STYLE
 
+# Превью анимации во вкладке: кадров в секунду и длительность, с
+PREVIEW_FPS = 20
+PREVIEW_DURATION = 8
+
 
 class AnimationThread(QThread):
     """Поток для выполнения анимации."""
@@ -33,12 +33,120 @@ class AnimationThread(QThread):
     
     def run(self):
         try:
-            self.animator.create_torsion_animation(save_path=self.save_path, fps=20, duration=8)
+            from core.animation_cache import user_animation_cache
+            from core.animator import default_workers
+            self.animator.create_torsion_animation(save_path=self.save_path, fps=20, duration=8,
+                                                   workers=default_workers(),
+                                                   cache=user_animation_cache())
             self.finished.emit(f"Анимация сохранена: {self.save_path}")
         except Exception as e:
             self.finished.emit(f"Ошибка: {str(e)}")
 
 
+class AnimationPreviewThread(QThread):
+    """
+    Поток живого превью в два прохода (TorsionAnimator.iter_preview_frames): сначала
+    быстрый черновик, затем полное качество; кадры отдаются в JPEG по мере отрисовки.
+    Оба прохода сохраняются в пользовательском кэше анимаций, и при повторном показе
+    тех же данных кадры читаются оттуда без отрисовки.
+    Отмена — cancel_token.cancel(): отрисовка остановится перед следующим кадром.
+    """
+    frame_ready = pyqtSignal(bool, int, int, bytes)  # черновик, номер кадра, всего в проходе, JPEG
+    done = pyqtSignal(str)
+    
+    def __init__(self, animator, fps=PREVIEW_FPS, duration=PREVIEW_DURATION):
+        super().__init__()
+        from core.animator import CancelToken
+        
+        self.animator = animator
+        self.fps = fps
+        self.duration = duration
+        self.cancel_token = CancelToken()
+    
+    def run(self):
+        from core.animation_cache import user_animation_cache
+        from core.animator import AnimationCancelled
+        
+        frames = self.animator.iter_preview_frames(self.fps, self.duration, cache=user_animation_cache(),
+                                                   cancel=self.cancel_token)
+        try:
+            for draft, frame_num, total, data in frames:
+                self.frame_ready.emit(draft, frame_num, total, data)
+            self.done.emit("")
+        except AnimationCancelled:
+            pass
+        except Exception as e:
+            self.done.emit(f"Ошибка: {str(e)}")
+        finally:
+            frames.close()
+
+
+class PreviewScheduler(QObject):
+    """
+    Планировщик превью анимации: выполняется не больше одной отрисовки и ждет
+    не больше одного запроса. Новый запрос отменяет текущую отрисовку (поток
+    остановится перед следующим кадром, окно его не ждет) и заменяет ожидающий
+    запрос — промежуточные запросы отбрасываются, не начав отрисовку.
+    Сигналы передаются только от актуальной (не отмененной) отрисовки.
+    """
+    started = pyqtSignal()
+    frame_ready = pyqtSignal(bool, int, int, bytes)
+    done = pyqtSignal(str)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.running = None
+        self.pending = None
+        self.dropped = 0
+    
+    def request(self, animator):
+        """Запрос превью для аниматора (последний запрос вытесняет предыдущие)."""
+        if self.pending is not None:
+            self.dropped += 1
+        self.pending = animator
+        if self.running is None:
+            self._start_pending()
+        else:
+            self.running.cancel_token.cancel()
+    
+    def _start_pending(self):
+        animator, self.pending = self.pending, None
+        thread = AnimationPreviewThread(animator)
+        thread.frame_ready.connect(self._relay_frame)
+        thread.done.connect(self._relay_done)
+        thread.finished.connect(self._thread_finished)
+        self.running = thread
+        self.started.emit()
+        thread.start()
+    
+    def _is_current(self) -> bool:
+        thread = self.sender()
+        return thread is self.running and not thread.cancel_token.cancelled
+    
+    def _relay_frame(self, draft: bool, frame_num: int, total: int, data: bytes):
+        if self._is_current():
+            self.frame_ready.emit(draft, frame_num, total, data)
+    
+    def _relay_done(self, message: str):
+        if self._is_current():
+            self.done.emit(message)
+    
+    def _thread_finished(self):
+        if self.sender() is not self.running:
+            return
+        self.running = None
+        if self.pending is not None:
+            self._start_pending()
+    
+    def shutdown(self):
+        """Отмена отрисовки и ожидающего запроса (при закрытии окна)."""
+        self.pending = None
+        if self.running is not None:
+            self.running.cancel_token.cancel()
+            self.running.wait()
+            self.running = None
+
+
 class TorsionLabWindow(QMainWindow):
     """
     Главное окно приложения.
@@ -49,12 +157,29 @@ class TorsionLabWindow(QMainWindow):
         self.setWindowTitle('Лабораторная работа: Определение модуля сдвига при кручении')
         self.setGeometry(100, 100, 1400, 900)
         self.setStyleSheet(GLOBAL_STYLE + TOOLTIP_STYLE)
-        self.animation_movie = None
         self.animation_preview_label = None
+        self.preview_frames = []  # показываемые кадры превью в JPEG (около 45 КБ на кадр)
+        self.preview_full_frames = []  # кадры полного качества, пока показывается черновик
+        self.preview_draft = False
+        self.preview_position = 0
+        self.preview_rendering = False
+        self.preview_started_at = 0.0
+        self.preview_draft_seconds = None
+        self.preview_timer = QTimer(self)
+        self.preview_timer.timeout.connect(self.show_next_preview_frame)
+        self.preview_scheduler = PreviewScheduler(self)
+        self.preview_scheduler.started.connect(self.animation_preview_started)
+        self.preview_scheduler.frame_ready.connect(self.animation_frame_ready)
+        self.preview_scheduler.done.connect(self.animation_preview_ready)
         self.animation_status_label = None
         
-        # Инициализация БД
-        self.db = DatabaseManager()
+        # БД открывается при первом обращении (см. свойство db)
+        self._db = None
+        
+        # Виджет графиков (matplotlib с Qt-бэкендом) создается при первом показе вкладки
+        # результатов или первом графике (см. свойство diagram_widget)
+        self._diagram_widget = None
+        self._diagram_layout = None
         
         # Переменные
         self.calculator = None
@@ -64,6 +189,27 @@ class TorsionLabWindow(QMainWindow):
         
         # Создание UI
         self.init_ui()
+        
+        # Шрифты и первая отрисовка matplotlib — после показа окна, до первого расчета
+        QTimer.singleShot(200, self.warm_up)
+    
+    def warm_up(self):
+        """Прогрев matplotlib, чтобы первый график строился без задержки."""
+        from core.warmup import warm_up_matplotlib
+        warm_up_matplotlib()
+    
+    @property
+    def db(self):
+        """Менеджер БД; SQLAlchemy импортируется при первом обращении, а не при запуске."""
+        if self._db is None:
+            from core.database import DatabaseManager
+            self._db = DatabaseManager()
+        return self._db
+    
+    def closeEvent(self, event):
+        """Остановка отрисовки превью перед закрытием окна."""
+        self.preview_scheduler.shutdown()
+        super().closeEvent(event)
     
     def init_ui(self):
         """Инициализация пользовательского интерфейса."""
@@ -97,6 +243,7 @@ class TorsionLabWindow(QMainWindow):
         self.tabs.addTab(self.create_animation_tab(), "🎬 Анимация")
         self.tabs.addTab(self.create_database_tab(), "💾 База данных")
         self.tabs.addTab(self.create_test_tab(), "📝 Контрольный тест")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
         
         main_layout.addWidget(self.tabs)
         
@@ -252,12 +399,26 @@ class TorsionLabWindow(QMainWindow):
         
         layout.addLayout(buttons_layout)
         
-        # Виджет с графиком
-        self.diagram_widget = DiagramWidget()
-        layout.addWidget(self.diagram_widget)
+        # Виджет с графиком добавляется в layout при первом обращении (см. свойство diagram_widget)
+        self._diagram_layout = layout
+        self.results_tab = tab
         
         tab.setLayout(layout)
         return tab
+    
+    @property
+    def diagram_widget(self):
+        """Виджет графиков; matplotlib и его Qt-бэкенд импортируются при первом обращении, а не при запуске."""
+        if self._diagram_widget is None:
+            from ui.diagrams import DiagramWidget
+            self._diagram_widget = DiagramWidget()
+            self._diagram_layout.addWidget(self._diagram_widget)
+        return self._diagram_widget
+    
+    def on_tab_changed(self, index):
+        """Создание виджета графиков при первом переходе на вкладку результатов."""
+        if self.tabs.widget(index) is self.results_tab:
+            self.diagram_widget
 
     def create_animation_tab(self):
         """Отдельная вкладка для анимации."""
@@ -337,8 +498,8 @@ class TorsionLabWindow(QMainWindow):
         
         tab.setLayout(layout)
         
-        # Загрузка данных
-        self.load_experiments()
+        # Загрузка данных после первой отрисовки окна
+        QTimer.singleShot(0, self.load_experiments)
         
         return tab
     
@@ -621,6 +782,8 @@ class TorsionLabWindow(QMainWindow):
         
         if filename:
             try:
+                from core.animator import TorsionAnimator
+                
                 animator = TorsionAnimator(
                     self.calculator,
                     self.results['moments'],
@@ -640,7 +803,10 @@ class TorsionLabWindow(QMainWindow):
                 self.animate_button.setEnabled(True)
     
     def start_animation_preview(self):
-        """Фоновая генерация GIF-превью и отображение прямо во вкладке с графиками."""
+        """
+        Живое превью анимации во вкладке: кадры показываются по мере отрисовки
+        (первый — сразу после построения фигуры), затем превью повторяется по кругу.
+        """
         if not self.calculator or not self.results:
             QMessageBox.information(self, "Напоминание", "Сначала выполните расчет.")
             return
@@ -648,38 +814,95 @@ class TorsionLabWindow(QMainWindow):
             QMessageBox.information(self, "Напоминание", "Откройте вкладку «Анимация».")
             return
         
-        preview_path = os.path.join(os.getcwd(), "temp_animation_preview.gif")
+        from core.animator import TorsionAnimator
+        
         animator = TorsionAnimator(
             self.calculator,
             self.results['moments'],
             self.results['angles']
         )
         
-        # Безопасно перезапускаем поток, если он еще крутится
-        if hasattr(self, 'preview_thread') and self.preview_thread.isRunning():
-            self.preview_thread.quit()
-            self.preview_thread.wait()
-        
-        self.animation_status_label.setText("Генерация превью анимации (8 c, 20 fps)...")
-        self.preview_thread = AnimationThread(animator, preview_path)
-        self.preview_thread.finished.connect(lambda msg, path=preview_path: self.animation_preview_ready(path, msg))
-        self.preview_thread.start()
-    
-    def animation_preview_ready(self, path: str, message: str):
-        """Загрузка и запуск GIF-превью после генерации."""
-        if os.path.exists(path):
-            movie = QMovie(path)
-            movie.setCacheMode(QMovie.CacheAll)
-            self.animation_movie = movie  # сохраняем, чтобы не собрать GC
-            self.animation_preview_label.setMovie(movie)
-            movie.start()
-            self.animation_status_label.setText("Превью готово ✅")
-        else:
-            self.animation_preview_label.setText("Не удалось сгенерировать превью")
-            self.animation_status_label.setText(message)
+        # Текущая отрисовка отменяется без ожидания, новая начнется после ее остановки
+        self.preview_scheduler.request(animator)
+    
+    def animation_preview_started(self):
+        """Началась отрисовка превью: прежние кадры больше не показываются."""
+        self.preview_timer.stop()
+        self.preview_frames = []
+        self.preview_full_frames = []
+        self.preview_draft = False
+        self.preview_position = 0
+        self.preview_rendering = True
+        self.preview_started_at = time.perf_counter()
+        self.preview_draft_seconds = None
+        self.animation_status_label.setText(
+            f"Отрисовка превью анимации ({PREVIEW_DURATION} c, {PREVIEW_FPS} fps)..."
+        )
+    
+    def animation_frame_ready(self, draft: bool, frame_num: int, total: int, data: bytes):
+        """
+        Новый кадр превью. Кадры черновика (или полного превью, если черновика нет)
+        показываются сразу: первый запускает таймер воспроизведения. Кадры полного
+        качества при показанном черновике копятся и подменяют его в конце отрисовки.
+        """
+        if draft or not self.preview_draft:
+            self.preview_draft = draft
+            self.preview_frames.append(data)
+            stage = "черновик" if draft else "кадр"
+            self.animation_status_label.setText(f"Отрисовка превью: {stage} {frame_num + 1}/{total}")
+            if frame_num == 0:
+                self.preview_timer.setInterval(PREVIEW_DURATION * 1000 // total)
+                self.show_next_preview_frame()
+                self.preview_timer.start()
+            return
         
+        if frame_num == 0:
+            # Черновик готов и повторяется по кругу, пока рисуется полное качество
+            self.preview_rendering = False
+            self.preview_draft_seconds = time.perf_counter() - self.preview_started_at
+        self.preview_full_frames.append(data)
+        self.animation_status_label.setText(
+            f"Черновик готов за {self.preview_draft_seconds:.1f} с; "
+            f"полное качество: кадр {frame_num + 1}/{total}"
+        )
+    
+    def show_next_preview_frame(self):
+        """Очередной кадр превью; пока отрисовка идет, воспроизведение ждет новых кадров."""
+        if self.preview_position >= len(self.preview_frames):
+            if self.preview_rendering or not self.preview_frames:
+                return
+            self.preview_position = 0
+        pixmap = QPixmap()
+        pixmap.loadFromData(self.preview_frames[self.preview_position], 'JPEG')
+        self.preview_position += 1
+        self.animation_preview_label.setPixmap(pixmap.scaled(
+            self.animation_preview_label.contentsRect().size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
+        ))
+    
+    def animation_preview_ready(self, message: str):
+        """Отрисовка превью завершена: дальше кадры воспроизводятся из памяти по кругу."""
+        self.preview_rendering = False
         if message:
+            self.preview_timer.stop()
+            self.animation_preview_label.setText("Не удалось сгенерировать превью")
+            self.animation_status_label.setText(message)
             self.statusBar().showMessage(message, 5000)
+            return
+        elapsed = time.perf_counter() - self.preview_started_at
+        if self.preview_full_frames:
+            # Подмена черновика полным качеством с той же фазы анимации
+            phase = self.preview_position / len(self.preview_frames)
+            self.preview_frames, self.preview_full_frames = self.preview_full_frames, []
+            self.preview_position = int(phase * len(self.preview_frames))
+            self.preview_draft = False
+            self.preview_timer.setInterval(PREVIEW_DURATION * 1000 // len(self.preview_frames))
+        
+        size_mb = sum(len(frame) for frame in self.preview_frames) / 2**20
+        timing = (f"черновик за {self.preview_draft_seconds:.1f} с, полное качество за {elapsed:.1f} с"
+                  if self.preview_draft_seconds is not None else f"за {elapsed:.1f} с")
+        self.animation_status_label.setText(
+            f"Превью готово ✅ ({len(self.preview_frames)} кадров, {size_mb:.1f} МБ в памяти; {timing})"
+        )
     
     def animation_finished(self, message):
         """Обработка завершения анимации."""
@@ -861,37 +1084,10 @@ class TorsionLabWindow(QMainWindow):
             return
         
         try:
-            # Сохранение графиков
-            diagram_path = "temp_diagram.png"
-            stress_path = "temp_stress.png"
+            from core.report_generator import ReportGenerator, render_report_figures
             
-            # Сохранение диаграммы T-φ
-            fig, ax = plt.subplots(figsize=(8, 6))
-            angles_deg = np.array(self.results['angles']) * 180 / np.pi
-            ax.plot(angles_deg, self.results['moments'], 'b-', linewidth=2)
-            ax.scatter(angles_deg, self.results['moments'], c='red', s=30, alpha=0.6)
-            ax.set_xlabel('Угол закручивания φ, град', fontsize=12)
-            ax.set_ylabel('Крутящий момент T, Н·м', fontsize=12)
-            ax.set_title('Диаграмма кручения T-φ', fontsize=14, fontweight='bold')
-            ax.grid(True, alpha=0.3)
-            plt.tight_layout()
-            plt.savefig(diagram_path, dpi=150)
-            plt.close()
-            
-            # Сохранение распределения напряжений
-            fig, ax = plt.subplots(figsize=(8, 6))
-            rho, tau = self.calculator.calc_shear_stress_distribution(self.results['T_max'], 50)
-            rho_mm = rho * 1000
-            tau_mpa = tau / 1e6
-            ax.plot(tau_mpa, rho_mm, 'r-', linewidth=2)
-            ax.fill_betweenx(rho_mm, 0, tau_mpa, alpha=0.3, color='red')
-            ax.set_xlabel('Касательное напряжение τ, МПа', fontsize=12)
-            ax.set_ylabel('Радиус ρ, мм', fontsize=12)
-            ax.set_title('Распределение τ по сечению', fontsize=14, fontweight='bold')
-            ax.grid(True, alpha=0.3)
-            plt.tight_layout()
-            plt.savefig(stress_path, dpi=150)
-            plt.close()
+            # Графики строятся в памяти, без временных файлов
+            diagram_image, stress_image = render_report_figures(self.calculator, self.results)
             
             # Генерация отчета
             report_gen = ReportGenerator()
@@ -900,17 +1096,10 @@ class TorsionLabWindow(QMainWindow):
                 group=self.group_input.text(),
                 calculator=self.calculator,
                 results=self.results,
-                diagram_path=diagram_path,
-                stress_path=stress_path
+                diagram_path=diagram_image,
+                stress_path=stress_image
             )
             
-            # Удаление временных файлов
-            try:
-                os.remove(diagram_path)
-                os.remove(stress_path)
-            except:
-                pass
-            
             QMessageBox.information(self, "Успех", f"Отчет создан:\n{filename}")
             
         except Exception as e:
@@ -0,0 +1,4 @@
+"""
+Вспомогательные модули Flask веб-приложения.
+Сжатие ответов, кодирование числовых массивов и другая инфраструктура веб-сервера.
+"""
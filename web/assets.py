@@ -0,0 +1,118 @@
+"""
+Модуль статических файлов с версией по содержимому (fingerprinting).
+
+Шаблоны получают адреса вида /assets/<хэш>/<файл> через asset_url('app.js'):
+при изменении файла меняется и адрес, поэтому ответ можно кэшировать навсегда
+(Cache-Control: immutable). Содержимое и его gzip-версия готовятся один раз
+при первом обращении и хранятся в памяти; при изменении файла на диске
+(сравниваются mtime и размер) пересчитываются.
+"""
+
+import hashlib
+import mimetypes
+import os
+import threading
+from typing import Dict
+
+from flask import Response, abort, request, url_for
+from werkzeug.security import safe_join
+
+from web.compression import compress_bytes
+
+
+# Кэширование версионированных адресов: год (максимум, рекомендуемый RFC 9111)
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class StaticAssets:
+    """Хэши, содержимое и предварительно сжатые версии файлов каталога static."""
+
+    def __init__(self, static_folder: str, compress_level: int = 9):
+        """
+        Args:
+            static_folder: Каталог статических файлов
+            compress_level: Уровень gzip для предварительного сжатия
+        """
+        self.static_folder = static_folder
+        self.compress_level = compress_level
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def entry(self, filename: str) -> Dict:
+        """
+        Данные файла: version (хэш содержимого), data, gzip (None, если сжатие не выгодно).
+
+        Raises:
+            FileNotFoundError: если файла нет или путь выходит за пределы каталога
+        """
+        path = safe_join(self.static_folder, filename)
+        if path is None or not os.path.isfile(path):
+            raise FileNotFoundError(filename)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._entries.get(filename)
+        if cached is not None and cached['signature'] == signature:
+            return cached
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        compressed = compress_bytes(data, 'gzip', self.compress_level)
+        entry = {
+            'signature': signature,
+            'version': hashlib.sha256(data).hexdigest()[:12],
+            'data': data,
+            'gzip': compressed if len(compressed) < len(data) else None,
+            'mimetype': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        }
+        with self._lock:
+            self._entries[filename] = entry
+        return entry
+
+    def url(self, filename: str) -> str:
+        """Адрес файла с версией по содержимому (для шаблонов — asset_url)."""
+        return url_for('static_asset', version=self.entry(filename)['version'], filename=filename)
+
+
+def init_assets(app) -> StaticAssets:
+    """
+    Подключение версионированных статических файлов: маршрут /assets/<version>/<filename>
+    и функция asset_url в шаблонах. Обычный /static/ продолжает работать.
+
+    Args:
+        app: Экземпляр Flask
+
+    Returns:
+        Хранилище статических файлов
+    """
+    assets = StaticAssets(app.static_folder)
+    app.add_template_global(assets.url, 'asset_url')
+
+    @app.route('/assets/<version>/<path:filename>', methods=['GET'])
+    def static_asset(version, filename):
+        """
+        Статический файл по версионированному адресу: предварительно сжатая gzip-версия
+        (если клиент ее принимает), ETag по содержимому, immutable-кэширование.
+        Устаревшая версия в адресе отдает текущий файл без долгого кэширования.
+        """
+        try:
+            entry = assets.entry(filename)
+        except FileNotFoundError:
+            abort(404)
+
+        current = version == entry['version']
+        use_gzip = entry['gzip'] is not None and request.accept_encodings['gzip'] > 0
+        response = Response(entry['gzip'] if use_gzip else entry['data'], mimetype=entry['mimetype'])
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        response.set_etag(entry['version'] + ('-gz' if use_gzip else ''))
+        if current:
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+    return assets
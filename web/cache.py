@@ -0,0 +1,59 @@
+"""
+Модуль потокобезопасного LRU-кэша в памяти процесса
+(готовые графики и воспроизводимые результаты расчетов).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+# Признак отсутствия значения (None — допустимое значение кэша)
+MISSING = object()
+
+
+class LRUCache:
+    """Кэш с вытеснением давно не использованных записей."""
+
+    def __init__(self, max_entries: int = 64):
+        """
+        Args:
+            max_entries: Максимальное количество записей (0 — кэш отключен)
+        """
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Значение по ключу (запись становится самой свежей) или default."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        """Сохранение значения с вытеснением самых старых записей."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,125 @@
+"""
+Модуль сжатия HTTP-ответов (gzip/deflate) средствами стандартной библиотеки.
+Алгоритм выбирается по заголовку Accept-Encoding клиента.
+"""
+
+import gzip
+import zlib
+from typing import Optional
+
+from flask import request
+
+
+# Типы содержимого, которые имеет смысл сжимать
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/javascript',
+    'text/event-stream',
+}
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Выбор алгоритма сжатия по заголовку Accept-Encoding (с учетом q-значений).
+
+    Args:
+        accept_encoding: Значение заголовка Accept-Encoding
+
+    Returns:
+        'gzip', 'deflate' или None
+    """
+    weights = {}
+    for part in (accept_encoding or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if token:
+            weights[token] = q
+
+    best = None
+    for encoding in ('gzip', 'deflate'):
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > 0 and (best is None or q > weights.get(best, weights.get('*', 0.0))):
+            best = encoding
+    return best
+
+
+def _compressor(encoding: str, level: int):
+    """Потоковый компрессор: gzip (wbits=31) или zlib-формат для deflate."""
+    wbits = 31 if encoding == 'gzip' else 15
+    return zlib.compressobj(level, zlib.DEFLATED, wbits)
+
+
+def compress_bytes(data: bytes, encoding: str, level: int = 6) -> bytes:
+    """
+    Сжатие данных целиком.
+
+    Args:
+        data: Исходные данные
+        encoding: 'gzip' или 'deflate'
+        level: Уровень сжатия 1..9
+
+    Returns:
+        Сжатые данные
+    """
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return zlib.compress(data, level)
+
+
+def _compress_stream(chunks, encoding: str, level: int):
+    """Сжатие потокового ответа с выталкиванием каждой порции (Z_SYNC_FLUSH)."""
+    compressor = _compressor(encoding, level)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush(zlib.Z_FINISH)
+
+
+def init_compression(app, min_size: int = 1024, level: int = 6):
+    """
+    Подключение сжатия ответов к Flask-приложению.
+
+    Args:
+        app: Экземпляр Flask
+        min_size: Минимальный размер ответа для сжатия, байт
+        level: Уровень сжатия 1..9
+    """
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        response.vary.add('Accept-Encoding')
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _compress_stream(response.response, encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(compress_bytes(data, encoding, level))
+
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,106 @@
+"""
+Модуль компактного кодирования числовых массивов в JSON-ответах.
+Поддерживает ограничение числа значащих цифр и двоичное кодирование float32 в base64.
+"""
+
+import base64
+import numpy as np
+from typing import Optional
+
+
+# Поля с рядами данных, которые кодируются компактно
+ARRAY_FIELDS = ('moments', 'angles')
+
+# Допустимые способы кодирования массивов
+ARRAY_ENCODINGS = ('json', 'f32')
+
+
+def encode_array(values, precision: Optional[int] = None, encoding: str = 'json'):
+    """
+    Кодирование числового массива.
+
+    Args:
+        values: Последовательность чисел
+        precision: Количество значащих цифр (None — без округления)
+        encoding: 'json' — список чисел, 'f32' — base64 от float32 (little-endian)
+
+    Returns:
+        Список чисел или словарь {'dtype', 'encoding', 'length', 'data'}
+    """
+    if encoding == 'f32':
+        packed = np.asarray(values, dtype='<f4')
+        return {
+            'dtype': 'float32',
+            'encoding': 'base64',
+            'length': int(packed.size),
+            'data': base64.b64encode(packed.tobytes()).decode('ascii')
+        }
+    if precision is not None:
+        return [float(f'{v:.{precision}g}') for v in values]
+    return list(values)
+
+
+def encode_arrays(data: dict, precision: Optional[int] = None, encoding: str = 'json',
+                  fields=ARRAY_FIELDS) -> dict:
+    """
+    Компактное кодирование полей-массивов словаря (остальные поля не меняются).
+
+    Args:
+        data: Словарь результатов (например, results из /api/calculate)
+        precision: Количество значащих цифр
+        encoding: Способ кодирования массивов ('json' или 'f32')
+        fields: Имена полей с массивами
+
+    Returns:
+        Новый словарь с закодированными массивами
+    """
+    if precision is None and encoding == 'json':
+        return data
+
+    encoded = dict(data)
+    for field in fields:
+        if isinstance(encoded.get(field), list):
+            encoded[field] = encode_array(encoded[field], precision, encoding)
+    return encoded
+
+
+def decode_array(value) -> list:
+    """
+    Обратное преобразование массива, закодированного encode_array.
+
+    Args:
+        value: Список чисел или словарь с base64
+
+    Returns:
+        Список чисел
+    """
+    if isinstance(value, dict) and value.get('encoding') == 'base64':
+        raw = base64.b64decode(value['data'])
+        return np.frombuffer(raw, dtype='<f4').astype(float).tolist()
+    return value
+
+
+def array_options(args) -> tuple:
+    """
+    Чтение параметров кодирования из query string запроса.
+
+    Args:
+        args: request.args (precision=<1..17>, encoding=json|f32)
+
+    Returns:
+        Кортеж (precision или None, encoding)
+
+    Raises:
+        ValueError: при некорректных значениях
+    """
+    precision = args.get('precision')
+    if precision is not None:
+        precision = int(precision)
+        if not 1 <= precision <= 17:
+            raise ValueError('precision должно быть в диапазоне 1..17')
+
+    encoding = args.get('encoding', 'json')
+    if encoding not in ARRAY_ENCODINGS:
+        raise ValueError(f'encoding должно быть одним из: {", ".join(ARRAY_ENCODINGS)}')
+
+    return precision, encoding
@@ -0,0 +1,81 @@
+"""
+Модуль Server-Sent Events: поток состояния фоновой задачи для EventSource в браузере.
+
+Состояние читается из общей таблицы jobs, поэтому поток можно открыть в любом
+процессе-воркере, независимо от того, где выполняется задача. События:
+    progress  — изменились прогресс, этап или частичные результаты (partial);
+    done      — задача завершена (плюс поля, переданные в final_fields);
+    failed    — задача завершилась ошибкой или не найдена;
+    timeout   — задача не завершилась за отведенное время.
+После done/failed/timeout поток закрывается — клиент должен вызвать EventSource.close(),
+иначе браузер переподключится.
+"""
+
+import json
+import time
+from typing import Callable, Dict, Iterator, Optional
+
+
+# Состояния задачи, после которых поток закрывается
+FINAL_STATUSES = ('done', 'failed')
+
+
+def format_event(data: Dict, event: Optional[str] = None) -> str:
+    """Сообщение SSE: необязательная строка event и данные JSON в одной строке data."""
+    lines = [f'event: {event}'] if event else []
+    lines.append('data: ' + json.dumps(data, ensure_ascii=False))
+    return '\n'.join(lines) + '\n\n'
+
+
+def job_events(fetch: Callable[[], Optional[Dict]], poll_interval: float = 0.25,
+               heartbeat: float = 15.0, timeout: float = 600.0,
+               final_fields: Optional[Dict] = None) -> Iterator[str]:
+    """
+    Поток событий задачи до ее завершения.
+
+    Args:
+        fetch: Функция чтения состояния задачи (None — задача не найдена)
+        poll_interval: Период опроса состояния, с
+        heartbeat: Период комментария-пинга без изменений (чтобы прокси не закрывали соединение), с
+        timeout: Максимальная длительность потока, с
+        final_fields: Дополнительные поля события done (например, ссылка на результат)
+
+    Yields:
+        Сообщения SSE
+    """
+    yield 'retry: 2000\n\n'
+    started = last_sent = time.monotonic()
+    last_state = None
+
+    while True:
+        job = fetch()
+        if job is None:
+            yield format_event({'status': 'failed', 'error': 'Задача не найдена'}, 'failed')
+            return
+
+        state = {
+            'status': job['status'],
+            'progress': job['progress'],
+            'stage': job['stage'],
+            'partial': job.get('partial') or {},
+        }
+        if job['status'] in FINAL_STATUSES:
+            state['error'] = job.get('error')
+            if job['status'] == 'done':
+                state.update(final_fields or {})
+            yield format_event(state, job['status'])
+            return
+
+        now = time.monotonic()
+        if state != last_state:
+            yield format_event(state, 'progress')
+            last_state = state
+            last_sent = now
+        elif now - last_sent >= heartbeat:
+            yield ': ping\n\n'
+            last_sent = now
+
+        if now - started >= timeout:
+            yield format_event(state, 'timeout')
+            return
+        time.sleep(poll_interval)
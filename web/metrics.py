@@ -0,0 +1,370 @@
+"""
+Модуль встроенных метрик веб-приложения: гистограммы задержек (p50/p95/p99),
+счетчики и текущие значения (in-flight), экспорт в формате Prometheus и JSON.
+
+Запись в гистограммы и счетчики идет в шарды потоков (у каждого потока свой
+массив), поэтому на горячем пути нет общей блокировки; шарды суммируются
+только при чтении. При запуске через serve.py у каждого процесса-воркера
+свои метрики — в ответе указывается pid процесса.
+"""
+
+import itertools
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+from flask import g, request
+
+
+# Границы корзин гистограммы задержек, с (как у клиентских библиотек Prometheus, плюс 30 и 60 с)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Квантили, выводимые в JSON и в комментариях Prometheus
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Описания метрик приложения (строка HELP в формате Prometheus)
+METRIC_HELP = {
+    'torsion_http_request_seconds': 'Длительность обработки запроса, с',
+    'torsion_http_requests_total': 'Количество запросов',
+    'torsion_http_requests_in_flight': 'Запросы в обработке',
+    'torsion_http_slow_requests_total': 'Медленные запросы',
+    'torsion_render_seconds': 'Отрисовка графиков matplotlib, с',
+    'torsion_render_wait_seconds': 'Ожидание очереди на отрисовку, с',
+    'torsion_docx_seconds': 'Сборка документа .docx, с',
+    'torsion_db_seconds': 'Запросы к базе данных, с',
+    'torsion_singleflight_requests_total': 'Запросы с объединением одинаковых (role=shared — получили чужой результат)',
+    'torsion_cache_requests_total': 'Обращения к кэшу графиков и результатов (result=hit|miss)',
+    'torsion_warm_up_seconds': 'Длительность прогрева кэшей при запуске, с',
+    'torsion_ratelimit_rejected_total': 'Запросы, отклоненные по бюджету клиента (429)',
+    'torsion_admission_total': 'Допуск дорогих запросов (result=admitted|queue_full|timeout)',
+    'torsion_admission_wait_seconds': 'Ожидание в очереди допуска, с',
+    'torsion_admission_waiting': 'Дорогие запросы в очереди допуска',
+    'torsion_admission_running': 'Выполняющиеся дорогие запросы',
+    'torsion_admission_capacity': 'Лимит одновременно выполняющихся дорогих запросов',
+}
+
+
+class _ShardOwner:
+    """Владелец массива потока: живет в локальном хранилище потока и исчезает вместе с ним."""
+
+    __slots__ = ('shard', '__weakref__')
+
+    def __init__(self, shard: list):
+        self.shard = shard
+
+
+class _Sharded:
+    """
+    Базовый класс: значения хранятся в отдельном массиве для каждого потока.
+    Когда поток завершается, его массив прибавляется к базовому и удаляется, так что
+    число массивов не растет с числом обслуженных запросов (dev-сервер Flask создает
+    поток на каждый запрос).
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._base = [0] * size
+        self._shards = {}
+        self._shard_ids = itertools.count()
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> list:
+        """Массив текущего потока (создается при первой записи)."""
+        owner = getattr(self._local, 'owner', None)
+        if owner is None:
+            shard = [0] * self._size
+            with self._shards_lock:
+                shard_id = next(self._shard_ids)
+                self._shards[shard_id] = shard
+            owner = self._local.owner = _ShardOwner(shard)
+            weakref.finalize(owner, self._retire, shard_id)
+        return owner.shard
+
+    def _retire(self, shard_id: int):
+        """Слияние массива завершившегося потока с базовым."""
+        with self._shards_lock:
+            shard = self._shards.pop(shard_id)
+            for i, value in enumerate(shard):
+                self._base[i] += value
+
+    def _collect(self) -> list:
+        """Сумма значений по всем потокам."""
+        with self._shards_lock:
+            total = list(self._base)
+            shards = list(self._shards.values())
+        for shard in shards:
+            for i, value in enumerate(shard):
+                total[i] += value
+        return total
+
+
+class Counter(_Sharded):
+    """Монотонно растущий счетчик."""
+
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1):
+        self._shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._collect()[0]
+
+
+class Gauge:
+    """Текущее значение (например, число запросов в обработке)."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Histogram(_Sharded):
+    """Гистограмма с фиксированными корзинами; квантили оцениваются интерполяцией внутри корзины."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # корзины + переполнение (+Inf) + сумма + количество
+        super().__init__(len(self.buckets) + 3)
+
+    def observe(self, value: float):
+        shard = self._shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-2] += value
+        shard[-1] += 1
+
+    def snapshot(self) -> Dict:
+        """
+        Срез гистограммы.
+
+        Returns:
+            Словарь {'buckets': [(граница, накопленное количество)], 'sum', 'count', 'quantiles'}
+        """
+        values = self._collect()
+        counts, total_sum, count = values[:-2], values[-2], values[-1]
+
+        cumulative = []
+        running = 0
+        for bound, c in zip(self.buckets + (float('inf'),), counts):
+            running += c
+            cumulative.append((bound, running))
+
+        return {
+            'buckets': cumulative,
+            'sum': total_sum,
+            'count': count,
+            'quantiles': {q: self._quantile(q, cumulative, count) for q in QUANTILES}
+        }
+
+    @staticmethod
+    def _quantile(q: float, cumulative: list, count: int) -> float:
+        """Оценка квантиля по накопленным корзинам (линейно внутри корзины)."""
+        if count == 0:
+            return 0.0
+        rank = q * count
+        lower_bound, lower_count = 0.0, 0
+        for bound, running in cumulative:
+            if running >= rank:
+                if bound == float('inf'):
+                    return lower_bound
+                share = (rank - lower_count) / max(running - lower_count, 1)
+                return lower_bound + (bound - lower_bound) * share
+            lower_bound, lower_count = bound, running
+        return lower_bound
+
+
+class MetricsRegistry:
+    """Реестр метрик: семейства по имени, внутри — серии по набору меток."""
+
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def _get(self, kind: str, name: str, help_text: str, labels: dict, factory):
+        key = tuple(sorted(labels.items()))
+        family = self._families.get(name)
+        if family is None or key not in family['series']:
+            with self._lock:
+                family = self._families.setdefault(
+                    name, {'kind': kind, 'help': help_text or METRIC_HELP.get(name, ''), 'series': {}}
+                )
+                family['series'].setdefault(key, factory())
+        return family['series'][key]
+
+    def counter(self, name: str, help_text: str = '', **labels) -> Counter:
+        return self._get('counter', name, help_text, labels, Counter)
+
+    def gauge(self, name: str, help_text: str = '', **labels) -> Gauge:
+        return self._get('gauge', name, help_text, labels, Gauge)
+
+    def histogram(self, name: str, help_text: str = '', **labels) -> Histogram:
+        return self._get('histogram', name, help_text, labels, Histogram)
+
+    @contextmanager
+    def timer(self, name: str, help_text: str = '', **labels):
+        """
+        Замер длительности блока кода в гистограмму (в секундах).
+
+        Пример:
+            with metrics.timer('torsion_render_seconds', figure='torsion'):
+                fig.savefig(buffer)
+        """
+        histogram = self.histogram(name, help_text, **labels)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    def to_dict(self) -> Dict:
+        """Все метрики в виде словаря (для JSON-ответа)."""
+        with self._lock:
+            families = {name: dict(family, series=dict(family['series']))
+                        for name, family in self._families.items()}
+
+        result = {}
+        for name, family in sorted(families.items()):
+            series = []
+            for key, metric in family['series'].items():
+                item = {'labels': dict(key)}
+                if family['kind'] == 'histogram':
+                    snapshot = metric.snapshot()
+                    item.update({
+                        'count': snapshot['count'],
+                        'sum': snapshot['sum'],
+                        'p50': snapshot['quantiles'][0.5],
+                        'p95': snapshot['quantiles'][0.95],
+                        'p99': snapshot['quantiles'][0.99],
+                    })
+                else:
+                    item['value'] = metric.value
+                series.append(item)
+            result[name] = {'type': family['kind'], 'help': family['help'], 'series': series}
+        return result
+
+    def render_prometheus(self) -> str:
+        """Все метрики в текстовом формате Prometheus (version 0.0.4)."""
+        with self._lock:
+            families = {name: dict(family, series=dict(family['series']))
+                        for name, family in self._families.items()}
+
+        lines = []
+        for name, family in sorted(families.items()):
+            if family['help']:
+                lines.append(f'# HELP {name} {family["help"]}')
+            lines.append(f'# TYPE {name} {family["kind"]}')
+            for key, metric in family['series'].items():
+                labels = dict(key)
+                if family['kind'] != 'histogram':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(metric.value)}')
+                    continue
+                snapshot = metric.snapshot()
+                for bound, running in snapshot['buckets']:
+                    le = '+Inf' if bound == float('inf') else _format_value(bound)
+                    lines.append(f'{name}_bucket{_format_labels(dict(labels, le=le))} {running}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(snapshot["sum"])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {snapshot["count"]}')
+                quantiles = ' '.join(f'p{int(q * 100)}={v:.4f}' for q, v in snapshot['quantiles'].items())
+                lines.append(f'# {name}{_format_labels(labels)} {quantiles}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: dict) -> str:
+    """Метки в синтаксисе Prometheus: {a="1",b="2"}."""
+    if not labels:
+        return ''
+    pairs = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    """Число без лишних нулей (целые — без дробной части)."""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def init_metrics(app, slow_request_ms: float = 1000.0) -> MetricsRegistry:
+    """
+    Подключение метрик HTTP-запросов к Flask-приложению.
+    Время запроса измеряется до формирования ответа: для потоковых ответов
+    (например, /api/calculate/batch) передача тела не учитывается.
+
+    Args:
+        app: Экземпляр Flask
+        slow_request_ms: Порог записи медленного запроса в журнал, мс
+
+    Returns:
+        Реестр метрик (также доступен как app.extensions['metrics'])
+    """
+    registry = MetricsRegistry()
+    app.extensions['metrics'] = registry
+    in_flight = registry.gauge('torsion_http_requests_in_flight')
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+        in_flight.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        registry.histogram('torsion_http_request_seconds',
+                           route=route, method=request.method).observe(elapsed)
+        registry.counter('torsion_http_requests_total', route=route, method=request.method,
+                         status=str(response.status_code)).inc()
+
+        if elapsed * 1000 >= slow_request_ms:
+            registry.counter('torsion_http_slow_requests_total', route=route).inc()
+            app.logger.warning('Медленный запрос: %s %s -> %s за %.0f мс',
+                               request.method, request.full_path.rstrip('?'),
+                               response.status_code, elapsed * 1000)
+        return response
+
+    @app.teardown_request
+    def finish_request(error=None):
+        # teardown вызывается и при необработанных исключениях — gauge не «утекает»
+        in_flight.dec()
+
+    return registry
+
+
+def metrics_payload(registry: MetricsRegistry) -> Dict:
+    """Метрики в JSON с данными о процессе."""
+    return {
+        'pid': os.getpid(),
+        'uptime_seconds': time.time() - registry.started_at,
+        'metrics': registry.to_dict()
+    }
@@ -0,0 +1,317 @@
+"""
+Модуль профилирования отдельных запросов по требованию.
+
+Включается переменной окружения TORSION_PROFILING=1; профилируется только запрос
+с заголовком X-Profile (или параметром ?profile=) со значением:
+    cprofile (или 1) — cProfile: топ функций по собственному и накопленному времени;
+    sample           — сэмплирующий профилировщик: свернутые стеки (collapsed stacks)
+                       для flamegraph.pl / speedscope и топ функций по числу сэмплов.
+Нужен еще заголовок X-Profile-Token (или ?profile_token=) со значением
+TORSION_PROFILING_TOKEN: без токена профилирование не включается.
+Потоковые ответы (SSE, MJPEG) не профилируются и не собираются в память.
+
+Результаты хранятся в ограниченном кольцевом буфере в памяти процесса
+и доступны по /debug/profiles.
+"""
+
+import collections
+import cProfile
+import hmac
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from flask import Response, abort, jsonify, request
+
+
+# Режимы профилирования по значению заголовка / параметра
+PROFILE_MODES = {'1': 'cprofile', 'cprofile': 'cprofile', 'sample': 'sample'}
+
+# Потоковые ответы: длятся до конца задачи или воспроизведения, тело не собирается в память
+STREAMED_MIMETYPES = ('text/event-stream', 'multipart/x-mixed-replace')
+
+
+class ProfileStore:
+    """Кольцевой буфер последних профилей (старые вытесняются)."""
+
+    def __init__(self, size: int = 50):
+        self._profiles = collections.deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, profile: Dict):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            return list(self._profiles)
+
+    def get(self, profile_id: int) -> Optional[Dict]:
+        with self._lock:
+            for profile in self._profiles:
+                if profile['id'] == profile_id:
+                    return profile
+        return None
+
+
+class StackSampler:
+    """
+    Сэмплирующий профилировщик одного потока: фоновый поток периодически
+    снимает стек через sys._current_frames() и считает одинаковые стеки.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='torsion-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Свернутые стеки: 'корень;...;лист количество' — строка на стек."""
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+    def top(self, limit: int) -> List[Dict]:
+        """Топ функций по сэмплам: собственные (функция — лист стека) и с вложенными вызовами."""
+        own = collections.Counter()
+        inclusive = collections.Counter()
+        for stack, count in self.stacks.items():
+            names = stack.split(';')
+            own[names[-1]] += count
+            for name in set(names):
+                inclusive[name] += count
+
+        total = max(self.samples, 1)
+        return [
+            {
+                'function': name,
+                'own_samples': own[name],
+                'samples': count,
+                'own_percent': round(own[name] / total * 100, 1),
+                'percent': round(count / total * 100, 1),
+            }
+            for name, count in sorted(inclusive.items(), key=lambda item: (-own[item[0]], -item[1]))[:limit]
+        ]
+
+
+def _frame_name(frame) -> str:
+    """Имя кадра стека: модуль.функция."""
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _cprofile_top(profiler: cProfile.Profile, limit: int) -> Dict[str, List[Dict]]:
+    """Топ функций cProfile по собственному и накопленному времени."""
+    stats = pstats.Stats(profiler).stats
+    rows = []
+    for (filename, line, name), (primitive, calls, own, cumulative, _) in stats.items():
+        rows.append({
+            'function': name,
+            'location': f'{os.path.basename(filename)}:{line}' if line else filename,
+            'calls': calls,
+            'own_ms': round(own * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3),
+        })
+    return {
+        'top_own': sorted(rows, key=lambda row: -row['own_ms'])[:limit],
+        'top_cumulative': sorted(rows, key=lambda row: -row['cumulative_ms'])[:limit],
+    }
+
+
+class ProfilingMiddleware:
+    """
+    WSGI-обертка: профилирует запрос целиком, включая сериализацию JSON,
+    сжатие и отдачу тела (тело ответа собирается в память).
+    Одновременно выполняется не более одного профилирования cProfile;
+    остальные запросы в это время обрабатываются без профилирования
+    (заголовок ответа X-Profile-Status: busy). Потоковые ответы (STREAMED_MIMETYPES)
+    отдаются как есть, без профиля (X-Profile-Status: streamed).
+    """
+
+    def __init__(self, wsgi_app, store: ProfileStore, token: str,
+                 top_n: int = 25, interval: float = 0.005):
+        self.wsgi_app = wsgi_app
+        self.store = store
+        self.token = token
+        self.top_n = top_n
+        self.interval = interval
+        self._cprofile_lock = threading.Lock()
+
+    def authorized(self, environ) -> bool:
+        """Проверка токена администратора (без токена доступа нет)."""
+        if not self.token:
+            return False
+        query = parse_qs(environ.get('QUERY_STRING', ''))
+        supplied = environ.get('HTTP_X_PROFILE_TOKEN') or query.get('profile_token', [''])[0]
+        return hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def requested_mode(self, environ) -> Optional[str]:
+        """Режим профилирования, запрошенный клиентом, или None."""
+        value = environ.get('HTTP_X_PROFILE')
+        if value is None:
+            value = parse_qs(environ.get('QUERY_STRING', '')).get('profile', [None])[0]
+        mode = PROFILE_MODES.get((value or '').strip().lower())
+        if mode is None or not self.authorized(environ):
+            return None
+        return mode
+
+    def __call__(self, environ, start_response):
+        mode = self.requested_mode(environ)
+        if mode is None or environ.get('PATH_INFO', '').startswith('/debug/profiles'):
+            return self.wsgi_app(environ, start_response)
+
+        if mode == 'cprofile' and not self._cprofile_lock.acquire(blocking=False):
+            def busy_start_response(status, headers, exc_info=None):
+                return start_response(status, headers + [('X-Profile-Status', 'busy')], exc_info)
+            return self.wsgi_app(environ, busy_start_response)
+
+        profile_id = self.store.next_id()
+        response_status = {}
+
+        def profiled_start_response(status, headers, exc_info=None):
+            response_status['status'] = status
+            content_type = next((value for name, value in headers if name.lower() == 'content-type'), '')
+            if content_type.split(';')[0].strip().lower() in STREAMED_MIMETYPES:
+                response_status['streamed'] = True
+                return start_response(status, headers + [('X-Profile-Status', 'streamed')], exc_info)
+            return start_response(status, headers + [('X-Profile-Id', str(profile_id))], exc_info)
+
+        sampler = StackSampler(threading.get_ident(), self.interval) if mode == 'sample' else None
+        profiler = cProfile.Profile() if mode == 'cprofile' else None
+
+        started = time.perf_counter()
+        try:
+            if sampler:
+                sampler.start()
+            else:
+                profiler.enable()
+            try:
+                iterable = self.wsgi_app(environ, profiled_start_response)
+                if not response_status.get('streamed'):
+                    try:
+                        body = list(iterable)
+                    finally:
+                        if hasattr(iterable, 'close'):
+                            iterable.close()
+            finally:
+                if sampler:
+                    sampler.stop()
+                else:
+                    profiler.disable()
+        finally:
+            if profiler is not None:
+                self._cprofile_lock.release()
+
+        if response_status.get('streamed'):
+            return iterable
+
+        profile = {
+            'id': profile_id,
+            'timestamp': time.time(),
+            'pid': os.getpid(),
+            'mode': mode,
+            'method': environ.get('REQUEST_METHOD'),
+            'path': environ.get('PATH_INFO'),
+            'query': environ.get('QUERY_STRING', ''),
+            'status': response_status.get('status'),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+        }
+        if sampler:
+            profile.update({
+                'samples': sampler.samples,
+                'interval_ms': self.interval * 1000,
+                'top': sampler.top(self.top_n),
+                'collapsed': sampler.collapsed(),
+            })
+        else:
+            profile.update(_cprofile_top(profiler, self.top_n))
+        self.store.add(profile)
+        return body
+
+
+def init_profiling(app, token: str, ring_size: int = 50,
+                   top_n: int = 25, interval: float = 0.005) -> ProfileStore:
+    """
+    Подключение профилирования по требованию и страниц /debug/profiles.
+
+    Args:
+        app: Экземпляр Flask
+        token: Токен администратора (обязателен: профили содержат пути и параметры запросов)
+        ring_size: Сколько последних профилей хранить
+        top_n: Сколько функций включать в топ
+        interval: Период сэмплирования стека, с
+
+    Returns:
+        Хранилище профилей
+
+    Raises:
+        ValueError: Токен не задан
+    """
+    if not token:
+        raise ValueError('Для профилирования нужен токен администратора (TORSION_PROFILING_TOKEN)')
+    store = ProfileStore(ring_size)
+    middleware = ProfilingMiddleware(app.wsgi_app, store, token, top_n, interval)
+    app.wsgi_app = middleware
+
+    def check_access():
+        if not middleware.authorized(request.environ):
+            abort(403)
+
+    @app.route('/debug/profiles', methods=['GET'])
+    def list_profiles():
+        """Список сохраненных профилей (без стеков), новые — первыми."""
+        check_access()
+        summary_fields = ('id', 'timestamp', 'pid', 'mode', 'method', 'path', 'query',
+                          'status', 'duration_ms')
+        profiles = [{field: profile.get(field) for field in summary_fields}
+                    for profile in reversed(store.list())]
+        return jsonify({'success': True, 'profiles': profiles})
+
+    @app.route('/debug/profiles/<int:profile_id>', methods=['GET'])
+    def get_profile(profile_id):
+        """Профиль целиком: топ функций и (для режима sample) свернутые стеки."""
+        check_access()
+        profile = store.get(profile_id)
+        if profile is None:
+            return jsonify({'success': False, 'error': 'Профиль не найден'}), 404
+        return jsonify({'success': True, 'profile': profile})
+
+    @app.route('/debug/profiles/<int:profile_id>/collapsed', methods=['GET'])
+    def get_profile_collapsed(profile_id):
+        """Свернутые стеки в текстовом виде (вход для flamegraph.pl и speedscope)."""
+        check_access()
+        profile = store.get(profile_id)
+        if profile is None or 'collapsed' not in profile:
+            return jsonify({'success': False, 'error': 'Свернутые стеки есть только у профилей sample'}), 404
+        return Response(profile['collapsed'] + '\n', mimetype='text/plain')
+
+    return store
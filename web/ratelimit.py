@@ -0,0 +1,269 @@
+"""
+Модуль ограничения нагрузки от отдельных клиентов (в памяти процесса, без внешних хранилищ).
+
+1. Token bucket на клиента (IP-адрес) отдельно для дешевых и дорогих маршрутов:
+   при исчерпании бюджета — 429 Too Many Requests с Retry-After.
+2. Очередь допуска для дорогих маршрутов (кроме UNGATED_ENDPOINTS): одновременно
+   выполняется не больше concurrency запросов, ждут не больше max_waiting; при
+   переполнении очереди или слишком долгом ожидании — 503 Service Unavailable с Retry-After.
+
+Бюджеты действуют в пределах процесса: при запуске через serve.py у каждого
+воркера свои корзины и своя очередь.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Tuple
+
+from flask import g, jsonify, request
+
+
+# Маршруты (имена обработчиков), которые нагружают процессор: отрисовка, отчеты, анимации, пакеты
+EXPENSIVE_ENDPOINTS = {
+    'plot_torsion',
+    'plot_stress',
+    'download_report',
+    'generate_report',
+    'create_animation',
+    'stream_animation',
+    'calculate_async',
+    'calculate_batch',
+}
+
+# Дорогие маршруты без очереди допуска: потоковый ответ длится все воспроизведение (с паузами
+# по fps), а отрисовка идет по кадрам под общей блокировкой render_lock; повтор из кэша не
+# рисует вовсе. Место в очереди на все время потока не давало бы выполняться другим запросам
+UNGATED_ENDPOINTS = {'stream_animation'}
+
+# Маршруты без ограничений: мониторинг и статика
+EXEMPT_ENDPOINTS = {'get_metrics', 'static', 'static_asset'}
+
+
+def parse_rate(value: str) -> Tuple[float, float]:
+    """
+    Разбор бюджета вида '<запросов в секунду>/<всплеск>', например '2/5'.
+
+    Returns:
+        Кортеж (rate, burst)
+    """
+    rate, _, burst = str(value).partition('/')
+    rate = float(rate)
+    burst = float(burst) if burst else max(rate, 1.0)
+    if rate <= 0 or burst < 1:
+        raise ValueError(f'Некорректный бюджет запросов: {value}')
+    return rate, burst
+
+
+class TokenBucket:
+    """Корзина токенов: пополняется со скоростью rate, вмещает не больше burst."""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """
+        Попытка взять токен.
+
+        Returns:
+            0, если токен взят, иначе через сколько секунд появится следующий
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Корзины токенов по ключу (клиент, класс маршрута)."""
+
+    def __init__(self, budgets: Dict[str, Tuple[float, float]], prune_every: int = 1024):
+        """
+        Args:
+            budgets: Бюджет (rate, burst) для каждого класса маршрутов
+            prune_every: Через сколько проверок удалять корзины простаивающих клиентов
+        """
+        self.budgets = budgets
+        self.prune_every = prune_every
+        self._buckets = {}
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    def check(self, client: str, route_class: str) -> float:
+        """
+        Списание запроса с бюджета клиента.
+
+        Returns:
+            0, если запрос разрешен, иначе рекомендуемая пауза (Retry-After), с
+        """
+        rate, burst = self.budgets[route_class]
+        now = time.monotonic()
+        with self._lock:
+            self._calls += 1
+            if self._calls % self.prune_every == 0:
+                self._prune(now)
+            bucket = self._buckets.get((client, route_class))
+            if bucket is None:
+                bucket = self._buckets[(client, route_class)] = TokenBucket(rate, burst, now)
+            return bucket.take(now)
+
+    def _prune(self, now: float):
+        """Удаление корзин, которые уже успели заполниться: они неотличимы от новых."""
+        idle = [key for key, bucket in self._buckets.items()
+                if now - bucket.updated >= bucket.burst / bucket.rate]
+        for key in idle:
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._buckets)
+
+
+class AdmissionRejected(Exception):
+    """Запрос не допущен к выполнению: очередь заполнена или ожидание слишком долгое."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionQueue:
+    """Ограниченная очередь допуска: concurrency выполняющихся и max_waiting ожидающих запросов."""
+
+    def __init__(self, concurrency: int = 2, max_waiting: int = 8, timeout: float = 10.0):
+        self.concurrency = concurrency
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.waiting = 0
+        self.running = 0
+        self._slots = threading.Semaphore(concurrency)
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Ожидание свободного места.
+
+        Raises:
+            AdmissionRejected: reason='queue_full' или 'timeout'
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self.waiting >= self.max_waiting:
+                    raise AdmissionRejected('queue_full')
+                self.waiting += 1
+            try:
+                admitted = self._slots.acquire(timeout=self.timeout)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+            if not admitted:
+                raise AdmissionRejected('timeout')
+        with self._lock:
+            self.running += 1
+
+    def release(self):
+        with self._lock:
+            self.running -= 1
+        self._slots.release()
+
+
+def client_id(trust_proxy: bool = False) -> str:
+    """Идентификатор клиента: IP-адрес (за доверенным прокси — первый из X-Forwarded-For)."""
+    if trust_proxy and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or 'unknown'
+
+
+def _rejection(error: str, retry_after: float, status: int):
+    response = jsonify({'success': False, 'error': error})
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response, status
+
+
+def init_rate_limiting(app, registry, cheap: str = '20/40', expensive: str = '2/5',
+                       concurrency: int = 2, max_waiting: int = 8, timeout: float = 10.0,
+                       busy_retry_after: float = 2.0, trust_proxy: bool = False) -> Tuple[RateLimiter, AdmissionQueue]:
+    """
+    Подключение ограничения нагрузки к Flask-приложению.
+
+    Args:
+        app: Экземпляр Flask
+        registry: Реестр метрик (счетчики отказов и состояние очереди)
+        cheap: Бюджет дешевых маршрутов на клиента, '<в секунду>/<всплеск>'
+        expensive: Бюджет дорогих маршрутов (EXPENSIVE_ENDPOINTS) на клиента
+        concurrency: Сколько дорогих запросов выполняется одновременно
+        max_waiting: Сколько дорогих запросов может ждать в очереди
+        timeout: Максимальное ожидание в очереди, с
+        busy_retry_after: Retry-After для ответа 503, с
+        trust_proxy: Определять клиента по X-Forwarded-For (только за своим обратным прокси)
+
+    Returns:
+        Кортеж (RateLimiter, AdmissionQueue)
+    """
+    limiter = RateLimiter({'cheap': parse_rate(cheap), 'expensive': parse_rate(expensive)})
+    admission = AdmissionQueue(concurrency, max_waiting, timeout)
+    registry.gauge('torsion_admission_capacity').set(concurrency)
+
+    @app.before_request
+    def limit_request():
+        endpoint = request.endpoint
+        if endpoint is None or endpoint in EXEMPT_ENDPOINTS or request.path.startswith('/debug/'):
+            return None
+        route_class = 'expensive' if endpoint in EXPENSIVE_ENDPOINTS else 'cheap'
+
+        retry_after = limiter.check(client_id(trust_proxy), route_class)
+        if retry_after > 0:
+            registry.counter('torsion_ratelimit_rejected_total', route_class=route_class).inc()
+            return _rejection('Слишком много запросов, повторите позже', retry_after, 429)
+        if route_class == 'cheap' or endpoint in UNGATED_ENDPOINTS:
+            return None
+
+        started = time.perf_counter()
+        try:
+            admission.acquire()
+        except AdmissionRejected as e:
+            registry.counter('torsion_admission_total', result=e.reason).inc()
+            return _rejection('Сервер занят, повторите позже', busy_retry_after, 503)
+        finally:
+            registry.histogram('torsion_admission_wait_seconds').observe(time.perf_counter() - started)
+            registry.gauge('torsion_admission_waiting').set(admission.waiting)
+        registry.counter('torsion_admission_total', result='admitted').inc()
+        registry.gauge('torsion_admission_running').set(admission.running)
+        g.admission_release = _releaser(admission, registry)
+        return None
+
+    @app.after_request
+    def release_after_body(response):
+        # Место освобождается после передачи тела: потоковые ответы выполняют работу при отдаче
+        release = g.pop('admission_release', None)
+        if release is not None:
+            response.call_on_close(release)
+        return response
+
+    @app.teardown_request
+    def release_on_error(error=None):
+        release = g.pop('admission_release', None)
+        if release is not None:
+            release()
+
+    return limiter, admission
+
+
+def _releaser(admission: AdmissionQueue, registry):
+    """Однократное освобождение места в очереди допуска."""
+    released = []
+
+    def release():
+        if not released:
+            released.append(True)
+            admission.release()
+            registry.gauge('torsion_admission_running').set(admission.running)
+
+    return release
@@ -0,0 +1,102 @@
+"""
+Модуль объединения одновременных одинаковых запросов (single-flight).
+Пока вычисление по ключу выполняется, повторные запросы с тем же ключом
+не запускают его заново, а ждут и получают тот же результат (или ту же ошибку).
+Результаты не кэшируются: после завершения следующий запрос вычисляет заново.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Tuple
+
+
+class _Call:
+    """Выполняющееся вычисление, которого ждут повторные запросы."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Группа вычислений, объединяемых по ключу."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Выполнение compute() не более одного раза одновременно для каждого ключа.
+
+        Args:
+            key: Ключ запроса (см. request_key)
+            compute: Функция вычисления результата
+
+        Returns:
+            Кортеж (результат, shared): shared=True, если результат получен
+            от вычисления, запущенного другим запросом
+
+        Raises:
+            Исключение compute(), в том числе для всех ожидавших запросов
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = compute()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    @property
+    def in_flight(self) -> int:
+        """Количество выполняющихся вычислений."""
+        with self._lock:
+            return len(self._calls)
+
+
+def _canonical(value):
+    """Приведение значения к каноническому виду: числа — float, ключи словарей отсортированы."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return str(value)
+
+
+def request_key(endpoint: str, *parts) -> str:
+    """
+    Канонический хэш запроса: одинаковые по смыслу параметры (10 и 10.0,
+    разный порядок полей) дают одинаковый ключ.
+
+    Args:
+        endpoint: Имя обработчика
+        parts: Параметры, от которых зависит результат
+
+    Returns:
+        Строка вида '<endpoint>:<sha256>'
+    """
+    encoded = json.dumps(_canonical(list(parts)), sort_keys=True, separators=(',', ':'),
+                         ensure_ascii=False)
+    return f'{endpoint}:{hashlib.sha256(encoded.encode("utf-8")).hexdigest()}'
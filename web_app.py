@@ -6,26 +6,391 @@ Flask веб-приложение для лабораторной работы 
 Группа: ИН-31
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file, url_for
 import json
 import os
-import matplotlib
-matplotlib.use('Agg')  # Для работы без GUI
-import matplotlib.pyplot as plt
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
 import numpy as np
 from io import BytesIO
 import base64
 
+# Для работы без GUI. matplotlib, python-docx и SQLAlchemy импортируются при первом
+# использовании (rendering, get_db, отчеты), чтобы процесс быстрее запускался
+os.environ['MPLBACKEND'] = 'Agg'
+
 from core.calculator import TorsionCalculator, determine_failure_type
-from core.database import DatabaseManager
-from core.report_generator import ReportGenerator
+from core.batch import normalize_params, evaluate_batch
+from core.chart_data import build_torsion_chart, build_stress_chart
+from core.jobs import JobQueue, JobQueueFull
+from core.animation_cache import AnimationCache, ANIMATION_FORMATS, animation_key
+from web.assets import init_assets
+from web.compression import init_compression
+from web.encoding import encode_arrays, decode_array, array_options
+from web.metrics import init_metrics, metrics_payload
+from web.profiling import init_profiling
+from web.ratelimit import init_rate_limiting
+from web.singleflight import SingleFlight, request_key
+from web.cache import LRUCache, MISSING
+from web.events import job_events
+
+
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# pyplot не потокобезопасен: в одном процессе графики строятся по очереди,
+# параллельность дают процессы-воркеры serve.py
+render_lock = threading.Lock()
 
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'torsion-lab-secret-key-2025'
+app.config['JOB_WORKERS'] = int(os.environ.get('TORSION_JOB_WORKERS', 2))
+app.config['JOB_QUEUE_LIMIT'] = int(os.environ.get('TORSION_JOB_QUEUE_LIMIT', 16))
+app.config['JOB_RETENTION_HOURS'] = float(os.environ.get('TORSION_JOB_RETENTION_HOURS', 24))
+app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('TORSION_COMPRESSION_MIN_SIZE', 1024))
+app.config['COMPRESSION_LEVEL'] = int(os.environ.get('TORSION_COMPRESSION_LEVEL', 6))
+app.config['BATCH_MAX_ITEMS'] = int(os.environ.get('TORSION_BATCH_MAX_ITEMS', 10000))
+app.config['BATCH_MAX_BYTES'] = int(os.environ.get('TORSION_BATCH_MAX_BYTES', 8 * 1024 * 1024))
+app.config['BATCH_CHUNK_SIZE'] = int(os.environ.get('TORSION_BATCH_CHUNK_SIZE', 500))
+app.config['BATCH_MAX_POINTS'] = 1000
+app.config['SLOW_REQUEST_MS'] = float(os.environ.get('TORSION_SLOW_REQUEST_MS', 1000))
+app.config['PROFILING'] = os.environ.get('TORSION_PROFILING', '0') == '1'
+app.config['PROFILING_TOKEN'] = os.environ.get('TORSION_PROFILING_TOKEN') or None
+app.config['PROFILING_RING_SIZE'] = int(os.environ.get('TORSION_PROFILING_RING_SIZE', 50))
+app.config['RENDER_CACHE_SIZE'] = int(os.environ.get('TORSION_RENDER_CACHE_SIZE', 64))
+app.config['RESULT_CACHE_SIZE'] = int(os.environ.get('TORSION_RESULT_CACHE_SIZE', 256))
+app.config['WARM_UP'] = os.environ.get('TORSION_WARM_UP', '1') == '1'
+app.config['ANIMATION_CACHE_DIR'] = os.environ.get('TORSION_ANIMATION_CACHE_DIR',
+                                                   os.path.join(app.root_path, 'animation_cache'))
+app.config['ANIMATION_CACHE_MAX_BYTES'] = int(os.environ.get('TORSION_ANIMATION_CACHE_MAX_BYTES',
+                                                             256 * 1024 * 1024))
+app.config['ANIMATION_WORKERS'] = int(os.environ.get('TORSION_ANIMATION_WORKERS', 1))
+app.config['ANIMATION_MAX_FPS'] = 30
+app.config['EVENTS_POLL_INTERVAL'] = float(os.environ.get('TORSION_EVENTS_POLL_INTERVAL', 0.25))
+app.config['EVENTS_TIMEOUT'] = float(os.environ.get('TORSION_EVENTS_TIMEOUT', 600))
+app.config['RATE_LIMIT'] = os.environ.get('TORSION_RATE_LIMIT', '1') == '1'
+app.config['RATE_LIMIT_CHEAP'] = os.environ.get('TORSION_RATE_LIMIT_CHEAP', '20/40')
+app.config['RATE_LIMIT_EXPENSIVE'] = os.environ.get('TORSION_RATE_LIMIT_EXPENSIVE', '2/5')
+app.config['ADMISSION_CONCURRENCY'] = int(os.environ.get('TORSION_ADMISSION_CONCURRENCY', 2))
+app.config['ADMISSION_QUEUE'] = int(os.environ.get('TORSION_ADMISSION_QUEUE', 8))
+app.config['ADMISSION_TIMEOUT'] = float(os.environ.get('TORSION_ADMISSION_TIMEOUT', 10))
+app.config['TRUST_PROXY'] = os.environ.get('TORSION_TRUST_PROXY', '0') == '1'
+app.config['ANIMATION_MAX_DURATION'] = 20
+
+# Метрики запросов (/metrics); регистрируются первыми, чтобы учитывать и время сжатия
+metrics = init_metrics(app, app.config['SLOW_REQUEST_MS'])
+
+
+@contextmanager
+def rendering(figure: str):
+    """
+    Построение графика под render_lock с замером ожидания очереди и длительности.
+    Возвращает модуль matplotlib.pyplot (импортируется при первой отрисовке).
+    """
+    import matplotlib.pyplot as plt
+
+    with metrics.timer('torsion_render_wait_seconds', figure=figure):
+        render_lock.acquire()
+    try:
+        with metrics.timer('torsion_render_seconds', figure=figure):
+            yield plt
+    finally:
+        render_lock.release()
+
+
+# Объединение одновременных одинаковых запросов (графики, отчеты, расчеты с seed)
+flights = SingleFlight()
+
+# Готовые графики и воспроизводимые (с seed) результаты расчетов; заполняются и прогревом при запуске
+render_cache = LRUCache(app.config['RENDER_CACHE_SIZE'])
+result_cache = LRUCache(app.config['RESULT_CACHE_SIZE'])
+
+
+def coalesce(endpoint: str, compute, *key_parts, cache: LRUCache = None):
+    """
+    Выполнение compute() один раз для одновременных запросов с одинаковыми параметрами.
+    
+    Args:
+        endpoint: Имя обработчика (часть ключа и метка метрики)
+        compute: Функция вычисления результата (результат не должен изменяться после возврата)
+        key_parts: Параметры, от которых зависит результат
+        cache: Кэш готовых результатов (None — результат не сохраняется)
+    
+    Returns:
+        Результат compute() — свой, общий с другим запросом или из кэша
+    """
+    key = request_key(endpoint, *key_parts)
+    if cache is not None:
+        result = cache.get(key)
+        metrics.counter('torsion_cache_requests_total', endpoint=endpoint,
+                        result='miss' if result is MISSING else 'hit').inc()
+        if result is not MISSING:
+            return result
+    
+    def compute_and_store():
+        result = compute()
+        if cache is not None:
+            cache.put(key, result)
+        return result
+    
+    result, shared = flights.do(key, compute_and_store)
+    metrics.counter('torsion_singleflight_requests_total', endpoint=endpoint,
+                    role='shared' if shared else 'leader').inc()
+    return result
+
+
+# Бюджеты запросов на клиента и очередь допуска дорогих маршрутов (429/503 с Retry-After)
+if app.config['RATE_LIMIT']:
+    init_rate_limiting(
+        app, metrics,
+        cheap=app.config['RATE_LIMIT_CHEAP'],
+        expensive=app.config['RATE_LIMIT_EXPENSIVE'],
+        concurrency=app.config['ADMISSION_CONCURRENCY'],
+        max_waiting=app.config['ADMISSION_QUEUE'],
+        timeout=app.config['ADMISSION_TIMEOUT'],
+        trust_proxy=app.config['TRUST_PROXY']
+    )
+
+# Сжатие JSON-ответов gzip/deflate по Accept-Encoding
+init_compression(app, app.config['COMPRESSION_MIN_SIZE'], app.config['COMPRESSION_LEVEL'])
+
+# Статические файлы с версией по содержимому в адресе (asset_url в шаблонах), кэшируются навсегда
+init_assets(app)
+
+# Профилирование запросов по требованию (X-Profile: cprofile|sample), результаты — /debug/profiles;
+# только с токеном администратора: профили содержат пути и строки запросов
+if app.config['PROFILING'] and app.config['PROFILING_TOKEN']:
+    init_profiling(app, app.config['PROFILING_TOKEN'], app.config['PROFILING_RING_SIZE'])
+elif app.config['PROFILING']:
+    print('  TORSION_PROFILING=1 без TORSION_PROFILING_TOKEN: профилирование не включено', file=sys.stderr)
+
+# Готовые анимации на диске: общий кэш всех процессов-воркеров
+animation_cache = AnimationCache(app.config['ANIMATION_CACHE_DIR'], app.config['ANIMATION_CACHE_MAX_BYTES'])
+
+# БД и очередь фоновых задач создаются при первом обращении
+_db = None
+_job_queue = None
+_state_lock = threading.RLock()
+
+
+def get_db():
+    """Менеджер БД процесса (SQLAlchemy импортируется и БД открывается при первом вызове)."""
+    global _db
+    if _db is None:
+        with _state_lock:
+            if _db is None:
+                from core.database import DatabaseManager
+                _db = DatabaseManager()
+    return _db
+
+
+def get_job_queue() -> JobQueue:
+    """Очередь фоновых задач (генерация отчетов), создается при первом вызове."""
+    global _job_queue
+    if _job_queue is None:
+        with _state_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue(
+                    get_db().db_path,
+                    max_workers=app.config['JOB_WORKERS'],
+                    max_pending=app.config['JOB_QUEUE_LIMIT'],
+                    retention_hours=app.config['JOB_RETENTION_HOURS'],
+                    # serve.py восстанавливает задачи один раз в мастер-процессе, а не в каждом воркере
+                    recover_stale=os.environ.get('TORSION_JOBS_RECOVER', '1') != '0'
+                )
+    return _job_queue
+
+
+def shutdown_job_queue(wait: bool = True):
+    """Остановка пула процессов очереди, если он был создан."""
+    if _job_queue is not None:
+        _job_queue.shutdown(wait=wait)
+
+
+def warm_up_caches():
+    """
+    Прогрев при запуске: графики τ(ρ) по умолчанию для каждого материала попадают в кэш
+    графиков, расчет и диаграмма T-φ прогоняются один раз (импорт pyplot, шрифты, numpy).
+    Расчет без seed случаен и не кэшируется — прогревается только код.
+    Одновременный запрос с теми же параметрами дожидается отрисовки прогрева.
+    """
+    from core.warmup import default_experiments, DEFAULT_STRESS_MOMENT
+    
+    started = time.perf_counter()
+    experiments = default_experiments()
+    for params in experiments:
+        material = params['material']
+        diameter = params['diameter'] / 1000
+        length = params['length'] / 1000
+        coalesce('plot_stress',
+                 lambda: stress_plot_payload(material, diameter, length, DEFAULT_STRESS_MOMENT),
+                 material, diameter, length, DEFAULT_STRESS_MOMENT, cache=render_cache)
+    
+    params = experiments[0]
+    payload = calculation_payload(params['material'], params['diameter'] / 1000, params['length'] / 1000,
+                                  params['max_moment'], params['num_points'])
+    torsion_plot_payload(payload['results']['moments'], payload['results']['angles'])
+    
+    metrics.gauge('torsion_warm_up_seconds').set(time.perf_counter() - started)
+
+
+def start_warm_up():
+    """Прогрев кэшей в фоновом потоке (если не отключен TORSION_WARM_UP=0); возвращает поток или None."""
+    if not app.config['WARM_UP']:
+        return None
+    
+    def run():
+        try:
+            warm_up_caches()
+        except Exception as e:
+            app.logger.warning('Прогрев кэшей не выполнен: %s', e)
+    
+    thread = threading.Thread(target=run, name='torsion-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def calculation_payload(material: str, diameter: float, length: float, max_moment: float,
+                        num_points: int, seed=None, precision=None, encoding: str = 'json') -> dict:
+    """
+    Расчет эксперимента с данными графиков для браузера (ответ /api/calculate).
+    
+    Args:
+        material: Материал образца
+        diameter: Диаметр, м
+        length: Длина, м
+        max_moment: Максимальный крутящий момент, Н·м
+        num_points: Количество точек диаграммы
+        seed: Seed шума измерений (None — случайный шум)
+        precision: Количество значащих цифр массивов (None — без округления)
+        encoding: Кодирование массивов moments/angles
+    
+    Returns:
+        Тело ответа
+    """
+    # Создание калькулятора
+    calculator = TorsionCalculator(diameter, length, material)
+    
+    # Генерация данных с реалистичной погрешностью (seed — воспроизводимый шум)
+    diagram_data = calculator.generate_diagram_data(
+        max_moment, 
+        num_points,
+        add_experimental_noise=True,  # Добавляем экспериментальную погрешность!
+        error_percent=2.0,  # 2% погрешность
+        rng=np.random.default_rng(seed) if seed is not None else None
+    )
+    
+    # Обработка ЭКСПЕРИМЕНТАЛЬНЫХ данных (с погрешностью)
+    results = calculator.process_experiment_data(
+        diagram_data['T'],
+        diagram_data['phi']
+    )
+    
+    # Добавление дополнительной информации
+    results['failure_type'] = determine_failure_type(material)
+    results['Jp'] = float(calculator.calc_polar_moment_inertia())
+    results['Wp'] = float(calculator.calc_polar_section_modulus())
+    
+    # Данные для отрисовки графиков в браузере (без растеризации на сервере)
+    charts = {
+        'torsion': build_torsion_chart(
+            results['moments'], results['angles'],
+            length_m=length, Jp=results['Jp'],
+            G_ref=results['G_reference'], G_exp=results['G_experimental']
+        ),
+        'stress': build_stress_chart(calculator, results['T_max'])
+    }
+    
+    return {
+        'success': True,
+        'results': encode_arrays(results, precision, encoding),
+        'charts': charts
+    }
 
-# Инициализация БД
-db = DatabaseManager()
+
+def torsion_plot_payload(moments, angles) -> dict:
+    """Растровый график диаграммы T-φ (ответ /api/plot/torsion)."""
+    # Построение графика
+    with rendering('torsion') as plt:
+        fig, ax = plt.subplots(figsize=(10, 6))
+    
+        angles_deg = np.array(angles) * 180 / np.pi
+        ax.plot(angles_deg, moments, 'b-', linewidth=2.5, label='Экспериментальная кривая')
+        ax.scatter(angles_deg, moments, c='red', s=40, alpha=0.6, zorder=5)
+    
+        ax.set_xlabel('Угол закручивания φ, град', fontsize=13, fontweight='bold')
+        ax.set_ylabel('Крутящий момент T, Н·м', fontsize=13, fontweight='bold')
+        ax.set_title('Диаграмма кручения T-φ', fontsize=16, fontweight='bold')
+        ax.grid(True, alpha=0.3, linestyle='--')
+    
+        # Выделение упругой области
+        linear_idx = int(len(moments) * 0.7)
+        if linear_idx > 1:
+            ax.axvspan(0, angles_deg[linear_idx], alpha=0.15, color='green', label='Упругая область')
+            ax.axvline(x=angles_deg[linear_idx], color='orange', linestyle='--', linewidth=2, label='Предел упругости')
+    
+        ax.legend(fontsize=11)
+        plt.tight_layout()
+    
+        # Конвертация в base64
+        buffer = BytesIO()
+        plt.savefig(buffer, format='png', dpi=120, bbox_inches='tight')
+        buffer.seek(0)
+        image_base64 = base64.b64encode(buffer.getvalue()).decode()
+        plt.close()
+    
+    return {
+        'success': True,
+        'image': f'data:image/png;base64,{image_base64}'
+    }
+
+
+def stress_plot_payload(material: str, diameter: float, length: float, moment: float) -> dict:
+    """Растровый график распределения τ(ρ) (ответ /api/plot/stress); diameter и length — в м."""
+    calculator = TorsionCalculator(diameter, length, material)
+    
+    # Построение графика
+    with rendering('stress') as plt:
+        fig, ax = plt.subplots(figsize=(10, 6))
+    
+        rho, tau = calculator.calc_shear_stress_distribution(moment, 50)
+        rho_mm = rho * 1000
+        tau_mpa = tau / 1e6
+    
+        ax.plot(tau_mpa, rho_mm, 'r-', linewidth=3, label='τ(ρ)')
+        ax.fill_betweenx(rho_mm, 0, tau_mpa, alpha=0.3, color='red')
+    
+        max_tau = np.max(tau_mpa)
+        max_rho = diameter * 1000 / 2
+        ax.plot([max_tau], [max_rho], 'ro', markersize=12, label=f'τmax = {max_tau:.2f} МПа')
+    
+        ax.set_xlabel('Касательное напряжение τ, МПа', fontsize=13, fontweight='bold')
+        ax.set_ylabel('Радиус ρ, мм', fontsize=13, fontweight='bold')
+        ax.set_title(f'Распределение τ по сечению при T = {moment:.2f} Н·м', fontsize=16, fontweight='bold')
+        ax.grid(True, alpha=0.3, linestyle='--')
+        ax.axhline(y=max_rho, color='k', linestyle='--', linewidth=1.5, label=f'R = {max_rho:.2f} мм')
+        ax.legend(fontsize=11)
+    
+        ax.text(max_tau * 0.5, max_rho * 0.5, 'Линейное\nраспределение',
+               fontsize=12, ha='center',
+               bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.6))
+    
+        plt.tight_layout()
+    
+        # Конвертация в base64
+        buffer = BytesIO()
+        plt.savefig(buffer, format='png', dpi=120, bbox_inches='tight')
+        buffer.seek(0)
+        image_base64 = base64.b64encode(buffer.getvalue()).decode()
+        plt.close()
+    
+    return {
+        'success': True,
+        'image': f'data:image/png;base64,{image_base64}'
+    }
 
 
 @app.route('/')
@@ -39,8 +404,13 @@ def calculate():
     """
     API endpoint для выполнения расчета.
     Принимает JSON с параметрами эксперимента.
+    Query string: precision=<цифр> и encoding=json|f32 — компактное кодирование moments/angles.
+    С полем seed расчет воспроизводим, и одновременные одинаковые запросы считаются один раз.
+    Без seed шум случайный, а использованный seed возвращается в поле ответа seed: по нему
+    живое превью анимации (GET /api/animation/stream) строит ту же кривую.
     """
     try:
+        precision, encoding = array_options(request.args)
         data = request.json
         
         # Извлечение параметров
@@ -49,83 +419,238 @@ def calculate():
         length = float(data.get('length', 200.0)) / 1000  # мм -> м
         max_moment = float(data.get('max_moment', 100.0))
         num_points = int(data.get('num_points', 50))
+        seed = data.get('seed')
+        seed = int(seed) if seed is not None else None
         
-        # Создание калькулятора
-        calculator = TorsionCalculator(diameter, length, material)
+        # Без seed шум у каждого запроса свой — объединять и кэшировать нечего
+        if seed is None:
+            seed = secrets.randbelow(2**31)
+            return jsonify(dict(calculation_payload(material, diameter, length, max_moment, num_points,
+                                                    seed, precision, encoding), seed=seed))
+        
+        def compute():
+            return calculation_payload(material, diameter, length, max_moment, num_points,
+                                       seed, precision, encoding)
+        
+        return jsonify(coalesce('calculate', compute, material, diameter, length,
+                                max_moment, num_points, seed, precision, encoding,
+                                cache=result_cache))
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+@app.route('/api/calculate/async', methods=['POST'])
+def calculate_async():
+    """
+    Расчет с построением графиков фоновой задачей (этапы generate → fit → render → encode).
+    Принимает те же параметры, что /api/calculate, и plots=false — без растровых графиков.
+    Ход выполнения и модуль сдвига G (сразу после этапа fit) — поток GET /api/events/<id>,
+    результат (results, charts, images) — GET /api/jobs/<id>/download.
+    """
+    try:
+        data = request.json or {}
         
-        # Генерация данных с реалистичной погрешностью
-        diagram_data = calculator.generate_diagram_data(
-            max_moment, 
-            num_points,
-            add_experimental_noise=True,  # Добавляем экспериментальную погрешность!
-            error_percent=2.0  # 2% погрешность
-        )
-        
-        # Обработка ЭКСПЕРИМЕНТАЛЬНЫХ данных (с погрешностью)
-        results = calculator.process_experiment_data(
-            diagram_data['T'],
-            diagram_data['phi']
-        )
-        
-        # Добавление дополнительной информации
-        results['failure_type'] = determine_failure_type(material)
-        results['Jp'] = float(calculator.calc_polar_moment_inertia())
-        results['Wp'] = float(calculator.calc_polar_section_modulus())
+        seed = data.get('seed')
+        params = {
+            'material': data.get('material', 'Сталь'),
+            'diameter': float(data.get('diameter', 10.0)),
+            'length': float(data.get('length', 200.0)),
+            'max_moment': float(data.get('max_moment', 100.0)),
+            'num_points': min(int(data.get('num_points', 50)), app.config['BATCH_MAX_POINTS']),
+            'seed': int(seed) if seed is not None else None,
+            'plots': str(data.get('plots', True)).lower() not in ('0', 'false', 'no')
+        }
+        
+        # Без seed у каждого расчета свой шум — объединяются только воспроизводимые
+        key = request_key('calculation', params) if seed is not None else None
+        with metrics.timer('torsion_db_seconds', op='create_job'):
+            job_id, shared = get_job_queue().submit_once('calculation', params, key=key)
+        if key is not None:
+            metrics.counter('torsion_singleflight_requests_total', endpoint='calculate_async',
+                            role='shared' if shared else 'leader').inc()
         
         return jsonify({
             'success': True,
-            'results': results
+            'job_id': job_id,
+            'status_url': url_for('get_job', job_id=job_id),
+            'events_url': url_for('job_event_stream', job_id=job_id),
+            'download_url': url_for('download_job_result', job_id=job_id)
+        }), 202
+        
+    except JobQueueFull as e:
+        response = jsonify({
+            'success': False,
+            'error': str(e)
         })
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+@app.route('/api/calculate/batch', methods=['POST'])
+def calculate_batch():
+    """
+    Пакетный расчет серии экспериментов.
+    Принимает JSON-массив наборов параметров (или {"items": [...], "seed": ..., "include_series": ...})
+    либо NDJSON (Content-Type: application/x-ndjson, опции — в query string).
+    Результаты считаются векторизованно порциями и отдаются потоком NDJSON:
+    строка на каждый набор и строка со временем расчета после каждой порции.
+    """
+    max_items = app.config['BATCH_MAX_ITEMS']
+    max_bytes = app.config['BATCH_MAX_BYTES']
+    
+    # Content-Length может отсутствовать (chunked), поэтому тело читается не больше лимита
+    if request.content_length and request.content_length > max_bytes:
+        body = None
+    else:
+        body = request.stream.read(max_bytes + 1)
+    if body is None or len(body) > max_bytes:
+        return jsonify({
+            'success': False,
+            'error': f'Размер запроса превышает {max_bytes} байт'
+        }), 413
+    
+    try:
+        options = dict(request.args)
+        if request.mimetype in ('application/x-ndjson', 'application/jsonlines'):
+            items = [json.loads(line) for line in body.decode('utf-8').splitlines() if line.strip()]
+        else:
+            if not request.is_json:
+                raise ValueError('Ожидается JSON (application/json) или NDJSON (application/x-ndjson)')
+            payload = json.loads(body)
+            if isinstance(payload, dict):
+                options.update({k: v for k, v in payload.items() if k != 'items'})
+                items = payload.get('items', [])
+            else:
+                items = payload
+        if not isinstance(items, list):
+            raise ValueError('Ожидается массив наборов параметров')
         
+        seed = options.get('seed')
+        seed = int(seed) if seed is not None else None
+        if seed is not None and seed < 0:
+            raise ValueError('seed должен быть неотрицательным целым числом')
+        include_series = str(options.get('include_series', 'false')).lower() in ('1', 'true', 'yes')
+        chunk_size = max(1, min(int(options.get('chunk_size', app.config['BATCH_CHUNK_SIZE'])),
+                                app.config['BATCH_CHUNK_SIZE']))
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 400
+    
+    if len(items) > max_items:
+        return jsonify({
+            'success': False,
+            'error': f'Слишком много наборов параметров: {len(items)} > {max_items}'
+        }), 413
+    
+    rng = np.random.default_rng(seed)
+    max_points = app.config['BATCH_MAX_POINTS']
+    
+    def generate():
+        started = time.perf_counter()
+        for batch_num, start in enumerate(range(0, len(items), chunk_size)):
+            batch_started = time.perf_counter()
+            chunk = items[start:start + chunk_size]
+            
+            # Проверка параметров: ошибочные наборы не прерывают пакет
+            lines = {}
+            valid_indices = []
+            valid_params = []
+            for offset, item in enumerate(chunk):
+                index = start + offset
+                try:
+                    valid_params.append(normalize_params(item, max_points))
+                    valid_indices.append(index)
+                except (TypeError, ValueError) as e:
+                    lines[index] = {'index': index, 'success': False, 'error': str(e)}
+            
+            for index, results in zip(valid_indices,
+                                      evaluate_batch(valid_params, rng, include_series)):
+                lines[index] = {'index': index, 'success': True, 'results': results}
+            
+            for index in sorted(lines):
+                yield json.dumps(lines[index], ensure_ascii=False) + '\n'
+            
+            yield json.dumps({
+                'batch': batch_num,
+                'items': len(chunk),
+                'elapsed_ms': round((time.perf_counter() - batch_started) * 1000, 3)
+            }) + '\n'
+        
+        yield json.dumps({
+            'done': True,
+            'items': len(items),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+        }) + '\n'
+    
+    return Response(generate(), mimetype='application/x-ndjson')
 
 
-@app.route('/api/plot/torsion', methods=['POST'])
-def plot_torsion():
+@app.route('/api/chart/torsion', methods=['POST'])
+def chart_torsion():
     """
-    Генерация графика диаграммы T-φ.
-    Возвращает изображение в формате base64.
+    Данные диаграммы T-φ для отрисовки в браузере.
+    Принимает moments/angles и, опционально, параметры образца для теоретической прямой.
     """
     try:
         data = request.json
         moments = data.get('moments', [])
         angles = data.get('angles', [])
+        max_points = int(data.get('max_points', 200))
         
-        # Построение графика
-        fig, ax = plt.subplots(figsize=(10, 6))
+        length_m = Jp = G_ref = None
+        if 'diameter' in data and 'length' in data:
+            calculator = TorsionCalculator(
+                float(data['diameter']) / 1000,
+                float(data['length']) / 1000,
+                data.get('material', 'Сталь')
+            )
+            length_m = calculator.L
+            Jp = calculator.calc_polar_moment_inertia()
+            G_ref = calculator.G_reference.get(calculator.material)
+            G_ref = G_ref / 1e6 if G_ref else None
         
-        angles_deg = np.array(angles) * 180 / np.pi
-        ax.plot(angles_deg, moments, 'b-', linewidth=2.5, label='Экспериментальная кривая')
-        ax.scatter(angles_deg, moments, c='red', s=40, alpha=0.6, zorder=5)
-        
-        ax.set_xlabel('Угол закручивания φ, град', fontsize=13, fontweight='bold')
-        ax.set_ylabel('Крутящий момент T, Н·м', fontsize=13, fontweight='bold')
-        ax.set_title('Диаграмма кручения T-φ', fontsize=16, fontweight='bold')
-        ax.grid(True, alpha=0.3, linestyle='--')
+        return jsonify({
+            'success': True,
+            'chart': build_torsion_chart(
+                moments, angles, length_m=length_m, Jp=Jp, G_ref=G_ref,
+                G_exp=data.get('G_experimental'), max_points=max_points
+            )
+        })
         
-        # Выделение упругой области
-        linear_idx = int(len(moments) * 0.7)
-        if linear_idx > 1:
-            ax.axvspan(0, angles_deg[linear_idx], alpha=0.15, color='green', label='Упругая область')
-            ax.axvline(x=angles_deg[linear_idx], color='orange', linestyle='--', linewidth=2, label='Предел упругости')
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+@app.route('/api/chart/stress', methods=['POST'])
+def chart_stress():
+    """Данные распределения τ(ρ) для отрисовки в браузере."""
+    try:
+        data = request.json
         
-        ax.legend(fontsize=11)
-        plt.tight_layout()
+        material = data.get('material', 'Сталь')
+        diameter = float(data.get('diameter', 10.0)) / 1000
+        length = float(data.get('length', 200.0)) / 1000
+        moment = float(data.get('moment', 50.0))
         
-        # Конвертация в base64
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=120, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
+        calculator = TorsionCalculator(diameter, length, material)
         
         return jsonify({
             'success': True,
-            'image': f'data:image/png;base64,{image_base64}'
+            'chart': build_stress_chart(calculator, moment)
         })
         
     except Exception as e:
@@ -135,6 +660,28 @@ def plot_torsion():
         }), 400
 
 
+@app.route('/api/plot/torsion', methods=['POST'])
+def plot_torsion():
+    """
+    Генерация графика диаграммы T-φ.
+    Возвращает изображение в формате base64.
+    """
+    try:
+        data = request.json
+        moments = data.get('moments', [])
+        angles = data.get('angles', [])
+        
+        # Одновременные одинаковые запросы ждут одну отрисовку, повторные берутся из кэша
+        return jsonify(coalesce('plot_torsion', lambda: torsion_plot_payload(moments, angles),
+                                moments, angles, cache=render_cache))
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
 @app.route('/api/plot/stress', methods=['POST'])
 def plot_stress():
     """
@@ -148,46 +695,10 @@ def plot_stress():
         length = float(data.get('length', 200.0)) / 1000
         moment = float(data.get('moment', 50.0))
         
-        calculator = TorsionCalculator(diameter, length, material)
-        
-        # Построение графика
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        rho, tau = calculator.calc_shear_stress_distribution(moment, 50)
-        rho_mm = rho * 1000
-        tau_mpa = tau / 1e6
-        
-        ax.plot(tau_mpa, rho_mm, 'r-', linewidth=3, label='τ(ρ)')
-        ax.fill_betweenx(rho_mm, 0, tau_mpa, alpha=0.3, color='red')
-        
-        max_tau = np.max(tau_mpa)
-        max_rho = diameter * 1000 / 2
-        ax.plot([max_tau], [max_rho], 'ro', markersize=12, label=f'τmax = {max_tau:.2f} МПа')
-        
-        ax.set_xlabel('Касательное напряжение τ, МПа', fontsize=13, fontweight='bold')
-        ax.set_ylabel('Радиус ρ, мм', fontsize=13, fontweight='bold')
-        ax.set_title(f'Распределение τ по сечению при T = {moment:.2f} Н·м', fontsize=16, fontweight='bold')
-        ax.grid(True, alpha=0.3, linestyle='--')
-        ax.axhline(y=max_rho, color='k', linestyle='--', linewidth=1.5, label=f'R = {max_rho:.2f} мм')
-        ax.legend(fontsize=11)
-        
-        ax.text(max_tau * 0.5, max_rho * 0.5, 'Линейное\nраспределение',
-               fontsize=12, ha='center',
-               bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.6))
-        
-        plt.tight_layout()
-        
-        # Конвертация в base64
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=120, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
-        
-        return jsonify({
-            'success': True,
-            'image': f'data:image/png;base64,{image_base64}'
-        })
+        # Одновременные одинаковые запросы ждут одну отрисовку, повторные берутся из кэша
+        return jsonify(coalesce('plot_stress',
+                                lambda: stress_plot_payload(material, diameter, length, moment),
+                                material, diameter, length, moment, cache=render_cache))
         
     except Exception as e:
         return jsonify({
@@ -200,7 +711,8 @@ def plot_stress():
 def get_experiments():
     """Получение списка всех экспериментов."""
     try:
-        experiments = db.get_all_experiments()
+        with metrics.timer('torsion_db_seconds', op='get_all_experiments'):
+            experiments = get_db().get_all_experiments()
         return jsonify({
             'success': True,
             'experiments': experiments
@@ -214,10 +726,16 @@ def get_experiments():
 
 @app.route('/api/experiments/<int:exp_id>', methods=['GET'])
 def get_experiment(exp_id):
-    """Получение конкретного эксперимента."""
+    """
+    Получение конкретного эксперимента.
+    Query string: precision=<цифр> и encoding=json|f32 — компактное кодирование moments/angles.
+    """
     try:
-        experiment = db.get_experiment(exp_id)
+        precision, encoding = array_options(request.args)
+        with metrics.timer('torsion_db_seconds', op='get_experiment'):
+            experiment = get_db().get_experiment(exp_id)
         if experiment:
+            experiment['results'] = encode_arrays(experiment['results'], precision, encoding)
             return jsonify({
                 'success': True,
                 'experiment': experiment
@@ -245,12 +763,16 @@ def save_experiment():
         diameter = float(data.get('diameter', 10.0)) / 1000
         length = float(data.get('length', 200.0)) / 1000
         input_params = data.get('input_params', {})
-        results = data.get('results', {})
+        results = dict(data.get('results', {}))
+        for field in ('moments', 'angles'):
+            if field in results:
+                results[field] = decode_array(results[field])
         
-        exp_id = db.save_experiment(
-            user_name, material, diameter, length,
-            input_params, results
-        )
+        with metrics.timer('torsion_db_seconds', op='save_experiment'):
+            exp_id = get_db().save_experiment(
+                user_name, material, diameter, length,
+                input_params, results
+            )
         
         return jsonify({
             'success': True,
@@ -281,7 +803,8 @@ def check_test():
                 score += 1
         
         # Сохранение результата
-        db.save_test_result(user_name, score, answers)
+        with metrics.timer('torsion_db_seconds', op='save_test_result'):
+            get_db().save_test_result(user_name, score, answers)
         
         percentage = (score / 8) * 100
         
@@ -311,7 +834,143 @@ def check_test():
 
 @app.route('/api/report/generate', methods=['POST'])
 def generate_report():
-    """Генерация отчета в формате .docx."""
+    """
+    Постановка генерации отчета .docx в фоновую очередь.
+    Возвращает ID задачи; статус — GET /api/jobs/<id>, файл — GET /api/jobs/<id>/download.
+    """
+    try:
+        data = request.json
+        
+        params = {
+            'user_name': data.get('user_name', 'Пользователь'),
+            'group': data.get('group', 'ИН-31'),
+            'material': data.get('material', 'Сталь'),
+            'diameter': float(data.get('diameter', 10.0)),
+            'length': float(data.get('length', 200.0)),
+            'results': data.get('results', {})
+        }
+        
+        # Пока такая же задача в очереди или выполняется, возвращается ее ID
+        with metrics.timer('torsion_db_seconds', op='create_job'):
+            job_id, shared = get_job_queue().submit_once('report', params,
+                                                         key=request_key('report', params))
+        metrics.counter('torsion_singleflight_requests_total', endpoint='report_generate',
+                        role='shared' if shared else 'leader').inc()
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': url_for('get_job', job_id=job_id),
+            'events_url': url_for('job_event_stream', job_id=job_id),
+            'download_url': url_for('download_job_result', job_id=job_id)
+        }), 202
+        
+    except JobQueueFull as e:
+        response = jsonify({
+            'success': False,
+            'error': str(e)
+        })
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Статус и прогресс фоновой задачи."""
+    with metrics.timer('torsion_db_seconds', op='get_job'):
+        job = get_job_queue().get(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'Задача не найдена'
+        }), 404
+    
+    job.pop('params', None)
+    job['filename'] = job.pop('result_name') or os.path.basename(job.pop('result_path') or '') or None
+    job.pop('result_path', None)
+    return jsonify({
+        'success': True,
+        'job': job
+    })
+
+
+@app.route('/api/events/<job_id>', methods=['GET'])
+def job_event_stream(job_id):
+    """
+    Поток Server-Sent Events с ходом фоновой задачи: события progress (процент, этап,
+    частичные результаты partial), в конце — done (со ссылкой на результат) или failed.
+    Каждый открытый поток занимает поток обработки запросов до завершения задачи
+    (не дольше TORSION_EVENTS_TIMEOUT).
+    """
+    queue = get_job_queue()
+    if queue.get(job_id) is None:
+        return jsonify({
+            'success': False,
+            'error': 'Задача не найдена'
+        }), 404
+    
+    def fetch():
+        job = queue.get(job_id)
+        if job is not None:
+            job.pop('params', None)
+        return job
+    
+    stream = job_events(fetch, poll_interval=app.config['EVENTS_POLL_INTERVAL'],
+                        timeout=app.config['EVENTS_TIMEOUT'],
+                        final_fields={'download_url': url_for('download_job_result', job_id=job_id)})
+    response = Response(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # без буферизации в nginx
+    return response
+
+
+@app.route('/api/jobs/<job_id>/download', methods=['GET'])
+def download_job_result(job_id):
+    """Скачивание результата завершенной задачи."""
+    with metrics.timer('torsion_db_seconds', op='get_job'):
+        job = get_job_queue().get(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'Задача не найдена'
+        }), 404
+    if job['status'] != 'done':
+        return jsonify({
+            'success': False,
+            'error': 'Результат еще не готов',
+            'status': job['status']
+        }), 409
+    
+    # Результат в памяти (отчеты) или файл на диске
+    with metrics.timer('torsion_db_seconds', op='get_job_result'):
+        stored = get_job_queue().db.get_job_result(job_id)
+    if stored:
+        name, payload = stored
+        return send_file(BytesIO(payload), as_attachment=True, download_name=name,
+                         mimetype=DOCX_MIMETYPE if name.endswith('.docx') else None)
+    if job['result_path'] and os.path.exists(job['result_path']):
+        return send_file(job['result_path'], as_attachment=True,
+                         download_name=os.path.basename(job['result_path']))
+    
+    return jsonify({
+        'success': False,
+        'error': 'Результат задачи не найден'
+    }), 404
+
+
+@app.route('/api/report/download', methods=['POST'])
+def download_report():
+    """
+    Синхронная генерация отчета .docx с отдачей файла прямо в ответе.
+    Графики и документ собираются в памяти, без временных файлов.
+    """
+    from core.report_generator import ReportGenerator, render_report_figures
+    
     try:
         data = request.json
         
@@ -322,61 +981,178 @@ def generate_report():
         length = float(data.get('length', 200.0)) / 1000
         results = data.get('results', {})
         
-        calculator = TorsionCalculator(diameter, length, material)
+        def build():
+            calculator = TorsionCalculator(diameter, length, material)
+            with rendering('report'):
+                diagram_image, stress_image = render_report_figures(calculator, results)
+            
+            stream = BytesIO()
+            with metrics.timer('torsion_docx_seconds'):
+                filename = ReportGenerator().generate_experiment_report(
+                    user_name, group, calculator, results,
+                    diagram_image, stress_image, stream=stream
+                )
+            return filename, stream.getvalue()
         
-        # Генерация временных графиков
-        diagram_path = 'temp_web_diagram.png'
-        stress_path = 'temp_web_stress.png'
-        
-        # График T-φ
-        if 'moments' in results and 'angles' in results:
-            fig, ax = plt.subplots(figsize=(8, 6))
-            angles_deg = np.array(results['angles']) * 180 / np.pi
-            ax.plot(angles_deg, results['moments'], 'b-', linewidth=2)
-            ax.scatter(angles_deg, results['moments'], c='red', s=30, alpha=0.6)
-            ax.set_xlabel('Угол закручивания φ, град', fontsize=12)
-            ax.set_ylabel('Крутящий момент T, Н·м', fontsize=12)
-            ax.set_title('Диаграмма кручения T-φ', fontsize=14, fontweight='bold')
-            ax.grid(True, alpha=0.3)
-            plt.tight_layout()
-            plt.savefig(diagram_path, dpi=150)
-            plt.close()
-        
-        # График распределения напряжений
-        if 'T_max' in results:
-            fig, ax = plt.subplots(figsize=(8, 6))
-            rho, tau = calculator.calc_shear_stress_distribution(results['T_max'], 50)
-            ax.plot(tau/1e6, rho*1000, 'r-', linewidth=2)
-            ax.fill_betweenx(rho*1000, 0, tau/1e6, alpha=0.3, color='red')
-            ax.set_xlabel('Касательное напряжение τ, МПа', fontsize=12)
-            ax.set_ylabel('Радиус ρ, мм', fontsize=12)
-            ax.set_title('Распределение τ по сечению', fontsize=14, fontweight='bold')
-            ax.grid(True, alpha=0.3)
-            plt.tight_layout()
-            plt.savefig(stress_path, dpi=150)
-            plt.close()
-        
-        # Генерация отчета
-        report_gen = ReportGenerator()
-        filename = report_gen.generate_experiment_report(
-            user_name, group, calculator, results,
-            diagram_path if os.path.exists(diagram_path) else None,
-            stress_path if os.path.exists(stress_path) else None
-        )
-        
-        # Очистка временных файлов
-        for path in [diagram_path, stress_path]:
-            try:
-                if os.path.exists(path):
-                    os.remove(path)
-            except:
-                pass
+        # Одновременные одинаковые запросы получают один и тот же документ
+        filename, payload = coalesce('report_download', build, user_name, group, material,
+                                     diameter, length, results)
+        stream = BytesIO(payload)
+        return send_file(stream, as_attachment=True, download_name=filename,
+                         mimetype=DOCX_MIMETYPE)
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+
+def animation_timing(data, fps: int, duration: int) -> tuple:
+    """
+    Частота и длительность анимации из запроса (с проверкой пределов).
+    
+    Returns:
+        Кортеж (fps, duration)
+    """
+    fps = int(data.get('fps', fps))
+    duration = int(data.get('duration', duration))
+    if not 1 <= fps <= app.config['ANIMATION_MAX_FPS']:
+        raise ValueError(f"fps должен быть от 1 до {app.config['ANIMATION_MAX_FPS']}")
+    if not 1 <= duration <= app.config['ANIMATION_MAX_DURATION']:
+        raise ValueError(f"duration должна быть от 1 до {app.config['ANIMATION_MAX_DURATION']} с")
+    return fps, duration
+
+
+def animation_source(data):
+    """
+    Образец и кривая для анимации: по experiment_id сохраненного эксперимента или по параметрам
+    (material, diameter, length и moments/angles либо max_moment, num_points, seed).
+    
+    Returns:
+        Кортеж (material, diameter, length, moments, angles) — размеры в мм, массивы —
+        списки float; None, если эксперимент не найден
+    """
+    if 'experiment_id' in data:
+        with metrics.timer('torsion_db_seconds', op='get_experiment'):
+            experiment = get_db().get_experiment(int(data['experiment_id']))
+        if not experiment:
+            return None
+        material = experiment['material']
+        diameter = experiment['diameter'] * 1000  # м -> мм
+        length = experiment['length'] * 1000
+        moments = experiment['results'].get('moments', [])
+        angles = experiment['results'].get('angles', [])
+    else:
+        material = data.get('material', 'Сталь')
+        diameter = float(data.get('diameter', 10.0))
+        length = float(data.get('length', 200.0))
+        if 'moments' in data or 'angles' in data:
+            moments = decode_array(data.get('moments', []))
+            angles = decode_array(data.get('angles', []))
+        else:
+            # Кривая по параметрам; seed по умолчанию фиксирован, чтобы анимация кэшировалась
+            calculator = TorsionCalculator(diameter / 1000, length / 1000, material)
+            diagram_data = calculator.generate_diagram_data(
+                float(data.get('max_moment', 100.0)),
+                min(int(data.get('num_points', 50)), app.config['BATCH_MAX_POINTS']),
+                add_experimental_noise=True,
+                error_percent=2.0,
+                rng=np.random.default_rng(int(data.get('seed', 0)))
+            )
+            moments = diagram_data['T']
+            angles = diagram_data['phi']
+    
+    moments = [float(v) for v in moments]
+    angles = [float(v) for v in angles]
+    if len(moments) < 2 or len(moments) != len(angles):
+        raise ValueError('Нужны массивы moments и angles одинаковой длины (не менее 2 точек)')
+    return material, diameter, length, moments, angles
+
+
+@app.route('/api/animation', methods=['POST'])
+def create_animation():
+    """
+    Асинхронное построение анимации кручения.
+    Принимает experiment_id сохраненного эксперимента или параметры образца
+    (material, diameter, length и moments/angles либо max_moment, num_points, seed),
+    а также format=gif|webp|apng|mp4|mjpeg (mp4 — если на сервере есть ffmpeg), lossless
+    (для webp и apng), fps и duration.
+    Готовая анимация из кэша возвращается сразу (200), иначе ставится задача (202):
+    статус — GET /api/jobs/<id>, файл после завершения — по animation_url.
+    """
+    try:
+        data = request.json or {}
+        
+        fmt = data.get('format', 'gif')
+        if fmt not in ANIMATION_FORMATS:
+            raise ValueError(f'Формат анимации: {", ".join(ANIMATION_FORMATS)}')
+        if fmt == 'mp4':
+            from core.animator import ffmpeg_path
+            if ffmpeg_path() is None:
+                raise ValueError('Формат mp4 недоступен: на сервере не установлен ffmpeg')
+        lossless = bool(data.get('lossless', False)) and fmt in ('webp', 'apng')
+        fps, duration = animation_timing(data, 10, 5)
+        
+        source = animation_source(data)
+        if source is None:
+            return jsonify({
+                'success': False,
+                'error': 'Эксперимент не найден'
+            }), 404
+        material, diameter, length, moments, angles = source
+        
+        # Ключ — как у TorsionAnimator.cache_key при сохранении с параметрами по умолчанию
+        key = animation_key(material, diameter / 1000, length / 1000, moments, angles, fps, duration,
+                            lossless=lossless, quality=80)
+        animation_url = url_for('get_animation', filename=f'{key}.{fmt}')
+        
+        if animation_cache.get(key, fmt):
+            return jsonify({
+                'success': True,
+                'status': 'done',
+                'animation_url': animation_url
+            })
+        
+        params = {
+            'key': key,
+            'format': fmt,
+            'material': material,
+            'diameter': diameter,
+            'length': length,
+            'moments': moments,
+            'angles': angles,
+            'fps': fps,
+            'duration': duration,
+            'lossless': lossless,
+            'cache_dir': animation_cache.cache_dir,
+            'cache_max_bytes': animation_cache.max_bytes,
+            'workers': app.config['ANIMATION_WORKERS']
+        }
+        
+        # Пока такая же анимация строится, возвращается ID уже поставленной задачи
+        with metrics.timer('torsion_db_seconds', op='create_job'):
+            job_id, shared = get_job_queue().submit_once('animation', params,
+                                                         key=f'animation:{key}.{fmt}')
+        metrics.counter('torsion_singleflight_requests_total', endpoint='animation',
+                        role='shared' if shared else 'leader').inc()
         
         return jsonify({
             'success': True,
-            'filename': filename
-        })
+            'status': 'pending',
+            'job_id': job_id,
+            'status_url': url_for('get_job', job_id=job_id),
+            'events_url': url_for('job_event_stream', job_id=job_id),
+            'animation_url': animation_url
+        }), 202
         
+    except JobQueueFull as e:
+        response = jsonify({
+            'success': False,
+            'error': str(e)
+        })
+        response.headers['Retry-After'] = '5'
+        return response, 503
     except Exception as e:
         return jsonify({
             'success': False,
@@ -384,6 +1160,113 @@ def generate_report():
         }), 400
 
 
+@app.route('/api/animation/stream', methods=['GET'])
+def stream_animation():
+    """
+    Живое превью анимации потоком MJPEG (multipart/x-mixed-replace, показывается тегом <img>):
+    каждый кадр отправляется сразу после отрисовки, первый — через время построения фигуры,
+    а не всей анимации. Параметры — в строке запроса, как у POST /api/animation
+    (experiment_id или material, diameter, length, max_moment, num_points, seed),
+    а также fps, duration и dpi (разрешение кадра). render_lock берется на каждый кадр,
+    поэтому поток не блокирует остальные графики. Полностью отданное превью сохраняется
+    в кэше анимаций (формат mjpeg), повторный поток читает кадры оттуда без отрисовки.
+    """
+    from core.animator import PREVIEW_DPI, TorsionAnimator
+    
+    try:
+        fps, duration = animation_timing(request.args, 20, 8)
+        dpi = int(request.args.get('dpi', PREVIEW_DPI))
+        if not 32 <= dpi <= 100:
+            raise ValueError('dpi должен быть от 32 до 100')
+        source = animation_source(request.args)
+        if source is None:
+            return jsonify({
+                'success': False,
+                'error': 'Эксперимент не найден'
+            }), 404
+        material, diameter, length, moments, angles = source
+        calculator = TorsionCalculator(diameter / 1000, length / 1000, material)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    animator = TorsionAnimator(calculator, moments, angles)
+    
+    cached = animator.cached_jpeg_frames(fps, duration, dpi, cache=animation_cache)
+    metrics.counter('torsion_cache_requests_total', endpoint='animation_stream',
+                    result='miss' if cached is None else 'hit').inc()
+    
+    def generate():
+        if cached is not None:
+            frames = iter(cached)
+        else:
+            frames = animator.iter_jpeg_frames(fps, duration, dpi, cache=animation_cache)
+        started = time.monotonic()
+        frame_num = 0
+        try:
+            while True:
+                # После последнего кадра next() еще раз: генератор сохраняет превью в кэше
+                with rendering('animation_stream') if cached is None else nullcontext():
+                    jpeg = next(frames, None)
+                if jpeg is None:
+                    break
+                yield (b'--frame\r\nContent-Type: image/jpeg\r\n'
+                       b'Content-Length: ' + str(len(jpeg)).encode() + b'\r\n\r\n' + jpeg + b'\r\n')
+                # Не быстрее fps: браузер показывает кадры по мере получения
+                frame_num += 1
+                delay = started + frame_num / fps - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+        finally:
+            if cached is None:
+                frames.close()
+    
+    response = Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # без буферизации в nginx
+    return response
+
+
+@app.route('/api/animation/<filename>', methods=['GET'])
+def get_animation(filename):
+    """
+    Готовая анимация из кэша. Имя файла — хэш входных данных, содержимое не меняется,
+    поэтому ответ кэшируется браузером навсегда; поддерживаются Range и If-None-Match.
+    """
+    key, _, fmt = filename.rpartition('.')
+    try:
+        path = animation_cache.get(key, fmt)
+    except ValueError:
+        path = None
+    if path is None:
+        return jsonify({
+            'success': False,
+            'error': 'Анимация не найдена'
+        }), 404
+    
+    response = send_file(path, mimetype=ANIMATION_FORMATS[fmt], conditional=True,
+                         etag=filename, max_age=365 * 24 * 3600)
+    response.cache_control.immutable = True
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Метрики процесса: гистограммы задержек по маршрутам, время отрисовки,
+    сборки .docx и запросов к БД, счетчики и число запросов в обработке.
+    По умолчанию — текстовый формат Prometheus; JSON — ?format=json или Accept: application/json.
+    """
+    wants_json = (request.args.get('format') == 'json'
+                  or request.accept_mimetypes.best == 'application/json')
+    if wants_json:
+        return jsonify(metrics_payload(metrics))
+    return Response(metrics.render_prometheus(),
+                    content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.errorhandler(404)
 def not_found(error):
     """Обработка 404 ошибки."""
@@ -416,4 +1299,7 @@ if __name__ == '__main__':
     print("📍 Адрес: http://localhost:5001")
     print("\n")
     
+    # В режиме отладки перезапускающий процесс-наблюдатель запросы не обслуживает
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warm_up()
     app.run(debug=True, host='0.0.0.0', port=5001)